@@ -1,10 +1,13 @@
 # backend/app/api/endpoints/chat.py
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Request
+from fastapi.responses import StreamingResponse
 from app.schemas.chat import ChatQuery, ConversationOut, ChatMessageOut
 from app.services import query_engine
+from app.services.answer_cache import answer_cache
 from app.db.session import SessionLocal
 from sqlalchemy.orm import Session
 from app.models.chat import Conversation, ChatMessage
+import json
 import uuid
 
 router = APIRouter()
@@ -16,15 +19,37 @@ def get_db():
     finally:
         db.close()
 
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _sse_events(query: str, fund_id: int | None, fund_ids: list[int] | None = None):
+    try:
+        async for event, data in query_engine.stream_query(query, fund_id=fund_id, fund_ids=fund_ids):
+            yield _sse(event, data)
+    except Exception as e:
+        print(f"[ERROR] Streaming chat query failed: {e}")
+        yield _sse("error", {"detail": str(e)})
+
+
 @router.post("/chat/query")
-async def chat_query(payload: ChatQuery):
+async def chat_query(payload: ChatQuery, request: Request):
+    print(f"[DEBUG] Chat query received: query='{payload.query}', fund_id={payload.fund_id}")
+    if payload.stream or "text/event-stream" in request.headers.get("accept", ""):
+        return StreamingResponse(
+            _sse_events(payload.query, payload.fund_id, payload.fund_ids),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
     try:
-        print(f"[DEBUG] Chat query received: query='{payload.query}', fund_id={payload.fund_id}")
-        result = query_engine.handle_query(payload.query, fund_id=payload.fund_id)
-        return result
+        return await query_engine.handle_query(payload.query, fund_id=payload.fund_id, fund_ids=payload.fund_ids)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/chat/cache/stats")
+def chat_cache_stats():
+    return answer_cache.stats()
+
 # Create new conversation
 @router.post("/chat/conversations", response_model=ConversationOut)
 def create_conversation(fund_id: int | None = Body(None), db: Session = Depends(get_db)):
@@ -1,16 +1,20 @@
 # backend/app/api/endpoints/documents.py
+import asyncio
 from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Query, BackgroundTasks
-import shutil, os
 from app.db.session import SessionLocal
 from app.models.document import Document
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.schemas.document import DocumentOut, DocumentStatusOut
+from app.services.ingestion import enqueue_document, PRIORITIES
+from app.services.answer_cache import answer_cache
+from app.services.ingest_pipeline import pipeline_metrics
+from app.services.upload_store import (
+    UPLOAD_DIR, content_path, file_lock, spool_upload, place_upload, discard, find_duplicate, release_file,
+)
 
 router = APIRouter()
 
-UPLOAD_DIR = "/app/uploads" 
-
 def get_db():
     db = SessionLocal()
     try:
@@ -23,33 +27,60 @@ async def upload_document(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     fund_id: int | None = Form(None),
+    priority: str = Form("normal"),
     db: Session = Depends(get_db),
 ):
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
-
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    file_path = os.path.join(UPLOAD_DIR, f"{int(__import__('time').time())}_{file.filename}")
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"priority must be one of {list(PRIORITIES)}")
 
     try:
-        with open(file_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
+        # hashing and writing a large PDF is blocking work
+        content_hash, tmp_path = await asyncio.to_thread(spool_upload, file.file, UPLOAD_DIR)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save uploaded file: {e}")
 
-    doc = Document(
-        fund_id=fund_id,
-        file_name=file.filename,
-        file_path=file_path,
-        parsing_status="pending"
+    # the file lock, DB round trips and broker call block: keep them off the event loop
+    return await asyncio.to_thread(
+        _store_upload, db, tmp_path, content_hash, file.filename, fund_id, priority, background_tasks
     )
-    db.add(doc)
-    db.commit()
-    db.refresh(doc)
+
+
+def _store_upload(db: Session, tmp_path: str, content_hash: str, file_name: str,
+                  fund_id: int | None, priority: str, background_tasks: BackgroundTasks) -> dict:
+    """Put a spooled upload in place, record its document and queue it for parsing."""
+    try:
+        # the file must not be released by a concurrent delete before our row is committed
+        with file_lock(content_path(content_hash, UPLOAD_DIR)):
+            file_path = place_upload(tmp_path, content_hash, UPLOAD_DIR)
+            existing = find_duplicate(db, content_hash, fund_id)
+            if existing:
+                # same bytes, same fund: its transactions and vectors are already stored
+                print(f"[DEBUG] Upload {file_name} is identical to document {existing.id}; not reparsing")
+                return {
+                    "document_id": existing.id,
+                    "status": existing.parsing_status,
+                    "duplicate": True,
+                    "message": f"Identical file already uploaded as {existing.file_name}. Reusing its parsed results."
+                }
+
+            doc = Document(
+                fund_id=fund_id,
+                file_name=file_name,
+                file_path=file_path,
+                content_hash=content_hash,
+                parsing_status="pending"
+            )
+            db.add(doc)
+            db.commit()
+            db.refresh(doc)
+    finally:
+        discard(tmp_path)
 
     try:
-        from app.services.document_processor import parse_document_async
-        background_tasks.add_task(parse_document_async, doc.id)
+        enqueue_document(doc.id, priority=priority, background_tasks=background_tasks)
+        db.refresh(doc)
     except Exception as e:
         doc.parsing_status = "error"
         doc.error_message = f"Failed to schedule parsing: {e}"
@@ -64,9 +95,14 @@ async def upload_document(
     return {
         "document_id": doc.id,
         "status": doc.parsing_status,
-        "message": "Uploaded. Parsing scheduled."
+        "message": "Uploaded. Parsing queued."
     }
 
+@router.get("/documents/pipeline/stats")
+def pipeline_stats():
+    """Per-stage throughput and queue depths of the ingestion pipeline (this process)."""
+    return pipeline_metrics.snapshot()
+
 @router.get("/documents/{document_id}", response_model=DocumentOut)
 def get_document(document_id: int, db: Session = Depends(get_db)):
     doc = db.get(Document, document_id)
@@ -98,13 +134,16 @@ def delete_document(document_id: int, db: Session = Depends(get_db)):
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # delete file on disk (best-effort)
-    try:
-        if doc.file_path and os.path.exists(doc.file_path):
-            os.remove(doc.file_path)
-    except Exception:
-        pass
-
-    db.delete(doc)
-    db.commit()
+    fund_id = doc.fund_id
+    file_path = doc.file_path
+    if file_path:
+        # delete file on disk unless another document has the same content (best-effort)
+        with file_lock(file_path):
+            db.delete(doc)
+            db.commit()
+            release_file(db, file_path)
+    else:
+        db.delete(doc)
+        db.commit()
+    answer_cache.bump(fund_id)
     return {"message": "Document deleted successfully"}
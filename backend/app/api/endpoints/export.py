@@ -0,0 +1,40 @@
+# backend/app/api/endpoints/export.py
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.services.export import FORMATS, format_available, export_transactions, export_metrics
+
+router = APIRouter()
+
+_EXTENSIONS = {"ndjson": "ndjson", "csv": "csv", "arrow": "arrows"}
+
+def _stream(chunks, fmt: str, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{_EXTENSIONS[fmt]}"'},
+    )
+
+def _check_format(fmt: str):
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(FORMATS)}")
+    if not format_available(fmt):
+        raise HTTPException(status_code=501, detail=f"{fmt} export needs pyarrow installed on the server")
+
+@router.get("/export/transactions")
+def export_fund_transactions(
+    fund_id: int | None = Query(None, description="Only this fund (default: all funds)"),
+    format: str = Query("ndjson", description="ndjson | csv | arrow"),
+):
+    """Every capital call, distribution and adjustment, streamed from a server-side cursor."""
+    _check_format(format)
+    name = f"fund_{fund_id}_transactions" if fund_id is not None else "transactions"
+    return _stream(export_transactions(fund_id, format), format, name)
+
+@router.get("/export/metrics")
+def export_fund_metrics(
+    fund_ids: list[int] | None = Query(None, description="Limit to these funds (default: all funds)"),
+    format: str = Query("ndjson", description="ndjson | csv | arrow"),
+):
+    """PIC/DPI/IRR and cashflow totals per fund, streamed in batches of funds."""
+    _check_format(format)
+    return _stream(export_metrics(fund_ids, format), format, "fund_metrics")
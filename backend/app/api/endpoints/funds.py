@@ -5,8 +5,11 @@ from app.models.transaction import CapitalCall, Distribution, Adjustment
 from decimal import Decimal
 from app.models.fund import Fund
 from app.schemas.fund import FundCreate, FundOut
-import os
-import glob
+from app.services.metrics_cache import metrics_cache
+from app.services.answer_cache import answer_cache
+from app.services.vector_store import delete_vector_store
+from app.services.transaction_timeline import keyset_page, InvalidCursor
+from app.services.upload_store import file_lock, release_file
 
 router = APIRouter()
 
@@ -41,30 +44,28 @@ def get_fund(fund_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Fund not found")
     return f
 
+_TRANSACTION_TYPES = {"capital_calls": "capital_call", "distributions": "distribution", "adjustments": "adjustment"}
+
 @router.get("/funds/{fund_id}/transactions")
 def get_fund_transactions(
     fund_id: int,
     transaction_type: str | None = Query(None, description="capital_calls | distributions | adjustments"),
-    page: int = 1,
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
     db: Session = Depends(get_db)
 ):
-    if transaction_type is None or transaction_type == "capital_calls":
-        q = db.query(CapitalCall).filter(CapitalCall.fund_id == fund_id)
-    elif transaction_type == "distributions":
-        q = db.query(Distribution).filter(Distribution.fund_id == fund_id)
-    elif transaction_type == "adjustments":
-        q = db.query(Adjustment).filter(Adjustment.fund_id == fund_id)
-    else:
+    source = _TRANSACTION_TYPES.get(transaction_type or "capital_calls")
+    if source is None:
         raise HTTPException(status_code=400, detail="transaction_type must be one of capital_calls|distributions|adjustments")
-
-    total = q.count()
-    items = q.offset((page - 1) * limit).limit(limit).all()
+    try:
+        items, next_cursor = keyset_page(db, source, fund_id, limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     def row_to_dict(r):
         return {c.name: getattr(r, c.name) for c in r.__table__.columns}
 
-    return {"items": [row_to_dict(i) for i in items], "total": total, "page": page, "pages": (total + limit - 1) // limit}
+    return {"items": [row_to_dict(i) for i in items], "limit": limit, "next_cursor": next_cursor}
 
 @router.delete("/funds/{fund_id}")
 def delete_fund(fund_id: int, db: Session = Depends(get_db)):
@@ -79,23 +80,26 @@ def delete_fund(fund_id: int, db: Session = Depends(get_db)):
     from app.models.document import Document
     documents = db.query(Document).filter(Document.fund_id == fund_id).all()
     for doc in documents:
-        try:
-            if doc.file_path and os.path.exists(doc.file_path):
-                os.remove(doc.file_path)
-        except Exception:
-            pass
-        db.delete(doc)
+        # uploads are content-addressed: another fund may have the same file
+        file_path = doc.file_path
+        if not file_path:
+            db.delete(doc)
+            continue
+        with file_lock(file_path):
+            db.delete(doc)
+            db.commit()
+            release_file(db, file_path)
 
     db.commit()
 
-    vector_pattern = f"app/vector/fund_{fund_id}_*"
-    for filepath in glob.glob(f"{vector_pattern}.pkl") + glob.glob(f"{vector_pattern}.faiss"):
-        try:
-            os.remove(filepath)
-        except Exception:
-            pass
+    try:
+        delete_vector_store(f"fund_{fund_id}")
+    except Exception as e:
+        print(f"[WARN] Failed to delete vector store for fund {fund_id}: {e}")
 
     db.delete(fund)
     db.commit()
+    metrics_cache.invalidate(fund_id)
+    answer_cache.bump(fund_id)
 
     return {"message": f"Fund {fund.name} dan has been deleted."}
\ No newline at end of file
@@ -1,14 +1,9 @@
 # backend/app/api/endpoints/metrics.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from app.db.session import SessionLocal
 from sqlalchemy.orm import Session
-from app.services.metrics_calculator import (
-    calculate_pic,
-    calculate_dpi,
-    calculate_irr,
-    get_metrics_breakdown,
-)
-from app.models.transaction import CapitalCall, Distribution, Adjustment
+from app.services.metrics_cache import metrics_cache
+from app.services.transaction_timeline import timeline_page, InvalidCursor
 
 router = APIRouter()
 
@@ -19,56 +14,40 @@ def get_db():
     finally:
         db.close()
 
+@router.get("/funds/metrics")
+def get_all_metrics(
+    fund_ids: list[int] | None = Query(None, description="Limit to these funds (default: all funds)"),
+    db: Session = Depends(get_db),
+):
+    try:
+        return {"funds": metrics_cache.get_portfolio(fund_ids, db=db)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/funds/{fund_id}/metrics")
-def get_metrics(fund_id: int):
+def get_metrics(fund_id: int, db: Session = Depends(get_db)):
     try:
-        metrics = get_metrics_breakdown(fund_id)
+        metrics = metrics_cache.get_breakdown(fund_id, db=db)
         return metrics
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/metrics/cache/stats")
+def get_metrics_cache_stats():
+    return metrics_cache.stats()
+
 @router.get("/funds/{fund_id}/transactions/all")
-def get_all_transactions(fund_id: int, db: Session = Depends(get_db)):
+def get_all_transactions(
+    fund_id: int,
+    limit: int = Query(500, ge=1, le=5000),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    db: Session = Depends(get_db),
+):
+    """Capital calls, distributions and adjustments merged newest first, one page at a time."""
     try:
-        capital_calls = [
-            {
-                "id": c.id,
-                "date": c.call_date,
-                "type": f"Capital Call: {c.call_type}",
-                "amount": float(c.amount),
-                "description": c.description,
-                "source": "capital_call",
-            }
-            for c in db.query(CapitalCall).filter(CapitalCall.fund_id == fund_id).all()
-        ]
-
-        distributions = [
-            {
-                "id": d.id,
-                "date": d.distribution_date,
-                "type": f"Distribution: {d.distribution_type}",
-                "amount": float(d.amount),
-                "description": d.description,
-                "source": "distribution",
-            }
-            for d in db.query(Distribution).filter(Distribution.fund_id == fund_id).all()
-        ]
-
-        adjustments = [
-            {
-                "id": a.id,
-                "date": a.adjustment_date,
-                "type": f"Adjustment: {a.adjustment_type}",
-                "amount": float(a.amount),
-                "description": a.description,
-                "source": "adjustment",
-            }
-            for a in db.query(Adjustment).filter(Adjustment.fund_id == fund_id).all()
-        ]
-
-        all_transactions = capital_calls + distributions + adjustments
-        all_transactions.sort(key=lambda x: x["date"], reverse=True)
-
-        return {"transactions": all_transactions}
+        transactions, next_cursor = timeline_page(db, fund_id, limit=limit, cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return {"transactions": transactions, "next_cursor": next_cursor}
@@ -0,0 +1,45 @@
+# backend/app/core/celery_app.py
+"""
+Celery application for background ingestion.
+
+Run workers with:
+    celery -A app.core.celery_app:celery_app worker -Q ingestion --pool threads
+
+Without a broker (no CELERY_BROKER_URL / REDIS_URL) or with INGEST_EAGER=true,
+tasks run in the calling process instead, which is what tests use.
+"""
+from celery import Celery
+
+from app.core.config import settings
+
+broker_url = settings.CELERY_BROKER_URL or settings.REDIS_URL
+eager = settings.INGEST_EAGER or not broker_url
+if not settings.INGEST_EAGER and not broker_url:
+    print("[WARN] No CELERY_BROKER_URL/REDIS_URL configured; ingestion jobs run in-process")
+
+celery_app = Celery(
+    "fund_analysis",
+    broker=broker_url or "memory://",
+    include=["app.services.ingestion"],
+)
+
+celery_app.conf.update(
+    task_always_eager=eager,
+    task_eager_propagates=False,
+    task_default_queue="ingestion",
+    task_serializer="json",
+    accept_content=["json"],
+    task_ignore_result=True,
+    # ack only after the job finished, so a crashed worker's job is redelivered
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # parsing jobs are long; don't let one worker hoard queued documents
+    worker_prefetch_multiplier=1,
+    worker_concurrency=settings.INGEST_WORKER_CONCURRENCY,
+    broker_transport_options={
+        # Redis emulates priorities with one list per step; 0 is served first
+        "priority_steps": list(range(10)),
+        "queue_order_strategy": "priority",
+        "visibility_timeout": 6 * 3600,
+    },
+)
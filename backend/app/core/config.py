@@ -3,7 +3,55 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     DATABASE_URL: str
     OPENAI_API_KEY: str | None = None
+    OPENAI_BASE_URL: str | None = None  # e.g. a local stub server
     REDIS_URL: str | None = None
+    EMBEDDING_PROVIDER: str = "openai"  # openai | fake (deterministic, offline)
+    EMBEDDING_CACHE_PATH: str | None = "/app/embedding_cache/embeddings.sqlite3"
+    EMBEDDING_BATCH_TOKENS: int = 100000
+    EMBEDDING_BATCH_SIZE: int = 512
+    EMBEDDING_MAX_WORKERS: int = 4
+    EMBEDDING_MAX_RETRIES: int = 6
+    EMBEDDING_RETRY_BASE_DELAY: float = 1.0
+    EMBEDDING_RETRY_AFTER_MAX: float = 60.0  # cap on a server's Retry-After
+    EMBEDDING_MAX_SPLITS: int = 16  # halvings of a batch rejected with 400
+    CELERY_BROKER_URL: str | None = None  # default: REDIS_URL
+    INGEST_EAGER: bool = False  # run ingestion jobs in-process (tests / no broker)
+    INGEST_WORKER_CONCURRENCY: int = 4
+    INGEST_MAX_RETRIES: int = 5
+    INGEST_RETRY_BASE_DELAY: float = 10.0
+    PDF_EXTRACT_WORKERS: int | None = None  # default: os.cpu_count()
+    PDF_PAGES_PER_SHARD: int = 16
+    PDF_EXTRACT_TABLES: bool = True  # also parse ruled tables (column-aware)
+    CHUNK_MAX_TOKENS: int = 300
+    CHUNK_OVERLAP_TOKENS: int = 40
+    INGEST_QUEUE_SIZE: int = 16  # items between two pipeline stages
+    INGEST_EMBED_BATCH_CHUNKS: int = 64  # chunks per embedding request in the pipeline
+    METRICS_CACHE_TTL: int = 3600
+    EXPORT_BATCH_ROWS: int = 5000  # rows fetched per server-side cursor round trip
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_TTL: int = 3600
+    ANSWER_CACHE_MAX_ENTRIES: int = 2048
+    # opt-in near-duplicate matching (cosine, e.g. 0.97); None = exact matches only
+    ANSWER_CACHE_SIMILARITY: float | None = None
+    VECTOR_BACKEND: str = "faiss"  # faiss | pgvector
+    VECTOR_STORE_CACHE_MB: int = 1024
+    VECTOR_LOG_COMPACT_RECORDS: int = 1024
+    VECTOR_INDEX_TYPE: str = "hnsw"  # flat | ivf_flat | hnsw | ivf_pq
+    VECTOR_INDEX_PROMOTE_AT: int = 20000
+    VECTOR_IVF_NLIST: int | None = None  # default: ~4*sqrt(n)
+    VECTOR_IVF_NPROBE: int = 16
+    VECTOR_HNSW_M: int = 32
+    VECTOR_HNSW_EF_CONSTRUCTION: int = 80
+    VECTOR_HNSW_EF_SEARCH: int = 64
+    VECTOR_PQ_M: int = 48
+    HYBRID_SEARCH: bool = True  # fuse BM25 and vector results (FAISS backend)
+    HYBRID_CANDIDATES: int = 20  # candidates taken from each ranking before fusion
+    HYBRID_RRF_K: int = 60
+    CROSS_FUND_SEARCH_WORKERS: int = 8  # threads searching fund indexes in parallel
+    PGVECTOR_INDEX_TYPE: str = "hnsw"  # hnsw | ivfflat
+    PGVECTOR_HNSW_M: int = 16
+    PGVECTOR_HNSW_EF_CONSTRUCTION: int = 64
+    PGVECTOR_IVF_LISTS: int = 100
 
     class Config:
         env_file = ".env"
@@ -1,9 +1,13 @@
 from app.db.session import Base, engine
+from app.core.config import settings
 import app.models.fund as fund_model
 import app.models.transaction as tx_model
 import app.models.document as doc_model
 
 def init_db():
+    if settings.VECTOR_BACKEND == "pgvector":
+        from app.services.pgvector_store import ensure_schema
+        ensure_schema()
     Base.metadata.create_all(bind=engine)
     print("Database tables created.")
 
@@ -1,7 +1,27 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
 
 engine = create_engine(settings.DATABASE_URL, future=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
 Base = declarative_base()
+
+# async drivers for the same database, used by the chat query path
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def _async_url(url: str):
+    url = make_url(url)
+    backend = url.get_backend_name()
+    return url.set(drivername=f"{backend}+{_ASYNC_DRIVERS.get(backend, url.get_driver_name())}")
+
+
+try:
+    async_engine = create_async_engine(_async_url(settings.DATABASE_URL), pool_pre_ping=True)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+except Exception as e:  # async driver not installed
+    print(f"[WARN] Async database engine unavailable, falling back to threads: {e}")
+    async_engine = None
+    AsyncSessionLocal = None
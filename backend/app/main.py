@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import funds, documents, chat, metrics
+from app.api.endpoints import funds, documents, chat, metrics, export
 
 app = FastAPI(title="Fund Analysis System")
 
@@ -13,10 +13,12 @@ app.add_middleware(
 )
 
 # include routers
+# metrics goes first so /funds/metrics is not captured by /funds/{fund_id}
+app.include_router(metrics.router, prefix="/api", tags=["metrics"])
 app.include_router(funds.router, prefix="/api", tags=["funds"])
 app.include_router(documents.router, prefix="/api", tags=["documents"])
 app.include_router(chat.router, prefix="/api", tags=["chat"])
-app.include_router(metrics.router, prefix="/api", tags=["metrics"])
+app.include_router(export.router, prefix="/api", tags=["export"])
 
 @app.get("/")
 def root():
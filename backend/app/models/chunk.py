@@ -0,0 +1,17 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import JSONB
+from pgvector.sqlalchemy import Vector
+from app.db.session import Base
+
+EMBEDDING_DIM = 1536  # text-embedding-3-small
+
+class DocumentChunk(Base):
+    """Chunk + embedding rows for the pgvector VectorStore backend."""
+    __tablename__ = "document_chunks"
+    id = Column(BigInteger, primary_key=True)
+    index_name = Column(String(100), nullable=False, index=True)
+    fund_id = Column(Integer, nullable=True, index=True)
+    content = Column(Text, nullable=False)
+    meta = Column("metadata", JSONB, nullable=True)
+    embedding = Column(Vector(EMBEDDING_DIM), nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now())
@@ -7,6 +7,7 @@ class Document(Base):
     fund_id = Column(Integer, ForeignKey("funds.id"), nullable=True)
     file_name = Column(String(255), nullable=False)
     file_path = Column(String(500), nullable=True)
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the PDF
     upload_date = Column(TIMESTAMP, server_default=func.now())
     parsing_status = Column(String(50), default="pending")
     error_message = Column(Text, nullable=True)
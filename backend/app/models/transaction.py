@@ -1,6 +1,26 @@
-from sqlalchemy import Column, Integer, String, Date, Numeric, Boolean, ForeignKey, TIMESTAMP, func
+from sqlalchemy import Column, Integer, String, Date, Numeric, Boolean, ForeignKey, TIMESTAMP, Index, func, text
 from app.db.session import Base
 
+
+def _natural_key(table: str, date_col: str, type_col: str) -> Index:
+    """
+    One row per (fund, date, type, amount, source document). Re-ingesting a
+    statement then inserts nothing (ON CONFLICT DO NOTHING). Rows without a
+    source document (manual / legacy) are not constrained.
+    """
+    return Index(
+        f"uq_{table}_natural_key",
+        "fund_id", date_col, type_col, "amount", "source_document",
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+        postgresql_where=text("source_document IS NOT NULL"),
+        sqlite_where=text("source_document IS NOT NULL"),
+    )
+
+def _timeline_key(table: str, date_col: str) -> Index:
+    """(fund_id, date, id): a fund's rows in timeline order, for keyset pagination."""
+    return Index(f"ix_{table}_fund_date", "fund_id", date_col, "id")
+
 class CapitalCall(Base):
     __tablename__ = "capital_calls"
     id = Column(Integer, primary_key=True, index=True)
@@ -9,8 +29,14 @@ class CapitalCall(Base):
     call_type = Column(String(100))
     amount = Column(Numeric(15,2), nullable=False)
     description = Column(String, nullable=True)
+    source_document = Column(String(64), nullable=True)  # SHA-256 of the source PDF
     created_at = Column(TIMESTAMP, server_default=func.now())
 
+    __table_args__ = (
+        _natural_key("capital_calls", "call_date", "call_type"),
+        _timeline_key("capital_calls", "call_date"),
+    )
+
 class Distribution(Base):
     __tablename__ = "distributions"
     id = Column(Integer, primary_key=True, index=True)
@@ -20,8 +46,14 @@ class Distribution(Base):
     is_recallable = Column(Boolean, default=False)
     amount = Column(Numeric(15,2), nullable=False)
     description = Column(String, nullable=True)
+    source_document = Column(String(64), nullable=True)  # SHA-256 of the source PDF
     created_at = Column(TIMESTAMP, server_default=func.now())
 
+    __table_args__ = (
+        _natural_key("distributions", "distribution_date", "distribution_type"),
+        _timeline_key("distributions", "distribution_date"),
+    )
+
 class Adjustment(Base):
     __tablename__ = "adjustments"
     id = Column(Integer, primary_key=True, index=True)
@@ -32,4 +64,10 @@ class Adjustment(Base):
     amount = Column(Numeric(15,2), nullable=False)
     is_contribution_adjustment = Column(Boolean, default=False)
     description = Column(String, nullable=True)
+    source_document = Column(String(64), nullable=True)  # SHA-256 of the source PDF
     created_at = Column(TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (
+        _natural_key("adjustments", "adjustment_date", "adjustment_type"),
+        _timeline_key("adjustments", "adjustment_date"),
+    )
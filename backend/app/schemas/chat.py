@@ -6,7 +6,9 @@ from datetime import datetime
 class ChatQuery(BaseModel):
     query: str
     fund_id: Optional[int] = None
+    fund_ids: Optional[List[int]] = None  # without fund_id: search only these funds (default: all)
     conversation_id: Optional[str] = None
+    stream: bool = False  # respond with Server-Sent Events
 
 class ChatMessageOut(BaseModel):
     role: str
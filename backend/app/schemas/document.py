@@ -8,6 +8,7 @@ class DocumentOut(BaseModel):
     fund_id: Optional[int]
     file_name: str
     file_path: Optional[str]
+    content_hash: Optional[str] = None
     parsing_status: str
     upload_date: datetime
     error_message: Optional[str] = None
@@ -0,0 +1,101 @@
+# backend/app/services/ann_index.py
+"""
+FAISS index types for VectorStore.
+
+Every store starts as an exact IndexFlatL2. Once it holds
+VECTOR_INDEX_PROMOTE_AT vectors it is rebuilt as VECTOR_INDEX_TYPE:
+
+    flat      exact brute-force scan (no promotion)
+    ivf_flat  inverted lists over k-means cells, exact distances in probed cells
+    hnsw      graph index, no training needed
+    ivf_pq    inverted lists + product-quantized codes (smallest memory)
+
+Recall/latency is tuned per query with nprobe (IVF) and ef_search (HNSW).
+"""
+import math
+
+import faiss
+import numpy as np
+
+from app.core.config import settings
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+
+
+def index_kind(index) -> str:
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf_flat"
+    return "flat"
+
+
+def _nlist(n: int) -> int:
+    if settings.VECTOR_IVF_NLIST:
+        return settings.VECTOR_IVF_NLIST
+    # ~4*sqrt(n) cells, but keep at least 39 training points per cell
+    return max(1, min(int(4 * math.sqrt(n)), n // 39))
+
+
+def build_index(kind: str, dim: int, vectors: np.ndarray):
+    """Create, train (if needed) and fill an index of the given kind."""
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown vector index type '{kind}', expected one of {INDEX_TYPES}")
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    n = len(vectors)
+
+    if kind == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif kind == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, settings.VECTOR_HNSW_M)
+        index.hnsw.efConstruction = settings.VECTOR_HNSW_EF_CONSTRUCTION
+    elif kind == "ivf_flat":
+        index = faiss.IndexIVFFlat(faiss.IndexFlatL2(dim), dim, _nlist(n))
+    else:
+        # 2**nbits centroids per sub-quantizer need enough training points
+        nbits = max(4, min(8, int(math.log2(max(n, 16) / 39))))
+        # sub-quantizer count must divide the dimension
+        m = max(d for d in range(1, settings.VECTOR_PQ_M + 1) if dim % d == 0)
+        index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, _nlist(n), m, nbits)
+
+    if not index.is_trained:
+        index.train(vectors)
+    if n:
+        index.add(vectors)
+    return index
+
+
+def should_promote(index) -> bool:
+    return (
+        settings.VECTOR_INDEX_TYPE != "flat"
+        and index_kind(index) == "flat"
+        and index.ntotal >= settings.VECTOR_INDEX_PROMOTE_AT
+    )
+
+
+def search_params(index, nprobe: int | None = None, ef_search: int | None = None):
+    """
+    Apply per-query search settings and return the SearchParameters to pass
+    to index.search (None when there are none). faiss 1.7.4 ignores
+    SearchParametersHNSW, so efSearch is set on the index itself; callers
+    must hold the store lock.
+    """
+    kind = index_kind(index)
+    if kind in ("ivf_flat", "ivf_pq"):
+        return faiss.SearchParametersIVF(nprobe=nprobe or settings.VECTOR_IVF_NPROBE)
+    if kind == "hnsw":
+        index.hnsw.efSearch = ef_search or settings.VECTOR_HNSW_EF_SEARCH
+    return None
+
+
+def approx_nbytes(index, dim: int) -> int:
+    """Rough resident size of the stored vectors."""
+    n = int(getattr(index, "ntotal", 0))
+    kind = index_kind(index)
+    if kind == "ivf_pq":
+        return n * (settings.VECTOR_PQ_M + 8)
+    if kind == "hnsw":
+        return n * (dim * 4 + settings.VECTOR_HNSW_M * 2 * 4)
+    return n * dim * 4
@@ -0,0 +1,146 @@
+# backend/app/services/answer_cache.py
+"""
+Cache of chat answers.
+
+An answer is stored under (fund, data version, normalized query). The data
+version is a per-fund counter (in Redis when configured, so ingestion
+workers and API processes agree) that is bumped whenever the fund's
+transactions or documents change; older answers simply stop matching and
+age out of the in-process LRU.
+
+Only exact (normalized) matches are served by default. Near-duplicate
+matching is opt-in: with ANSWER_CACHE_SIMILARITY set, a question whose
+embedding is at least that cosine-similar to a cached question for the same
+fund and version is answered from the cache too ("DPI of fund 3?" vs
+"what's the DPI of fund 3"). Questions that differ in one metric name ("DPI"
+vs "IRR") can be just as close, so keep the threshold high.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.metrics_cache import open_backend
+
+VERSION_KEY = "answer_cache:version:{}"
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query.strip().lower()).rstrip("?!. ")
+
+
+def _scope(fund_id: int | None) -> str:
+    return str(fund_id) if fund_id else "global"
+
+
+class AnswerCache:
+    def __init__(self, redis_url: str | None = None, ttl: int = 3600,
+                 max_entries: int = 2048, similarity: float | None = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self.versions = open_backend(redis_url, "answer cache")
+        # (scope, version, normalized query) -> (expires_at, answer, unit embedding | None)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def version(self, fund_id: int | None) -> int | None:
+        """Current data version of the fund, None if it cannot be read (no caching)."""
+        try:
+            return self.versions.counter(VERSION_KEY.format(_scope(fund_id)))
+        except Exception as e:
+            print(f"[WARN] Answer cache version read failed: {e}")
+            return None
+
+    def bump(self, fund_id: int | None):
+        """
+        Invalidate every cached answer of the fund (its data changed), and
+        the portfolio-wide answers, which search every fund.
+        """
+        scopes = {_scope(fund_id), _scope(None)}
+        for scope in scopes:
+            try:
+                self.versions.incr(VERSION_KEY.format(scope))
+            except Exception as e:
+                print(f"[WARN] Answer cache invalidation failed for {scope}: {e}")
+        with self._lock:
+            for key in [k for k in self._entries if k[0] in scopes]:
+                del self._entries[key]
+
+    def _live(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, fund_id: int | None, version: int, query: str) -> dict | None:
+        with self._lock:
+            entry = self._live((_scope(fund_id), version, normalize_query(query)))
+            if entry is not None:
+                self.hits += 1
+                return entry[1]
+        return None
+
+    def get_similar(self, fund_id: int | None, version: int, embedding) -> dict | None:
+        """Best cached answer whose question embedding is within the similarity threshold."""
+        if self.similarity is None:
+            return None
+        scope = _scope(fund_id)
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if k[0] == scope and k[1] == version and e[2] is not None]
+            if keys:
+                q = np.asarray(embedding, dtype=np.float32)
+                q = q / (np.linalg.norm(q) or 1.0)
+                scores = np.stack([self._entries[k][2] for k in keys]) @ q
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity:
+                    entry = self._live(keys[best])
+                    if entry is not None:
+                        self.similar_hits += 1
+                        return entry[1]
+        return None
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def put(self, fund_id: int | None, version: int, query: str, answer: dict, embedding=None):
+        if embedding is not None:
+            embedding = np.asarray(embedding, dtype=np.float32)
+            embedding = embedding / (np.linalg.norm(embedding) or 1.0)
+        key = (_scope(fund_id), version, normalize_query(query))
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, answer, embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.similar_hits + self.misses
+            return {
+                "backend": self.versions.name,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.similar_hits) / total, 4) if total else 0.0,
+            }
+
+
+answer_cache = AnswerCache(
+    settings.REDIS_URL,
+    ttl=settings.ANSWER_CACHE_TTL,
+    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+    similarity=settings.ANSWER_CACHE_SIMILARITY,
+)
@@ -0,0 +1,115 @@
+# backend/app/services/chunk_store.py
+"""
+Columnar, memory-mapped storage for chunk texts and metadata.
+
+File layout (little endian):
+    magic b"CHNK" | version u32 | count u64
+    text offsets  int64[count + 1]
+    meta offsets  int64[count + 1]
+    text blob     (UTF-8, chunk i = blob[off[i]:off[i + 1]])
+    meta blob     (UTF-8 JSON per chunk)
+
+Nothing is decoded on open; a chunk's text is sliced out of the mapping only
+when it is read, and the pages are shared between processes mapping the same
+file.
+"""
+import json
+import mmap
+import os
+import re
+import struct
+
+import numpy as np
+
+_MAGIC = b"CHNK"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIQ")
+
+
+def _offsets(parts: list[bytes]) -> np.ndarray:
+    offsets = np.zeros(len(parts) + 1, dtype="<i8")
+    if parts:
+        np.cumsum([len(p) for p in parts], out=offsets[1:])
+    return offsets
+
+
+class ChunkStore:
+    def __init__(self, path: str, limit: int | None = None):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a chunk store file")
+
+        pos = _HEADER.size
+        self._text_off = np.frombuffer(self._mm, dtype="<i8", count=count + 1, offset=pos)
+        pos += (count + 1) * 8
+        self._meta_off = np.frombuffer(self._mm, dtype="<i8", count=count + 1, offset=pos)
+        pos += (count + 1) * 8
+        self._text_base = pos
+        self._meta_base = pos + int(self._text_off[-1])
+        self._count = count if limit is None else min(count, limit)
+
+    def __len__(self):
+        return self._count
+
+    def text(self, i: int) -> str:
+        a = self._text_base + int(self._text_off[i])
+        b = self._text_base + int(self._text_off[i + 1])
+        return self._mm[a:b].decode("utf-8")
+
+    def metadata(self, i: int) -> dict:
+        a = self._meta_base + int(self._meta_off[i])
+        b = self._meta_base + int(self._meta_off[i + 1])
+        return json.loads(self._mm[a:b]) if b > a else {}
+
+    def raw_columns(self) -> tuple[memoryview, np.ndarray, memoryview, np.ndarray]:
+        """(text blob, text offsets, meta blob, meta offsets) for the visible chunks."""
+        n = self._count
+        view = memoryview(self._mm)
+        return (
+            view[self._text_base:self._text_base + int(self._text_off[n])],
+            np.array(self._text_off[:n + 1]),
+            view[self._meta_base:self._meta_base + int(self._meta_off[n])],
+            np.array(self._meta_off[:n + 1]),
+        )
+
+    def count_metadata(self, key: str, value) -> int:
+        """
+        Number of visible chunks whose metadata has key == value, matched in
+        the raw JSON (top-level keys, as written by json.dumps) without
+        decoding any chunk.
+        """
+        _, _, meta, _ = self.raw_columns()
+        pattern = re.compile(re.escape(f'"{key}": {json.dumps(value)}'.encode("utf-8")) + rb"[,}]")
+        return sum(1 for _ in pattern.finditer(meta))
+
+    @staticmethod
+    def write(path: str, texts: list[str], metadatas: list[dict], base: "ChunkStore | None" = None):
+        """
+        Write base's chunks followed by texts/metadatas to path atomically.
+        Base columns are copied as raw bytes, without decoding.
+        """
+        text_parts = [t.encode("utf-8") for t in texts]
+        meta_parts = [json.dumps(m).encode("utf-8") if m else b"" for m in metadatas]
+        text_off = _offsets(text_parts)
+        meta_off = _offsets(meta_parts)
+        base_text, base_meta = b"", b""
+        if base is not None and len(base):
+            base_text, base_text_off, base_meta, base_meta_off = base.raw_columns()
+            text_off = np.concatenate([base_text_off[:-1], text_off + len(base_text)])
+            meta_off = np.concatenate([base_meta_off[:-1], meta_off + len(base_meta)])
+
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(text_off) - 1))
+            f.write(text_off.astype("<i8").tobytes())
+            f.write(meta_off.astype("<i8").tobytes())
+            f.write(base_text)
+            f.write(b"".join(text_parts))
+            f.write(base_meta)
+            f.write(b"".join(meta_parts))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
@@ -0,0 +1,132 @@
+# backend/app/services/chunker.py
+"""
+Structure-preserving chunker.
+
+Pages are split into lines and lines are never cut (a table row stays in
+one chunk) unless a single line is longer than the whole budget. Chunks are
+sized by tokenizer token count and:
+  - end at every section heading (Capital Calls, Distributions, ...)
+  - end at a page break once they are at least half full
+  - repeat the section heading and column header line at the top of a
+    continuation chunk, followed by up to CHUNK_OVERLAP_TOKENS of the
+    previous chunk's last lines
+Chunks are yielded as soon as they are complete, with page and section
+metadata.
+"""
+from typing import Iterable, Iterator, NamedTuple
+
+from app.core.config import settings
+from app.services.embeddings import count_tokens
+from app.services.table_parser import section_heading
+
+
+class Chunk(NamedTuple):
+    text: str
+    metadata: dict
+
+
+def _is_column_header(line: str) -> bool:
+    words = line.split()
+    return len(words) >= 2 and not any(c.isdigit() for c in line)
+
+
+def _split_long_line(line: str, max_tokens: int) -> list[tuple[str, int]]:
+    """Word windows of at most max_tokens tokens."""
+    pieces, words, tokens = [], [], 0
+    for word in line.split():
+        n = count_tokens(word + " ")
+        if words and tokens + n > max_tokens:
+            pieces.append(" ".join(words))
+            words, tokens = [], 0
+        words.append(word)
+        tokens += n
+    if words:
+        pieces.append(" ".join(words))
+    return [(p, count_tokens(p)) for p in pieces]
+
+
+def iter_chunks(pages: Iterable, max_tokens: int | None = None,
+                overlap_tokens: int | None = None, base_metadata: dict | None = None) -> Iterator[Chunk]:
+    """
+    Chunk PageText-like objects (.number, .text) lazily. Each chunk's
+    metadata has page_start, page_end and section, plus base_metadata.
+    """
+    max_tokens = max_tokens or settings.CHUNK_MAX_TOKENS
+    overlap = settings.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+    base_metadata = base_metadata or {}
+
+    buf: list[tuple[str, int, int]] = []  # (line, tokens, page)
+    buf_tokens = 0
+    carried = 0  # leading entries of buf repeated from the previous chunk
+    section = None
+    preamble: list[tuple[str, int, int]] = []  # heading (+ column header) of the section
+    expect_header = False
+
+    def flush(carry: bool) -> Chunk | None:
+        nonlocal buf, buf_tokens, carried
+        chunk = None
+        if len(buf) > carried:
+            fresh = buf[carried:]
+            chunk = Chunk("\n".join(line for line, _, _ in buf), {
+                **base_metadata,
+                "page_start": fresh[0][2],
+                "page_end": fresh[-1][2],
+                "section": section,
+            })
+        keep = []
+        if carry and chunk is not None:
+            keep = list(preamble)
+            budget = overlap
+            tail = []
+            for item in reversed(buf[carried:]):
+                if item in preamble or item[1] > budget:
+                    break
+                tail.insert(0, item)
+                budget -= item[1]
+            keep += tail
+        buf, carried = keep, len(keep)
+        buf_tokens = sum(t for _, t, _ in buf)
+        return chunk
+
+    for page in pages:
+        if buf_tokens - sum(t for _, t, _ in buf[:carried]) >= max_tokens // 2:
+            chunk = flush(carry=True)
+            if chunk:
+                yield chunk
+        for raw in (page.text or "").splitlines():
+            line = raw.strip()
+            if not line:
+                continue
+            heading = section_heading(line)
+            if heading:
+                chunk = flush(carry=False)
+                if chunk:
+                    yield chunk
+                section = heading
+                expect_header = True
+                n = count_tokens(line)
+                preamble = [(line, n, page.number)]
+                buf, buf_tokens, carried = [(line, n, page.number)], n, 0
+                continue
+            if expect_header:
+                expect_header = False
+                if _is_column_header(line):
+                    preamble.append((line, count_tokens(line), page.number))
+
+            n = count_tokens(line)
+            items = _split_long_line(line, max_tokens) if n > max_tokens else [(line, n)]
+            for text, n in items:
+                if buf_tokens + n > max_tokens and len(buf) > carried:
+                    chunk = flush(carry=True)
+                    if chunk:
+                        yield chunk
+                    # the preamble/overlap must leave room for the line
+                    while buf and buf_tokens + n > max_tokens:
+                        buf_tokens -= buf.pop()[1]
+                        carried = min(carried, len(buf))
+                buf.append((text, n, page.number))
+                buf_tokens += n
+
+    chunk = flush(carry=False)
+    if chunk:
+        yield chunk
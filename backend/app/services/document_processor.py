@@ -1,20 +1,114 @@
+import hashlib
+import itertools
 import os
-import pdfplumber
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from app.core.config import settings
 from app.db.session import SessionLocal
 from app.models.document import Document
-from app.models.transaction import CapitalCall, Distribution, Adjustment
 from app.services.embeddings import generate_embeddings
-from app.services.vector_store import VectorStore
+from app.services.vector_store import get_vector_store
 from app.services.table_parser import parse_financial_tables
+from app.services.transaction_loader import bulk_insert_transactions
+from app.services.pdf_extractor import iter_pages
+from app.services.ingest_pipeline import run_pipeline
+from app.services.chunker import iter_chunks
+from app.services.metrics_cache import metrics_cache
+from app.services.answer_cache import answer_cache
 
-UPLOAD_DIR = "/app/uploads"
 
+def stage_of(status: str | None) -> str | None:
+    """Stage of a "processing:<stage>" / "retrying:<stage>" parsing_status."""
+    if status and ":" in status:
+        return status.split(":", 1)[1]
+    return None
 
-def parse_document_async(document_id: int):
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _set_status(db, doc, status: str):
+    doc.parsing_status = status
+    db.add(doc)
+    db.commit()
+    print(f"[DEBUG] Document {doc.id}: {status}")
+
+
+def _batched(items, size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _embed_batches(chunks):
+    """
+    Yield (batch, embeddings) for batches of INGEST_EMBED_BATCH_CHUNKS
+    chunks, in order, with up to EMBEDDING_MAX_WORKERS requests in flight.
+    """
+    workers = max(1, settings.EMBEDDING_MAX_WORKERS)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest-embed") as pool:
+        try:
+            for batch in _batched(chunks, settings.INGEST_EMBED_BATCH_CHUNKS):
+                pending.append((batch, pool.submit(generate_embeddings, [c.text for c in batch])))
+                if len(pending) >= workers:
+                    batch, future = pending.popleft()
+                    yield batch, future.result()
+            while pending:
+                batch, future = pending.popleft()
+                yield batch, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def _store_transactions(document_id: int, fund_id: int | None, pages: list, source_document: str):
+    """Parse statement tables and store their rows (own session: runs in the parse stage thread)."""
+    db = SessionLocal()
+    try:
+        doc = db.get(Document, document_id)
+        if fund_id:
+            _set_status(db, doc, "processing:parsing_tables")
+            full_text = "\n".join(p.text for p in pages if p.text)
+            tables = [t for p in pages for t in (p.tables or [])]
+            parsed_data = parse_financial_tables(full_text, tables)
+            inserted, total = bulk_insert_transactions(
+                db, fund_id, parsed_data, source_document=source_document
+            )
+            db.commit()
+            print(f"[DEBUG] Document {document_id}: stored {inserted} of {total} transactions ({total - inserted} already present)")
+            if inserted == total:
+                metrics_cache.apply_transactions(fund_id, parsed_data)
+            elif inserted:
+                # only some rows were new; reload the fund's metrics on next read
+                metrics_cache.invalidate(fund_id)
+            if inserted:
+                answer_cache.bump(fund_id)
+        # from here on a retry does not store the transactions again
+        _set_status(db, doc, "processing:embedding")
+    finally:
+        db.close()
+
+
+def parse_document_async(document_id: int, raise_errors: bool = False):
     """
     Extract text from a PDF, detect financial tables, store them in DB,
     then embed text chunks into FAISS vector store.
+
+    Progress is written to parsing_status. A job resumed after a retry or a
+    worker crash does not store the document's transactions a second time.
+    With raise_errors the exception is re-raised and the status is left at
+    the failed stage for the caller (the ingestion task) to decide on.
     """
     db = SessionLocal()
     doc = None
@@ -28,95 +122,71 @@ def parse_document_async(document_id: int):
         if not file_path or not os.path.exists(file_path):
             raise FileNotFoundError(file_path or "None")
 
-        # === Extract full text using pdfplumber ===
-        full_text_parts = []
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    full_text_parts.append(text)
-        full_text = "\n".join(full_text_parts)
-
-        # === [NEW] Parse tables from the extracted text ===
-        parsed_data = parse_financial_tables(full_text)
-
-        # === [NEW] Store parsed results into corresponding tables ===
-        if doc.fund_id:
-            if parsed_data.get("capital_calls"):
-                for item in parsed_data["capital_calls"]:
-                    db.add(CapitalCall(
-                        fund_id=doc.fund_id,
-                        call_date=datetime.strptime(item["call_date"], "%Y-%m-%d").date(),
-                        call_type=item.get("call_type"),
-                        amount=item["amount"],
-                        description=item.get("description")
-                    ))
-            if parsed_data.get("distributions"):
-                for item in parsed_data["distributions"]:
-                    db.add(Distribution(
-                        fund_id=doc.fund_id,
-                        distribution_date=datetime.strptime(item["distribution_date"], "%Y-%m-%d").date(),
-                        distribution_type=item.get("distribution_type"),
-                        is_recallable=item.get("is_recallable", False),
-                        amount=item["amount"],
-                        description=item.get("description")
-                    ))
-            if parsed_data.get("adjustments"):
-                for item in parsed_data["adjustments"]:
-                    db.add(Adjustment(
-                        fund_id=doc.fund_id,
-                        adjustment_date=datetime.strptime(item["adjustment_date"], "%Y-%m-%d").date(),
-                        adjustment_type=item.get("adjustment_type"),
-                        category=item.get("category"),
-                        amount=item["amount"],
-                        is_contribution_adjustment=item.get("is_contribution_adjustment", False),
-                        description=item.get("description")
-                    ))
-            db.commit()
-
-        # === Split text into chunks ===
-        chunks = chunk_text(full_text)
-        if not chunks:
-            raise ValueError("No text extracted from PDF")
-
-        # === Generate embeddings ===
-        embeddings = generate_embeddings(chunks)
-
-        # === Store in FAISS vector DB (persist by fund_id) ===
-        vs = VectorStore(index_name=f"fund_{doc.fund_id or 'global'}")
-        vs.add_texts(chunks, embeddings)
+        resumed_at = stage_of(doc.parsing_status)
+        tables_stored = resumed_at == "embedding"
+        fund_id = doc.fund_id
+        # uploads record their hash; older documents are hashed here
+        source_document = doc.content_hash or _file_sha256(file_path)
+        vs = get_vector_store(f"fund_{fund_id or 'global'}")
+        # chunks are deterministic and indexed in order: skip the ones a
+        # previous attempt already added
+        already_indexed = vs.count_document_chunks(doc.id) if resumed_at else 0
+        if not tables_stored:
+            # keep the resumed stage recorded until it is passed again
+            _set_status(db, doc, "processing:extracting")
+
+        # === extract -> parse -> chunk -> embed -> index, as overlapping stages ===
+        def extract():
+            return iter_pages(file_path, tables=settings.PDF_EXTRACT_TABLES and not tables_stored)
+
+        def parse(pages):
+            # pages pass straight through; tables are parsed and stored once
+            # the last page is in
+            seen = []
+            for page in pages:
+                seen.append(page)
+                yield page
+            if not any(p.text for p in seen):
+                raise ValueError("No text extracted from PDF")
+            if not tables_stored:
+                _store_transactions(document_id, fund_id, seen, source_document)
+
+        def chunk(pages):
+            chunks = iter_chunks(pages, base_metadata={"document_id": document_id})
+            return itertools.islice(chunks, already_indexed, None)
+
+        def index(item):
+            batch, embeddings = item
+            vs.add_texts([c.text for c in batch], embeddings, [c.metadata for c in batch])
+
+        stats = run_pipeline(
+            f"document {document_id}",
+            source=("extract", extract),
+            stages=[("parse", parse), ("chunk", chunk), ("embed", _embed_batches)],
+            sink=("index", index),
+        )
+        if stats["index"].items:
+            answer_cache.bump(fund_id)
 
         # === Mark parsing done ===
-        doc.parsing_status = "completed"
-        db.add(doc)
-        db.commit()
+        doc.error_message = None
+        _set_status(db, doc, "completed")
 
         return True
 
     except Exception as e:
+        print(f"[ERROR] Document parsing failed for id {document_id}: {e}")
         if doc:
-            doc.parsing_status = "error"
+            db.rollback()
             doc.error_message = str(e)
+            if not raise_errors:
+                doc.parsing_status = "error"
             db.add(doc)
             db.commit()
-        print(f"[ERROR] Document parsing failed for id {document_id}: {e}")
+        if raise_errors:
+            raise
         return False
 
     finally:
         db.close()
 
-
-def chunk_text(text: str, chunk_size: int = 800, overlap: int = 100):
-    """
-    Basic text splitter with overlap.
-    """
-    if not text:
-        return []
-    chunks = []
-    start = 0
-    L = len(text)
-    while start < L:
-        end = min(L, start + chunk_size)
-        chunks.append(text[start:end])
-        start += chunk_size - overlap
-    return chunks
@@ -1,43 +1,278 @@
 # backend/app/services/embeddings.py
+import asyncio
+import hashlib
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from app.core.config import settings
+from app.services.embedding_cache import EmbeddingCache
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 1536
 
 try:
-    from openai import OpenAI
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
-except TypeError:
+    import openai
+    from openai import OpenAI, AsyncOpenAI
+    # retries are handled per batch below
+    client = OpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        max_retries=0,
+    ) if settings.OPENAI_API_KEY else None
+    aclient = AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        max_retries=0,
+    ) if settings.OPENAI_API_KEY else None
+except (TypeError, ImportError):
     import openai
     openai.api_key = settings.OPENAI_API_KEY
     client = None  # fallback mode
+    aclient = None
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception as e:
+    # chunk sizes and batch budgets are then estimates, not token counts
+    print(f"[WARN] tiktoken unavailable ({e}); estimating token counts at ~4 chars/token")
+    _encoding = None
+
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def count_tokens(text: str) -> int:
+    """cl100k_base token count (tiktoken), or a ~4 chars/token estimate if it cannot be loaded."""
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+_cache = None
+_cache_disabled = False
+
+
+def get_embedding_cache() -> EmbeddingCache | None:
+    global _cache, _cache_disabled
+    if _cache is None and not _cache_disabled:
+        if not settings.EMBEDDING_CACHE_PATH:
+            _cache_disabled = True
+            return None
+        try:
+            _cache = EmbeddingCache(settings.EMBEDDING_CACHE_PATH)
+        except Exception as e:
+            print(f"[WARN] Embedding cache unavailable: {e}")
+            _cache_disabled = True
+    return _cache
+
+
+def _cache_model() -> str:
+    """Cache namespace: fake vectors must never be served as the real model's."""
+    return f"{settings.EMBEDDING_PROVIDER}:{EMBEDDING_MODEL}"
+
+
+def _fake_embeddings(texts: list[str]) -> list[list[float]]:
+    """Deterministic unit vectors derived from the text hash (EMBEDDING_PROVIDER=fake)."""
+    vectors = []
+    for t in texts:
+        seed = int.from_bytes(hashlib.sha256(t.encode("utf-8")).digest()[:8], "little")
+        v = np.random.default_rng(seed).standard_normal(EMBEDDING_DIM).astype(np.float32)
+        vectors.append((v / np.linalg.norm(v)).tolist())
+    return vectors
+
+
+def _request_embeddings(texts: list[str]) -> list[list[float]]:
+    if settings.EMBEDDING_PROVIDER == "fake":
+        return _fake_embeddings(texts)
+
+    if client:
+        response = client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=texts
+        )
+        return [item.embedding for item in response.data]
+
+    response = openai.Embedding.create(
+        model=EMBEDDING_MODEL,
+        input=texts
+    )
+    return [d["embedding"] for d in response["data"]]
+
+
+def _plan_batches(texts: list[str]) -> list[tuple[int, int]]:
+    """Split texts into contiguous [start, end) ranges within the token and input budgets."""
+    batches = []
+    start, tokens = 0, 0
+    for i, t in enumerate(texts):
+        n = count_tokens(t)
+        full = i > start and (
+            tokens + n > settings.EMBEDDING_BATCH_TOKENS
+            or i - start >= settings.EMBEDDING_BATCH_SIZE
+        )
+        if full:
+            batches.append((start, i))
+            start, tokens = i, 0
+        tokens += n
+    if start < len(texts):
+        batches.append((start, len(texts)))
+    return batches
+
+
+def _retry_delay(error: Exception, attempt: int) -> float | None:
+    """Seconds to wait before retrying, or None if the error is not retryable."""
+    status = getattr(error, "status_code", None)
+    retryable = (
+        status in _RETRYABLE_STATUS
+        or isinstance(error, (openai.APIConnectionError, openai.APITimeoutError))
+    )
+    if not retryable:
+        return None
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        if retry_after is not None:
+            return min(max(0.0, float(retry_after)), settings.EMBEDDING_RETRY_AFTER_MAX)
+    except ValueError:
+        pass
+    # exponential backoff with full jitter
+    return random.uniform(0, min(60.0, settings.EMBEDDING_RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def _checked(texts: list[str], embeddings: list) -> list:
+    if len(embeddings) != len(texts):
+        raise RuntimeError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+    return embeddings
+
+
+def _take_split(error: Exception, texts: list[str], splits: list[int]) -> bool:
+    """
+    Whether a failed batch should be halved: a 400 (likely over the
+    per-request limit) on more than one input, while the shared budget of
+    EMBEDDING_MAX_SPLITS lasts. Uses up one split if so.
+    """
+    if getattr(error, "status_code", None) != 400 or len(texts) <= 1 or splits[0] <= 0:
+        return False
+    splits[0] -= 1
+    return True
+
+
+def _embed_batch(texts: list[str], splits: list[int] | None = None) -> list[list[float]]:
+    """
+    Embed one batch, retrying only this batch on transient errors. A batch
+    rejected with 400 is halved, at most EMBEDDING_MAX_SPLITS times in all
+    (`splits` is the budget shared by its halves); a single input that still
+    gets a 400 is an error.
+    """
+    if splits is None:
+        splits = [settings.EMBEDDING_MAX_SPLITS]
+    attempt = 0
+    while True:
+        try:
+            return _checked(texts, _request_embeddings(texts))
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None and _take_split(e, texts, splits):
+                mid = len(texts) // 2
+                return _embed_batch(texts[:mid], splits) + _embed_batch(texts[mid:], splits)
+            if delay is None or attempt >= settings.EMBEDDING_MAX_RETRIES:
+                raise
+            attempt += 1
+            print(f"[WARN] Embedding batch of {len(texts)} failed ({e}); retry {attempt} in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def _embed_concurrently(texts: list[str]) -> list[list[float]]:
+    """Embed texts in token-budgeted batches on a bounded pool, preserving order."""
+    batches = _plan_batches(texts)
+    if len(batches) == 1:
+        return _embed_batch(texts)
+    print(f"[DEBUG] Embedding {len(texts)} text(s) in {len(batches)} batches...")
+    workers = max(1, min(settings.EMBEDDING_MAX_WORKERS, len(batches)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(lambda b: _embed_batch(texts[b[0]:b[1]]), batches)
+        return [e for part in parts for e in part]
+
 
 def generate_embeddings(texts: list[str]) -> list[list[float]]:
-    if not settings.OPENAI_API_KEY:
+    if settings.EMBEDDING_PROVIDER != "fake" and not settings.OPENAI_API_KEY:
         raise RuntimeError("OPENAI_API_KEY not configured in .env")
 
     print(f"[DEBUG] Generating embeddings for {len(texts)} text(s)...")
 
-    try:
-        if client:
-            print("[DEBUG] Using new OpenAI client...")
-            response = client.embeddings.create(
-                model="text-embedding-3-small",
-                input=texts
-            )
-            print("[DEBUG] Response received from OpenAI API.")
-            embeddings = [item.embedding for item in response.data]
-        else:
-            print("[DEBUG] Using legacy OpenAI API...")
-            response = openai.Embedding.create(
-                model="text-embedding-3-small",
-                input=texts
-            )
-            print("[DEBUG] Response received from legacy API.")
-            embeddings = [d["embedding"] for d in response["data"]]
-
-        print(f"[DEBUG] Generated {len(embeddings)} embeddings successfully.")
-        return embeddings
-
-    except Exception as e:
-        import traceback
-        print(f"[ERROR] Failed to generate embeddings: {e}")
-        traceback.print_exc()
-        return []
+    # identical texts (repeated pages, boilerplate) are embedded once
+    unique = list(dict.fromkeys(texts))
+    cache = get_embedding_cache()
+    cached = cache.get_many(_cache_model(), unique) if cache else [None] * len(unique)
+    vectors = {t: v for t, v in zip(unique, cached) if v is not None}
+
+    missing = [t for t in unique if t not in vectors]
+    if missing:
+        fresh = _embed_concurrently(missing)
+        if cache:
+            try:
+                cache.put_many(_cache_model(), missing, fresh)
+            except Exception as e:
+                print(f"[WARN] Failed to store embeddings in cache: {e}")
+        vectors.update(zip(missing, fresh))
+
+    print(f"[DEBUG] Generated {len(texts)} embeddings ({len(unique) - len(missing)} cached, {len(missing)} requested).")
+    return [v.tolist() if isinstance(v, np.ndarray) else v for v in (vectors[t] for t in texts)]
+
+
+async def _arequest_embeddings(texts: list[str]) -> list[list[float]]:
+    if settings.EMBEDDING_PROVIDER == "fake":
+        return _fake_embeddings(texts)
+    response = await aclient.embeddings.create(model=EMBEDDING_MODEL, input=texts)
+    return [item.embedding for item in response.data]
+
+
+async def _aembed_batch(texts: list[str], splits: list[int] | None = None) -> list[list[float]]:
+    """_embed_batch on the async client."""
+    if splits is None:
+        splits = [settings.EMBEDDING_MAX_SPLITS]
+    attempt = 0
+    while True:
+        try:
+            return _checked(texts, await _arequest_embeddings(texts))
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None and _take_split(e, texts, splits):
+                mid = len(texts) // 2
+                return await _aembed_batch(texts[:mid], splits) + await _aembed_batch(texts[mid:], splits)
+            if delay is None or attempt >= settings.EMBEDDING_MAX_RETRIES:
+                raise
+            attempt += 1
+            print(f"[WARN] Embedding batch of {len(texts)} failed ({e}); retry {attempt} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def agenerate_embeddings(texts: list[str]) -> list[list[float]]:
+    """generate_embeddings on the async client, for the chat query path."""
+    if settings.EMBEDDING_PROVIDER != "fake" and aclient is None:
+        return await asyncio.to_thread(generate_embeddings, texts)
+
+    unique = list(dict.fromkeys(texts))
+    # the SQLite cache blocks (up to its 30s lock timeout): keep it off the event loop
+    cache = await asyncio.to_thread(get_embedding_cache)
+    cached = await asyncio.to_thread(cache.get_many, _cache_model(), unique) if cache else [None] * len(unique)
+    vectors = {t: v for t, v in zip(unique, cached) if v is not None}
+
+    missing = [t for t in unique if t not in vectors]
+    if missing:
+        limit = asyncio.Semaphore(settings.EMBEDDING_MAX_WORKERS)
+
+        async def run(start, end):
+            async with limit:
+                return await _aembed_batch(missing[start:end])
+
+        parts = await asyncio.gather(*(run(a, b) for a, b in _plan_batches(missing)))
+        fresh = [e for part in parts for e in part]
+        if cache:
+            try:
+                await asyncio.to_thread(cache.put_many, _cache_model(), missing, fresh)
+            except Exception as e:
+                print(f"[WARN] Failed to store embeddings in cache: {e}")
+        vectors.update(zip(missing, fresh))
+
+    return [v.tolist() if isinstance(v, np.ndarray) else v for v in (vectors[t] for t in texts)]
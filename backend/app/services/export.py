@@ -0,0 +1,220 @@
+# backend/app/services/export.py
+"""
+Streaming bulk export of fund transactions and metrics.
+
+Transactions are read with one UNION ALL over the three transaction tables
+(ordered by fund, date, source, id) through a server-side cursor
+(yield_per -> stream_results), EXPORT_BATCH_ROWS rows at a time, and each
+batch is encoded and yielded before the next is fetched. Memory therefore
+stays at one batch however many rows a fund has.
+
+Formats:
+  ndjson  one JSON object per line
+  csv     header row + one line per row
+  arrow   Arrow IPC stream, one record batch per fetched batch (columnar,
+          readable with pyarrow / pandas / polars / DuckDB); needs pyarrow
+"""
+import csv
+import itertools
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import select, literal, null, union_all, cast, Boolean, String
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.transaction import CapitalCall, Distribution, Adjustment
+from app.services.metrics_calculator import list_fund_ids
+from app.services.metrics_cache import metrics_cache
+
+try:
+    import pyarrow as pa
+except Exception:  # optional dependency
+    pa = None
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+TRANSACTION_COLUMNS = (
+    "source", "id", "fund_id", "date", "type", "amount", "description",
+    "is_recallable", "category", "is_contribution_adjustment", "source_document",
+)
+
+# funds per get_portfolio call in the metrics export
+_METRICS_BATCH = 500
+
+
+def format_available(fmt: str) -> bool:
+    return fmt in FORMATS and (fmt != "arrow" or pa is not None)
+
+
+def _transactions_query(fund_id: int | None):
+    def branch(rank, source, model, date_col, type_col, recallable, category, contribution):
+        stmt = select(
+            literal(rank).label("rank"),
+            literal(source).label("source"),
+            model.id.label("id"),
+            model.fund_id.label("fund_id"),
+            date_col.label("date"),
+            type_col.label("type"),
+            model.amount.label("amount"),
+            model.description.label("description"),
+            recallable.label("is_recallable"),
+            category.label("category"),
+            contribution.label("is_contribution_adjustment"),
+            model.source_document.label("source_document"),
+        )
+        return stmt.where(model.fund_id == fund_id) if fund_id is not None else stmt
+
+    # typed NULLs: the first branch sets the column types of the union
+    no_bool, no_text = cast(null(), Boolean), cast(null(), String)
+    u = union_all(
+        branch(0, "capital_call", CapitalCall, CapitalCall.call_date, CapitalCall.call_type,
+               no_bool, no_text, no_bool),
+        branch(1, "distribution", Distribution, Distribution.distribution_date, Distribution.distribution_type,
+               Distribution.is_recallable, no_text, no_bool),
+        branch(2, "adjustment", Adjustment, Adjustment.adjustment_date, Adjustment.adjustment_type,
+               no_bool, Adjustment.category, Adjustment.is_contribution_adjustment),
+    ).subquery()
+    return select(*(u.c[name] for name in TRANSACTION_COLUMNS)).order_by(u.c.fund_id, u.c.date, u.c.rank, u.c.id)
+
+
+def _iter_transaction_batches(fund_id: int | None):
+    """Lists of row tuples (TRANSACTION_COLUMNS order) straight from a server-side cursor."""
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            _transactions_query(fund_id).execution_options(yield_per=settings.EXPORT_BATCH_ROWS)
+        )
+        for batch in result.partitions():
+            yield batch
+    finally:
+        db.close()
+
+
+def _iter_metrics_batches(fund_ids: list[int] | None):
+    """Lists of portfolio metric rows, _METRICS_BATCH funds at a time."""
+    fund_ids = sorted(set(fund_ids)) if fund_ids is not None else list_fund_ids()
+    for start in range(0, len(fund_ids), _METRICS_BATCH):
+        db = SessionLocal()
+        try:
+            yield metrics_cache.get_portfolio(fund_ids[start:start + _METRICS_BATCH], db=db)
+        finally:
+            db.close()
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def _encode_ndjson(columns, batches):
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in batch
+        ).encode("utf-8")
+
+
+def _encode_csv(columns, batches):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+class _Drain:
+    """Write-only file object collecting what the Arrow writer emits until taken."""
+
+    closed = False
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def write(self, data) -> int:
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def _transaction_schema():
+    return pa.schema([
+        ("source", pa.string()),
+        ("id", pa.int64()),
+        ("fund_id", pa.int64()),
+        ("date", pa.date32()),
+        ("type", pa.string()),
+        ("amount", pa.decimal128(15, 2)),
+        ("description", pa.string()),
+        ("is_recallable", pa.bool_()),
+        ("category", pa.string()),
+        ("is_contribution_adjustment", pa.bool_()),
+        ("source_document", pa.string()),
+    ])
+
+
+def _encode_arrow(columns, batches, schema=None):
+    drain = _Drain()
+    writer = None
+    for batch in batches:
+        data = {name: [row[i] for row in batch] for i, name in enumerate(columns)}
+        if writer is None:
+            # metrics rows: the schema is inferred from the first batch
+            schema = schema or pa.RecordBatch.from_pydict(data).schema
+            writer = pa.ipc.new_stream(pa.PythonFile(drain, mode="w"), schema)
+        writer.write_batch(pa.RecordBatch.from_pydict(data, schema=schema))
+        yield drain.take()
+    if writer is None:
+        writer = pa.ipc.new_stream(pa.PythonFile(drain, mode="w"), schema or pa.schema([]))
+    writer.close()
+    yield drain.take()
+
+
+_ENCODERS = {"ndjson": _encode_ndjson, "csv": _encode_csv, "arrow": _encode_arrow}
+
+
+def export_transactions(fund_id: int | None, fmt: str):
+    """Byte chunks of every transaction (of one fund, or of all funds) in `fmt`."""
+    batches = _iter_transaction_batches(fund_id)
+    if fmt == "arrow":
+        return _encode_arrow(TRANSACTION_COLUMNS, batches, _transaction_schema())
+    return _ENCODERS[fmt](TRANSACTION_COLUMNS, batches)
+
+
+def export_metrics(fund_ids: list[int] | None, fmt: str):
+    """Byte chunks of the portfolio metrics of the given (default: all) funds in `fmt`."""
+    batches = _iter_metrics_batches(fund_ids)
+    first = next(batches, [])
+    columns = tuple(first[0]) if first else ("fund_id",)
+
+    def rows():
+        for batch in itertools.chain([first], batches):
+            if batch:
+                yield [tuple(r.get(c) for c in columns) for r in batch]
+
+    return _ENCODERS[fmt](columns, rows())
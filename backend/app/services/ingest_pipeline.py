@@ -0,0 +1,230 @@
+# backend/app/services/ingest_pipeline.py
+"""
+Staged streaming pipeline for document ingestion.
+
+Every stage but the last runs in its own thread and is connected to the
+next by a bounded queue (INGEST_QUEUE_SIZE items). A stage is a generator
+function: the first one produces items, the middle ones take an iterator
+over their inbox and yield items downstream, and the sink is called for
+every item in the caller's thread. A full queue blocks its producer, so
+memory stays bounded and a document's wall time tends to the slowest
+stage rather than the sum of all of them.
+
+Per-stage counters (items, busy / waiting / blocked seconds) and live
+queue depths are aggregated in pipeline_metrics.
+"""
+import itertools
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator
+
+from app.core.config import settings
+
+_DONE = object()
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.seconds = 0.0
+        self.waiting = 0.0  # blocked on an empty inbox
+        self.blocked = 0.0  # blocked on a full outbox
+
+    @property
+    def busy(self) -> float:
+        return max(0.0, self.seconds - self.waiting - self.blocked)
+
+    def as_dict(self) -> dict:
+        return {
+            "items": self.items,
+            "busy_seconds": round(self.busy, 3),
+            "waiting_seconds": round(self.waiting, 3),
+            "blocked_seconds": round(self.blocked, 3),
+            "items_per_second": round(self.items / self.busy, 2) if self.busy else None,
+        }
+
+
+class PipelineMetrics:
+    """Totals per stage over all runs, plus queue depths of running pipelines."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: dict[str, dict] = {}
+        self._queues: dict[int, dict[str, queue.Queue]] = {}  # run id -> inbox of each stage
+        self._peaks: dict[str, int] = {}
+        self.runs = 0
+        self.failed = 0
+        self.last_run: dict | None = None
+
+    def start(self, run_id: int, queues: dict[str, queue.Queue]):
+        with self._lock:
+            self._queues[run_id] = queues
+
+    def sample(self, run_id: int):
+        with self._lock:
+            for name, q in self._queues.get(run_id, {}).items():
+                self._peaks[name] = max(self._peaks.get(name, 0), q.qsize())
+
+    def finish(self, run_id: int, label: str, stats: list[StageStats], wall: float, ok: bool):
+        with self._lock:
+            self._queues.pop(run_id, None)
+            self.runs += 1
+            self.failed += 0 if ok else 1
+            for s in stats:
+                t = self._totals.setdefault(s.name, {"items": 0, "busy": 0.0, "waiting": 0.0, "blocked": 0.0})
+                t["items"] += s.items
+                t["busy"] += s.busy
+                t["waiting"] += s.waiting
+                t["blocked"] += s.blocked
+            self.last_run = {
+                "label": label,
+                "ok": ok,
+                "wall_seconds": round(wall, 3),
+                "stages": {s.name: s.as_dict() for s in stats},
+            }
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {}
+            for name, t in self._totals.items():
+                stages[name] = {
+                    "items": t["items"],
+                    "busy_seconds": round(t["busy"], 3),
+                    "waiting_seconds": round(t["waiting"], 3),
+                    "blocked_seconds": round(t["blocked"], 3),
+                    "items_per_second": round(t["items"] / t["busy"], 2) if t["busy"] else None,
+                }
+            for queues in self._queues.values():
+                for name, q in queues.items():
+                    stages.setdefault(name, {})
+                    stages[name]["queue_depth"] = stages[name].get("queue_depth", 0) + q.qsize()
+            for name, peak in self._peaks.items():
+                stages.setdefault(name, {})["queue_peak"] = peak
+            return {
+                "active_runs": len(self._queues),
+                "runs": self.runs,
+                "failed_runs": self.failed,
+                "stages": stages,
+                "last_run": self.last_run,
+            }
+
+
+pipeline_metrics = PipelineMetrics()
+_run_ids = itertools.count(1)
+
+
+def _put(q: queue.Queue, item, cancel: threading.Event):
+    while True:
+        if cancel.is_set():
+            raise _Cancelled()
+        try:
+            q.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            pass
+
+
+def _drain(q: queue.Queue, cancel: threading.Event, stats: StageStats, run_id: int) -> Iterator:
+    while True:
+        t0 = time.perf_counter()
+        while True:
+            try:
+                item = q.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if cancel.is_set():
+                    stats.waiting += time.perf_counter() - t0
+                    raise _Cancelled()
+        stats.waiting += time.perf_counter() - t0
+        if item is _DONE:
+            return
+        if cancel.is_set():
+            raise _Cancelled()
+        pipeline_metrics.sample(run_id)
+        yield item
+
+
+def run_pipeline(
+    label: str,
+    source: tuple[str, Callable[[], Iterable]],
+    stages: list[tuple[str, Callable[[Iterator], Iterable]]],
+    sink: tuple[str, Callable],
+    queue_size: int | None = None,
+) -> dict[str, StageStats]:
+    """
+    Run source -> stages... -> sink. Re-raises the first stage error after
+    stopping every other stage. Returns the stats of each stage by name.
+    """
+    size = max(1, queue_size or settings.INGEST_QUEUE_SIZE)
+    run_id = next(_run_ids)
+    cancel = threading.Event()
+    errors: list[BaseException] = []
+    names = [source[0]] + [name for name, _ in stages] + [sink[0]]
+    stats = {name: StageStats(name) for name in names}
+    # inbox of every stage after the source
+    inboxes = {name: queue.Queue(maxsize=size) for name in names[1:]}
+    pipeline_metrics.start(run_id, inboxes)
+
+    def run_stage(name: str, produce: Callable[[], Iterable], outbox: queue.Queue):
+        s = stats[name]
+        t0 = time.perf_counter()
+        try:
+            for item in produce():
+                s.items += 1
+                b = time.perf_counter()
+                _put(outbox, item, cancel)
+                s.blocked += time.perf_counter() - b
+            _put(outbox, _DONE, cancel)
+        except _Cancelled:
+            pass
+        except BaseException as e:
+            errors.append(e)
+            cancel.set()
+        finally:
+            s.seconds = time.perf_counter() - t0
+
+    threads = [threading.Thread(
+        target=run_stage, args=(source[0], source[1], inboxes[names[1]]),
+        name=f"ingest-{source[0]}", daemon=True,
+    )]
+    for i, (name, fn) in enumerate(stages):
+        inbox, outbox = inboxes[name], inboxes[names[i + 2]]
+        produce = (lambda fn=fn, inbox=inbox, name=name: fn(_drain(inbox, cancel, stats[name], run_id)))
+        threads.append(threading.Thread(
+            target=run_stage, args=(name, produce, outbox), name=f"ingest-{name}", daemon=True,
+        ))
+
+    wall = time.perf_counter()
+    for t in threads:
+        t.start()
+
+    sink_name, consume = sink
+    s = stats[sink_name]
+    t0 = time.perf_counter()
+    try:
+        for item in _drain(inboxes[sink_name], cancel, s, run_id):
+            consume(item)
+            s.items += 1
+    except _Cancelled:
+        pass
+    except BaseException as e:
+        errors.append(e)
+        cancel.set()
+    finally:
+        s.seconds = time.perf_counter() - t0
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - wall
+        pipeline_metrics.finish(run_id, label, list(stats.values()), wall, ok=not errors)
+
+    summary = ", ".join(f"{n} {st.items} in {st.busy:.2f}s" for n, st in stats.items())
+    print(f"[DEBUG] Pipeline {label}: {wall:.2f}s wall ({summary})")
+    if errors:
+        raise errors[0]
+    return stats
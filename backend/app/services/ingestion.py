@@ -0,0 +1,93 @@
+# backend/app/services/ingestion.py
+"""
+Document ingestion jobs.
+
+Uploads are queued on the "ingestion" Celery queue and parsed by separate
+worker processes. Transient failures (database/network/provider errors) are
+retried with exponential backoff; the document's parsing_status shows the
+current stage ("queued", "processing:<stage>", "retrying:<stage>",
+"completed" or "error").
+"""
+import random
+
+import openai
+from fastapi import BackgroundTasks
+from sqlalchemy.exc import OperationalError
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.document import Document
+from app.services.document_processor import parse_document_async, stage_of
+
+# Redis priority steps, 0 is served first
+PRIORITIES = {"high": 0, "normal": 5, "low": 9}
+
+TRANSIENT_ERRORS = (
+    OperationalError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+def _set_status(document_id: int, status: str, error_message: str | None = None):
+    db = SessionLocal()
+    try:
+        doc = db.get(Document, document_id)
+        if doc:
+            doc.parsing_status = status
+            if error_message is not None:
+                doc.error_message = error_message
+            db.commit()
+    finally:
+        db.close()
+
+
+def _current_stage(document_id: int) -> str:
+    db = SessionLocal()
+    try:
+        doc = db.get(Document, document_id)
+        return (stage_of(doc.parsing_status) if doc else None) or "extracting"
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, name="ingestion.parse_document", max_retries=settings.INGEST_MAX_RETRIES)
+def parse_document_task(self, document_id: int):
+    try:
+        parse_document_async(document_id, raise_errors=True)
+    except TRANSIENT_ERRORS as e:
+        if self.request.retries >= self.max_retries:
+            _set_status(document_id, "error", f"Gave up after {self.request.retries} retries: {e}")
+            raise
+        stage = _current_stage(document_id)
+        _set_status(document_id, f"retrying:{stage}")
+        delay = settings.INGEST_RETRY_BASE_DELAY * 2 ** self.request.retries
+        raise self.retry(exc=e, countdown=random.uniform(delay / 2, delay))
+    except Exception as e:
+        _set_status(document_id, "error", str(e))
+        raise
+
+
+def enqueue_document(document_id: int, priority: str = "normal", background_tasks: BackgroundTasks | None = None):
+    """Queue a document for parsing and mark it "queued"."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority '{priority}', expected one of {list(PRIORITIES)}")
+    _set_status(document_id, "queued")
+
+    if celery_app.conf.task_always_eager:
+        # in-process stand-in: still run after the response when called from a request
+        if background_tasks is not None:
+            background_tasks.add_task(parse_document_task.apply, args=(document_id,))
+        else:
+            parse_document_task.apply(args=(document_id,))
+        return
+
+    parse_document_task.apply_async(
+        args=(document_id,),
+        queue="ingestion",
+        priority=PRIORITIES[priority],
+    )
@@ -0,0 +1,184 @@
+# backend/app/services/lexical_index.py
+"""
+BM25 inverted index over a vector store's chunks.
+
+Postings are kept as flat integer arrays: a compacted CSR part
+(term_ptr / doc ids / term frequencies as numpy arrays, loaded from
+{name}.bm25) plus per-term array('i') tails for chunks added since. Doc ids
+are the chunks' positions in the vector store, so postings are appended in
+increasing order and never need sorting. compact() folds the tails into a
+new CSR part.
+
+Scores of different indexes are only comparable under the same statistics:
+search() can take corpus-wide ones (summed term_stats() of every index
+searched) instead of the index's own.
+
+Tokens keep the things embeddings blur: ISO dates stay one token
+("2023-06-30"), amounts are normalized ("$1,000,000.00" -> "1000000"), and
+words are lowercased ("Call 3" -> "call", "3").
+"""
+import math
+import os
+import re
+from array import array
+from collections import Counter
+
+import numpy as np
+
+_TOKEN = re.compile(r"\d{4}-\d{2}-\d{2}|\d[\d,]*(?:\.\d+)?|[^\W\d_]+")
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_K1 = 1.2
+_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for tok in _TOKEN.findall(text.lower()):
+        if tok[0].isdigit() and not _DATE.fullmatch(tok):
+            tok = tok.replace(",", "")
+            if "." in tok:
+                tok = tok.rstrip("0").rstrip(".")
+        tokens.append(tok)
+    return tokens
+
+
+class BM25Index:
+    def __init__(self):
+        self.vocab: dict[str, int] = {}
+        # compacted postings of terms [0, len(_ptr) - 1)
+        self._ptr = np.zeros(1, dtype=np.int64)
+        self._docs = np.zeros(0, dtype=np.int32)
+        self._tfs = np.zeros(0, dtype=np.int32)
+        # postings added since the last compaction: term id -> arrays
+        self._tail_docs: dict[int, array] = {}
+        self._tail_tfs: dict[int, array] = {}
+        self.doc_lens = array("i")
+        self.total_len = 0
+
+    def __len__(self):
+        return len(self.doc_lens)
+
+    def add(self, texts: list[str]):
+        """Index texts as the next doc ids (their positions in the store)."""
+        for text in texts:
+            doc = len(self.doc_lens)
+            counts = Counter(tokenize(text))
+            length = sum(counts.values())
+            self.doc_lens.append(length)
+            self.total_len += length
+            for term, tf in counts.items():
+                tid = self.vocab.setdefault(term, len(self.vocab))
+                docs = self._tail_docs.get(tid)
+                if docs is None:
+                    docs = self._tail_docs[tid] = array("i")
+                    self._tail_tfs[tid] = array("i")
+                docs.append(doc)
+                self._tail_tfs[tid].append(tf)
+
+    def _postings(self, tid: int) -> tuple[np.ndarray, np.ndarray]:
+        parts_docs, parts_tfs = [], []
+        if tid < len(self._ptr) - 1:
+            a, b = self._ptr[tid], self._ptr[tid + 1]
+            parts_docs.append(self._docs[a:b])
+            parts_tfs.append(self._tfs[a:b])
+        if tid in self._tail_docs:
+            parts_docs.append(np.frombuffer(self._tail_docs[tid], dtype=np.int32))
+            parts_tfs.append(np.frombuffer(self._tail_tfs[tid], dtype=np.int32))
+        if len(parts_docs) == 1:
+            return parts_docs[0], parts_tfs[0]
+        return np.concatenate(parts_docs), np.concatenate(parts_tfs)
+
+    def _df(self, tid: int) -> int:
+        df = int(self._ptr[tid + 1] - self._ptr[tid]) if tid < len(self._ptr) - 1 else 0
+        return df + len(self._tail_docs.get(tid, ()))
+
+    def term_stats(self, query: str) -> tuple[int, int, dict[str, int]]:
+        """(doc count, total doc length, document frequency of each query term in this index)."""
+        df = {t: self._df(self.vocab[t]) for t in set(tokenize(query)) if t in self.vocab}
+        return len(self.doc_lens), self.total_len, df
+
+    def search(self, query: str, top_k: int = 10,
+               stats: tuple[int, int, dict[str, int]] | None = None) -> list[tuple[int, float]]:
+        """
+        (doc id, BM25 score) of the best matching docs, best first. IDF and
+        average length come from `stats` (as returned by term_stats, summed
+        over a corpus of indexes) when given, else from this index.
+        """
+        n = len(self.doc_lens)
+        terms = {t: self.vocab[t] for t in set(tokenize(query)) if t in self.vocab}
+        if not n or not terms:
+            return []
+        corpus_n, corpus_len, corpus_df = stats or (n, self.total_len, {})
+        doc_lens = np.frombuffer(self.doc_lens, dtype=np.int32)
+        avgdl = corpus_len / corpus_n or 1.0
+        scores = np.zeros(n, dtype=np.float32)
+        for term, tid in terms.items():
+            docs, tfs = self._postings(tid)
+            df = corpus_df.get(term, len(docs))
+            idf = math.log(1 + (corpus_n - df + 0.5) / (df + 0.5))
+            tf = tfs.astype(np.float32)
+            norm = _K1 * (1 - _B + _B * doc_lens[docs] / avgdl)
+            scores[docs] += idf * tf * (_K1 + 1) / (tf + norm)
+        k = min(top_k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(d), float(scores[d])) for d in top]
+
+    def compact(self):
+        """Fold the tail postings into the CSR arrays."""
+        if not self._tail_docs:
+            return
+        n_terms = len(self.vocab)
+        counts = np.zeros(n_terms, dtype=np.int64)
+        counts[:len(self._ptr) - 1] = np.diff(self._ptr)
+        for tid, docs in self._tail_docs.items():
+            counts[tid] += len(docs)
+        ptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(counts, out=ptr[1:])
+        docs_out = np.empty(ptr[-1], dtype=np.int32)
+        tfs_out = np.empty(ptr[-1], dtype=np.int32)
+        for tid in range(n_terms):
+            docs, tfs = self._postings(tid)
+            docs_out[ptr[tid]:ptr[tid + 1]] = docs
+            tfs_out[ptr[tid]:ptr[tid + 1]] = tfs
+        self._ptr, self._docs, self._tfs = ptr, docs_out, tfs_out
+        self._tail_docs, self._tail_tfs = {}, {}
+
+    def save(self, path: str):
+        self.compact()
+        terms = sorted(self.vocab, key=self.vocab.get)
+        tmp = path + ".tmp.npz"
+        np.savez(
+            tmp,
+            terms=np.array("\n".join(terms).encode("utf-8")),
+            ptr=self._ptr,
+            docs=self._docs,
+            tfs=self._tfs,
+            doc_lens=np.frombuffer(self.doc_lens, dtype=np.int32),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with np.load(path) as data:
+            index = cls()
+            raw = data["terms"].item().decode("utf-8")
+            terms = raw.split("\n") if raw else []
+            index.vocab = {t: i for i, t in enumerate(terms)}
+            index._ptr, index._docs, index._tfs = data["ptr"], data["docs"], data["tfs"]
+            index.doc_lens = array("i", data["doc_lens"].tobytes())
+            index.total_len = int(data["doc_lens"].sum())
+        if len(index._ptr) != len(terms) + 1:
+            raise ValueError(f"{path}: {len(terms)} terms but {len(index._ptr) - 1} posting lists")
+        return index
+
+
+def reciprocal_rank_fusion(rankings: list[list[int]], k: int = 60) -> list[tuple[int, float]]:
+    """Fuse ranked doc id lists: score(d) = sum over lists of 1 / (k + rank)."""
+    scores: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            scores[doc] = scores.get(doc, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
@@ -0,0 +1,315 @@
+# backend/app/services/metrics_cache.py
+"""
+Materialized per-fund metrics, kept in Redis (settings.REDIS_URL) or, when
+Redis is not configured, in process memory.
+
+Two entries are kept per fund:
+  - the full breakdown served by /funds/{id}/metrics and the chat engine
+  - the summary row served by the /funds/metrics batch endpoint
+
+New transactions are merged into a cached breakdown without touching the DB;
+deleting a fund drops both entries.
+
+Each fund also has a generation counter, bumped on every ingest and
+invalidation. A read miss notes the generation before loading from the DB
+and only stores its result if it is unchanged, so metrics computed before
+an ingest committed are not cached after it.
+"""
+import asyncio
+import json
+import threading
+from datetime import date
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.metrics_calculator import (
+    KIND_CALL,
+    KIND_DISTRIBUTION,
+    KIND_ADJUSTMENT,
+    build_breakdown,
+    cashflows_from_rows,
+    fetch_cashflows_async,
+    get_metrics_breakdown,
+    get_portfolio_metrics,
+    list_fund_ids,
+)
+
+BREAKDOWN_KEY = "fund_metrics:{}"
+SUMMARY_KEY = "fund_metrics_summary:{}"
+HITS_KEY = "fund_metrics:stats:hits"
+MISSES_KEY = "fund_metrics:stats:misses"
+GENERATION_KEY = "fund_metrics:gen:{}"
+
+# (breakdown bucket, kind, parsed-data date field, parsed-data type field)
+_BUCKETS = (
+    ("capital_calls", KIND_CALL, "call_date", "call_type"),
+    ("distributions", KIND_DISTRIBUTION, "distribution_date", "distribution_type"),
+    ("adjustments", KIND_ADJUSTMENT, "adjustment_date", "adjustment_type"),
+)
+
+
+def _to_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=str)
+
+
+class _MemoryBackend:
+    name = "memory"
+
+    def __init__(self):
+        self._data = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        with self._lock:
+            return [self._data.get(k) for k in keys]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = value
+
+    def set_if(self, key, value, ttl, guard, expected) -> bool:
+        """set, unless counter `guard` no longer equals `expected`."""
+        with self._lock:
+            if self._counters.get(guard, 0) != expected:
+                return False
+            self._data[key] = value
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            for k in keys:
+                self._data.pop(k, None)
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def counters(self, keys):
+        with self._lock:
+            return [self._counters.get(k, 0) for k in keys]
+
+    def update(self, key, fn, ttl):
+        with self._lock:
+            current = self._data.get(key)
+            if current is not None:
+                self._data[key] = fn(current)
+
+
+class _RedisBackend:
+    name = "redis"
+
+    def __init__(self, url):
+        import redis
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._watch_error = redis.WatchError
+
+    def get_many(self, keys):
+        return self._redis.mget(keys) if keys else []
+
+    def set(self, key, value, ttl):
+        self._redis.set(key, value, ex=ttl or None)
+
+    def set_if(self, key, value, ttl, guard, expected) -> bool:
+        """set, unless counter `guard` no longer equals `expected` (checked under WATCH)."""
+        with self._redis.pipeline() as pipe:
+            try:
+                pipe.watch(guard)
+                if int(pipe.get(guard) or 0) != expected:
+                    return False
+                pipe.multi()
+                pipe.set(key, value, ex=ttl or None)
+                pipe.execute()
+                return True
+            except self._watch_error:
+                return False
+
+    def delete(self, *keys):
+        self._redis.delete(*keys)
+
+    def incr(self, key, amount=1):
+        self._redis.incrby(key, amount)
+
+    def counter(self, key):
+        return int(self._redis.get(key) or 0)
+
+    def counters(self, keys):
+        return [int(v or 0) for v in self._redis.mget(keys)] if keys else []
+
+    def update(self, key, fn, ttl):
+        """Optimistic read-modify-write; drop the entry if another writer races us."""
+        with self._redis.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                current = pipe.get(key)
+                if current is None:
+                    return
+                pipe.multi()
+                pipe.set(key, fn(current), ex=ttl or None)
+                pipe.execute()
+            except self._watch_error:
+                self._redis.delete(key)
+
+
+def open_backend(redis_url: str | None, purpose: str = "metrics cache"):
+    """Redis backend for redis_url, or an in-process one if unset/unavailable."""
+    if redis_url:
+        try:
+            return _RedisBackend(redis_url)
+        except Exception as e:
+            print(f"[WARN] Redis {purpose} unavailable, using in-process cache: {e}")
+    return _MemoryBackend()
+
+
+class MetricsCache:
+    def __init__(self, redis_url: str | None = None, ttl: int = 3600):
+        self.ttl = ttl
+        self.backend = open_backend(redis_url)
+
+    def _count(self, hits: int, misses: int):
+        try:
+            if hits:
+                self.backend.incr(HITS_KEY, hits)
+            if misses:
+                self.backend.incr(MISSES_KEY, misses)
+        except Exception as e:
+            print(f"[WARN] Failed to update metrics cache counters: {e}")
+
+    def _get_many(self, template: str, fund_ids: list[int]) -> dict:
+        try:
+            values = self.backend.get_many([template.format(f) for f in fund_ids])
+        except Exception as e:
+            print(f"[WARN] Metrics cache read failed: {e}")
+            values = [None] * len(fund_ids)
+        found = {f: json.loads(v) for f, v in zip(fund_ids, values) if v is not None}
+        self._count(len(found), len(fund_ids) - len(found))
+        return found
+
+    def _generations(self, fund_ids: list[int]) -> dict:
+        """Current generation of each fund; empty (nothing gets cached) if unreadable."""
+        try:
+            values = self.backend.counters([GENERATION_KEY.format(f) for f in fund_ids])
+        except Exception as e:
+            print(f"[WARN] Metrics cache generation read failed: {e}")
+            return {}
+        return dict(zip(fund_ids, values))
+
+    def _bump(self, fund_id: int):
+        self.backend.incr(GENERATION_KEY.format(fund_id))
+
+    def _set(self, template: str, fund_id: int, value, generation: int | None):
+        """Cache a freshly loaded value unless the fund changed since `generation` was read."""
+        if generation is None:
+            return
+        try:
+            if not self.backend.set_if(template.format(fund_id), _dumps(value), self.ttl,
+                                       GENERATION_KEY.format(fund_id), generation):
+                print(f"[DEBUG] Fund {fund_id} changed while its metrics were loading; not caching them")
+        except Exception as e:
+            print(f"[WARN] Metrics cache write failed for fund {fund_id}: {e}")
+
+    def get_breakdown(self, fund_id: int, db=None) -> dict:
+        """Cached get_metrics_breakdown."""
+        cached = self._get_many(BREAKDOWN_KEY, [fund_id])
+        if fund_id in cached:
+            return cached[fund_id]
+        generation = self._generations([fund_id]).get(fund_id)
+        breakdown = get_metrics_breakdown(fund_id, db=db)
+        self._set(BREAKDOWN_KEY, fund_id, breakdown, generation)
+        return breakdown
+
+    async def aget_breakdown(self, fund_id: int) -> dict:
+        """get_breakdown for the async query path; a miss is loaded on an AsyncSession."""
+        cached = await asyncio.to_thread(self._get_many, BREAKDOWN_KEY, [fund_id])
+        if fund_id in cached:
+            return cached[fund_id]
+        generation = (await asyncio.to_thread(self._generations, [fund_id])).get(fund_id)
+        if AsyncSessionLocal is None:
+            breakdown = await asyncio.to_thread(get_metrics_breakdown, fund_id)
+        else:
+            async with AsyncSessionLocal() as session:
+                breakdown = build_breakdown(fund_id, await fetch_cashflows_async(fund_id, session))
+        await asyncio.to_thread(self._set, BREAKDOWN_KEY, fund_id, breakdown, generation)
+        return breakdown
+
+    def get_portfolio(self, fund_ids: list[int] | None = None, db=None) -> list[dict]:
+        """Cached get_portfolio_metrics; only the missing funds are computed."""
+        if fund_ids is None:
+            fund_ids = list_fund_ids(db=db)
+        fund_ids = sorted(set(fund_ids))
+
+        found = self._get_many(SUMMARY_KEY, fund_ids)
+        missing = [f for f in fund_ids if f not in found]
+        if missing:
+            generations = self._generations(missing)
+            for row in get_portfolio_metrics(missing, db=db):
+                found[row["fund_id"]] = row
+                self._set(SUMMARY_KEY, row["fund_id"], row, generations.get(row["fund_id"]))
+        return [found[f] for f in fund_ids]
+
+    def apply_transactions(self, fund_id: int, parsed_data: dict):
+        """
+        Merge newly inserted transactions (in parse_financial_tables format)
+        into the cached breakdown, recomputing metrics from the cached rows
+        only. Nothing is cached yet -> nothing to merge; the generation bump
+        keeps a read that loaded before the commit from caching its result.
+        """
+        new_rows = []
+        for bucket, kind, date_field, type_field in _BUCKETS:
+            for item in parsed_data.get(bucket) or []:
+                new_rows.append((kind, _to_date(item[date_field]), item.get(type_field),
+                                 float(item["amount"]), item.get("description")))
+        if not new_rows:
+            return
+
+        def merge(raw: str) -> str:
+            cached = json.loads(raw)
+            rows = [
+                (kind, _to_date(r["date"]), r["type"], r["amount"], r["description"])
+                for bucket, kind, _, _ in _BUCKETS
+                for r in cached.get(bucket, [])
+            ]
+            rows.extend(new_rows)
+            rows.sort(key=lambda r: (r[1], r[0]))
+            return _dumps(build_breakdown(fund_id, cashflows_from_rows(rows)))
+
+        try:
+            self._bump(fund_id)
+            self.backend.update(BREAKDOWN_KEY.format(fund_id), merge, self.ttl)
+            self.backend.delete(SUMMARY_KEY.format(fund_id))
+        except Exception as e:
+            print(f"[WARN] Incremental metrics cache update failed for fund {fund_id}: {e}")
+            self.invalidate(fund_id)
+
+    def invalidate(self, fund_id: int):
+        try:
+            self._bump(fund_id)
+            self.backend.delete(BREAKDOWN_KEY.format(fund_id), SUMMARY_KEY.format(fund_id))
+        except Exception as e:
+            print(f"[WARN] Metrics cache invalidation failed for fund {fund_id}: {e}")
+
+    def stats(self) -> dict:
+        try:
+            hits = self.backend.counter(HITS_KEY)
+            misses = self.backend.counter(MISSES_KEY)
+        except Exception as e:
+            print(f"[WARN] Failed to read metrics cache counters: {e}")
+            hits = misses = 0
+        total = hits + misses
+        return {
+            "backend": self.backend.name,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+        }
+
+
+metrics_cache = MetricsCache(settings.REDIS_URL, ttl=settings.METRICS_CACHE_TTL)
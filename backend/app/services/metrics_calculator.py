@@ -1,146 +1,265 @@
 # backend/app/services/metrics_calculator.py
 from decimal import Decimal
-from sqlalchemy import func
-from datetime import datetime
+from typing import NamedTuple
+from sqlalchemy import select, literal, union_all, func
 import numpy as np
-import numpy_financial as npf
 
 from app.db.session import SessionLocal
 from app.models.transaction import CapitalCall, Distribution, Adjustment
+from app.models.fund import Fund
+from app.services.xirr import xirr, xirr_batch, DAYS_PER_YEAR
 
+# Cashflow kinds as stored in FundCashflows.kinds
+KIND_CALL = 0
+KIND_DISTRIBUTION = 1
+KIND_ADJUSTMENT = 2
 
-def calculate_pic(fund_id: int) -> Decimal:
-    """Paid-In Capital = Total Calls - Adjustments"""
-    db = SessionLocal()
-    try:
-        total_calls = db.query(func.sum(CapitalCall.amount)).filter(
-            CapitalCall.fund_id == fund_id
-        ).scalar() or Decimal(0)
 
-        total_adjustments = db.query(func.sum(Adjustment.amount)).filter(
-            Adjustment.fund_id == fund_id
-        ).scalar() or Decimal(0)
+class FundCashflows(NamedTuple):
+    """All transactions of one fund as column arrays, ordered by date."""
+    kinds: np.ndarray         # int8, one of KIND_*
+    dates: np.ndarray         # datetime64[D]
+    amounts: np.ndarray       # float64, as stored (always the raw amount)
+    types: list
+    descriptions: list
 
-        pic = total_calls - total_adjustments
-        return pic if pic > 0 else Decimal(0)
-    finally:
-        db.close()
 
+def _cashflows_query(fund_id: int):
+    """
+    One UNION ALL over the three transaction tables, so a fund's cashflows
+    come back in a single round trip already sorted by date.
+    """
+    calls = select(
+        literal(KIND_CALL).label("kind"),
+        CapitalCall.id.label("id"),
+        CapitalCall.call_date.label("date"),
+        CapitalCall.call_type.label("type"),
+        CapitalCall.amount.label("amount"),
+        CapitalCall.description.label("description"),
+    ).where(CapitalCall.fund_id == fund_id)
+    dists = select(
+        literal(KIND_DISTRIBUTION),
+        Distribution.id,
+        Distribution.distribution_date,
+        Distribution.distribution_type,
+        Distribution.amount,
+        Distribution.description,
+    ).where(Distribution.fund_id == fund_id)
+    adjs = select(
+        literal(KIND_ADJUSTMENT),
+        Adjustment.id,
+        Adjustment.adjustment_date,
+        Adjustment.adjustment_type,
+        Adjustment.amount,
+        Adjustment.description,
+    ).where(Adjustment.fund_id == fund_id)
+
+    u = union_all(calls, dists, adjs).subquery()
+    return select(u).order_by(u.c.date, u.c.kind, u.c.id)
 
-def calculate_dpi(fund_id: int) -> float:
-    """DPI = Total Distributions / Paid-In Capital"""
-    db = SessionLocal()
-    try:
-        pic = calculate_pic(fund_id)
 
-        total_distributions = db.query(func.sum(Distribution.amount)).filter(
-            Distribution.fund_id == fund_id
-        ).scalar() or Decimal(0)
+def cashflows_from_rows(rows) -> FundCashflows:
+    """Build column arrays from (kind, date, type, amount, description) rows."""
+    rows = list(rows)
+    return FundCashflows(
+        kinds=np.fromiter((r[0] for r in rows), dtype=np.int8, count=len(rows)),
+        dates=np.array([r[1] for r in rows], dtype="datetime64[D]"),
+        amounts=np.fromiter((float(r[3]) for r in rows), dtype=np.float64, count=len(rows)),
+        types=[r[2] for r in rows],
+        descriptions=[r[4] for r in rows],
+    )
 
-        if not pic or pic == 0:
-            return 0.0
 
-        dpi = float(total_distributions) / float(pic)
-        return round(dpi, 4)
+def fetch_cashflows(fund_id: int, db=None) -> FundCashflows:
+    """Load every transaction of a fund with a single query."""
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        rows = db.execute(_cashflows_query(fund_id)).all()
+        return cashflows_from_rows(
+            (r.kind, r.date, r.type, r.amount, r.description) for r in rows
+        )
     finally:
-        db.close()
+        if own_session:
+            db.close()
+
+
+async def fetch_cashflows_async(fund_id: int, session) -> FundCashflows:
+    """fetch_cashflows on an AsyncSession."""
+    rows = (await session.execute(_cashflows_query(fund_id))).all()
+    return cashflows_from_rows(
+        (r.kind, r.date, r.type, r.amount, r.description) for r in rows
+    )
+
+
+def signed_amounts(cf: FundCashflows) -> np.ndarray:
+    """Calls are outflows (negative), distributions inflows, adjustments as-is."""
+    return np.where(cf.kinds == KIND_CALL, -cf.amounts, cf.amounts)
+
+
+def _summarize(total_calls: float, total_distributions: float, total_adjustments: float, irr: float) -> dict:
+    pic = max(round(float(total_calls - total_adjustments), 2), 0.0)
+    dpi = round(float(total_distributions) / pic, 4) if pic else 0.0
+    irr = 0.0 if np.isnan(irr) else round(float(irr), 4)
+    return {"PIC": pic, "DPI": dpi, "IRR": irr}
+
+
+def compute_metrics(cf: FundCashflows) -> dict:
+    """PIC, DPI and IRR from already-loaded cashflow arrays (no DB access)."""
+    irr = xirr(cf.dates, signed_amounts(cf)) if len(cf.amounts) else float("nan")
+    return _summarize(
+        cf.amounts[cf.kinds == KIND_CALL].sum(),
+        cf.amounts[cf.kinds == KIND_DISTRIBUTION].sum(),
+        cf.amounts[cf.kinds == KIND_ADJUSTMENT].sum(),
+        irr,
+    )
+
+
+def calculate_pic(fund_id: int) -> Decimal:
+    """Paid-In Capital = Total Calls - Adjustments"""
+    return Decimal(str(compute_metrics(fetch_cashflows(fund_id))["PIC"]))
+
+
+def calculate_dpi(fund_id: int) -> float:
+    """DPI = Total Distributions / Paid-In Capital"""
+    return compute_metrics(fetch_cashflows(fund_id))["DPI"]
 
 
 def calculate_irr(fund_id: int) -> float:
     """
-    IRR = rate where NPV of all cashflows = 0
+    IRR = annual rate where NPV of all dated cashflows = 0 (XIRR, ACT/365)
     Convention:
       - Capital Calls = negative cashflow (outflow)
       - Distributions = positive cashflow (inflow)
       - Adjustments = modify the related amount
     """
-    db = SessionLocal()
+    return compute_metrics(fetch_cashflows(fund_id))["IRR"]
+
+
+def build_breakdown(fund_id: int, cf: FundCashflows) -> dict:
+    """Group the cashflow arrays back into the per-table breakdown payload."""
+    breakdown = {
+        "fund_id": fund_id,
+        "capital_calls": [],
+        "distributions": [],
+        "adjustments": [],
+    }
+    buckets = {
+        KIND_CALL: breakdown["capital_calls"],
+        KIND_DISTRIBUTION: breakdown["distributions"],
+        KIND_ADJUSTMENT: breakdown["adjustments"],
+    }
+    for kind, date, t, amount, desc in zip(
+        cf.kinds.tolist(), cf.dates.tolist(), cf.types, cf.amounts.tolist(), cf.descriptions
+    ):
+        buckets[kind].append({
+            "date": date,
+            "type": t,
+            "amount": amount,
+            "description": desc,
+        })
+    breakdown["metrics"] = compute_metrics(cf)
+    return breakdown
+
+
+def get_metrics_breakdown(fund_id: int, db=None) -> dict:
+    """Show all transactions and computed metrics"""
+    return build_breakdown(fund_id, fetch_cashflows(fund_id, db=db))
+
+
+def _portfolio_query(fund_ids: list[int] | None):
+    """
+    Per (fund, kind, date) sums for every fund in one grouped query. That is
+    enough for the totals of each kind and for the dated IRR cashflows.
+    """
+    parts = []
+    for kind, model, date_col in (
+        (KIND_CALL, CapitalCall, CapitalCall.call_date),
+        (KIND_DISTRIBUTION, Distribution, Distribution.distribution_date),
+        (KIND_ADJUSTMENT, Adjustment, Adjustment.adjustment_date),
+    ):
+        q = select(
+            model.fund_id.label("fund_id"),
+            literal(kind).label("kind"),
+            date_col.label("date"),
+            model.amount.label("amount"),
+        )
+        if fund_ids is not None:
+            q = q.where(model.fund_id.in_(fund_ids))
+        parts.append(q)
+
+    u = union_all(*parts).subquery()
+    return (
+        select(u.c.fund_id, u.c.kind, u.c.date, func.sum(u.c.amount).label("amount"))
+        .group_by(u.c.fund_id, u.c.kind, u.c.date)
+        .order_by(u.c.fund_id, u.c.date)
+    )
+
+
+def list_fund_ids(db=None) -> list[int]:
+    own_session = db is None
+    db = db or SessionLocal()
     try:
-        cashflows = []
-
-        # Capital Calls (outflow)
-        calls = db.query(CapitalCall.call_date, CapitalCall.amount).filter(
-            CapitalCall.fund_id == fund_id
-        ).all()
-        for c in calls:
-            cashflows.append((c.call_date, -float(c.amount)))
-
-        # Distributions (inflow)
-        dists = db.query(Distribution.distribution_date, Distribution.amount).filter(
-            Distribution.fund_id == fund_id
-        ).all()
-        for d in dists:
-            cashflows.append((d.distribution_date, float(d.amount)))
-
-        # Adjustments
-        adjs = db.query(Adjustment.adjustment_date, Adjustment.amount).filter(
-            Adjustment.fund_id == fund_id
-        ).all()
-        for a in adjs:
-            cashflows.append((a.adjustment_date, float(a.amount)))
-
-        if not cashflows:
-            return 0.0
-
-        # Sort cashflows by date
-        cashflows.sort(key=lambda x: x[0])
-        values = [v for _, v in cashflows]
-
-        irr_value = npf.irr(values)
-        if irr_value is None or np.isnan(irr_value):
-            return 0.0
-
-        return round(float(irr_value), 4)
+        return list(db.execute(select(Fund.id).order_by(Fund.id)).scalars())
     finally:
-        db.close()
+        if own_session:
+            db.close()
 
 
-def get_metrics_breakdown(fund_id: int) -> dict:
-    """Show all transactions and computed metrics"""
-    db = SessionLocal()
+def get_portfolio_metrics(fund_ids: list[int] | None = None, db=None) -> list[dict]:
+    """
+    PIC/DPI/IRR and cashflow totals for many funds (all funds by default),
+    using one grouped aggregate query and one batched XIRR solve.
+    """
+    own_session = db is None
+    db = db or SessionLocal()
     try:
-        calls = db.query(CapitalCall).filter(CapitalCall.fund_id == fund_id).all()
-        dists = db.query(Distribution).filter(Distribution.fund_id == fund_id).all()
-        adjs = db.query(Adjustment).filter(Adjustment.fund_id == fund_id).all()
+        if fund_ids is None:
+            fund_ids = list_fund_ids(db=db)
+        else:
+            fund_ids = sorted(set(fund_ids))
+        if not fund_ids:
+            return []
+        rows = db.execute(_portfolio_query(fund_ids)).all()
+    finally:
+        if own_session:
+            db.close()
+
+    ids = np.asarray(fund_ids, dtype=np.int64)
+    n = len(ids)
+    row_fund = np.fromiter((r.fund_id for r in rows), dtype=np.int64, count=len(rows))
+    kinds = np.fromiter((r.kind for r in rows), dtype=np.int8, count=len(rows))
+    days = np.fromiter((r.date.toordinal() for r in rows), dtype=np.int64, count=len(rows))
+    amounts = np.fromiter((float(r.amount) for r in rows), dtype=np.float64, count=len(rows))
+
+    pos = np.searchsorted(ids, row_fund)
+    totals = np.zeros((n, 3))
+    np.add.at(totals, (pos, kinds), amounts)
 
-        pic = calculate_pic(fund_id)
-        dpi = calculate_dpi(fund_id)
-        irr = calculate_irr(fund_id)
+    # Pack each fund's dated flows into padded (funds x flows) matrices.
+    # Rows are ordered by fund, so a fund's flows are contiguous.
+    counts = np.bincount(pos, minlength=n)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    col = np.arange(len(rows)) - starts[pos]
+    first_day = np.zeros(n, dtype=np.int64)
+    if len(rows):
+        first_day[counts > 0] = days[starts[counts > 0]]
+    times = np.zeros((n, counts.max(initial=0)))
+    flows = np.zeros_like(times)
+    times[pos, col] = (days - first_day[pos]) / DAYS_PER_YEAR
+    flows[pos, col] = np.where(kinds == KIND_CALL, -amounts, amounts)
 
-        return {
+    irrs = xirr_batch(times, flows) if times.shape[1] else np.full(n, np.nan)
+
+    results = []
+    for i, fund_id in enumerate(fund_ids):
+        calls, dists, adjs = totals[i]
+        results.append({
             "fund_id": fund_id,
-            "capital_calls": [
-                {
-                    "date": c.call_date,
-                    "type": c.call_type,
-                    "amount": float(c.amount),
-                    "description": c.description,
-                }
-                for c in calls
-            ],
-            "distributions": [
-                {
-                    "date": d.distribution_date,
-                    "type": d.distribution_type,
-                    "amount": float(d.amount),
-                    "description": d.description,
-                }
-                for d in dists
-            ],
-            "adjustments": [
-                {
-                    "date": a.adjustment_date,
-                    "type": a.adjustment_type,
-                    "amount": float(a.amount),
-                    "description": a.description,
-                }
-                for a in adjs
-            ],
-            "metrics": {
-                "PIC": float(pic),
-                "DPI": dpi,
-                "IRR": irr,
-            },
-        }
-    finally:
-        db.close()
+            **_summarize(calls, dists, adjs, irrs[i]),
+            "total_calls": round(float(calls), 2),
+            "total_distributions": round(float(dists), 2),
+            "total_adjustments": round(float(adjs), 2),
+            "net_cash_flow": round(float(dists - calls + adjs), 2),
+        })
+    return results
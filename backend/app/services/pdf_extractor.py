@@ -0,0 +1,143 @@
+# backend/app/services/pdf_extractor.py
+"""
+Page-parallel PDF text extraction.
+
+pdfplumber's extract_text() is pure Python and holds the GIL, so pages are
+sharded into contiguous ranges of PDF_PAGES_PER_SHARD and extracted in a
+shared process pool. Each worker opens the file itself (only the path and
+page range cross the process boundary) and results are reassembled in page
+order. The pool is shared by all documents being parsed, so a backlog of
+uploads keeps every core busy.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple
+
+import pdfplumber
+
+from app.core.config import settings
+
+
+class PageText(NamedTuple):
+    number: int  # 1-based page number
+    text: str
+    seconds: float
+    tables: list | None = None  # page.extract_tables() rows, when requested
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _workers() -> int:
+    return max(1, settings.PDF_EXTRACT_WORKERS or os.cpu_count() or 1)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: the API process is multi-threaded, forking it is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _extract_range(file_path: str, start: int, end: int, tables: bool = False) -> list[PageText]:
+    """Extract pages [start, end) (0-based) of one PDF."""
+    pages = []
+    with pdfplumber.open(file_path) as pdf:
+        for i in range(start, end):
+            t0 = time.perf_counter()
+            page = pdf.pages[i]
+            text = page.extract_text() or ""
+            page_tables = page.extract_tables() if tables else None
+            pages.append(PageText(i + 1, text, time.perf_counter() - t0, page_tables))
+            # drop the parsed layout objects of finished pages
+            page.flush_cache()
+    return pages
+
+
+def page_count(file_path: str) -> int:
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def _iter_shards(file_path: str, tables: bool = False):
+    """
+    Pages in page order as their shards finish. At most two shards per
+    worker are in flight, so a slow consumer holds back extraction instead
+    of letting finished pages pile up.
+    """
+    n = page_count(file_path)
+    shard = max(1, settings.PDF_PAGES_PER_SHARD)
+    ranges = [(s, min(n, s + shard)) for s in range(0, n, shard)]
+    if len(ranges) <= 1 or _workers() == 1:
+        for s, e in ranges:
+            yield from _extract_range(file_path, s, e, tables)
+        return
+
+    pending = deque()
+    next_range = 0
+    try:
+        pool = _get_pool()
+        while next_range < len(ranges) or pending:
+            while next_range < len(ranges) and len(pending) < 2 * _workers():
+                pending.append(pool.submit(_extract_range, file_path, *ranges[next_range], tables))
+                next_range += 1
+            pages = pending[0].result()
+            pending.popleft()
+            yield from pages
+    except BrokenProcessPool as e:
+        # a worker died (e.g. OOM on a pathological page); rebuild the pool next time
+        resume = ranges[next_range - len(pending)][0]
+        print(f"[WARN] PDF extraction pool failed ({e}); extracting {file_path} serially from page {resume + 1}")
+        _reset_pool()
+        yield from _extract_range(file_path, resume, n, tables)
+    finally:
+        for f in pending:
+            f.cancel()
+
+
+def iter_pages(file_path: str, tables: bool = False):
+    """
+    Yield the pages of a PDF in page order (see _iter_shards). Once all are
+    out, logs the extraction time (not counting time the consumer holds a
+    page), the per-page CPU time and the slowest page.
+    """
+    pages = _iter_shards(file_path, tables)
+    count, cpu, wall, slowest = 0, 0.0, 0.0, None
+    try:
+        while True:
+            t0 = time.perf_counter()
+            page = next(pages, None)
+            wall += time.perf_counter() - t0
+            if page is None:
+                break
+            count += 1
+            cpu += page.seconds
+            if slowest is None or page.seconds > slowest.seconds:
+                slowest = page
+            yield page
+    finally:
+        pages.close()
+    if count:
+        print(
+            f"[DEBUG] Extracted {count} pages of {os.path.basename(file_path)} in {wall:.2f}s "
+            f"({cpu:.2f}s CPU, {cpu / count:.3f}s/page, slowest page {slowest.number}: {slowest.seconds:.2f}s)"
+        )
@@ -0,0 +1,168 @@
+# backend/app/services/pgvector_store.py
+"""
+pgvector-backed VectorStore, selected with VECTOR_BACKEND=pgvector.
+
+All chunks live in one `document_chunks` table shared by every backend
+replica. Searches filter on fund_id inside the SQL and use the HNSW or
+IVFFlat index chosen by PGVECTOR_INDEX_TYPE; inserts go through COPY.
+
+The ANN index is global, so the fund filter is applied to the ef_search /
+probes candidates it returns: a small fund among large ones can come back
+short or empty. On pgvector >= 0.8 iterative index scans keep going until
+enough rows pass the filter; if a search still returns fewer than top_k
+rows, it is repeated as an exact scan of the fund's rows.
+"""
+import csv
+import io
+import json
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import engine
+from app.models.chunk import DocumentChunk, EMBEDDING_DIM
+
+
+def _fund_id(index_name: str) -> int | None:
+    """'fund_12' -> 12, 'fund_global' -> None."""
+    suffix = index_name.removeprefix("fund_")
+    return int(suffix) if suffix.isdigit() else None
+
+
+def _vector_literal(values) -> str:
+    return "[" + ",".join(repr(float(v)) for v in values) + "]"
+
+
+_iterative_scan: bool | None = None
+
+
+def _supports_iterative_scan(conn) -> bool:
+    """pgvector >= 0.8 (hnsw.iterative_scan / ivfflat.iterative_scan)."""
+    global _iterative_scan
+    if _iterative_scan is None:
+        version = conn.execute(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        ).scalar() or "0"
+        parts = tuple(int(p) for p in version.split(".")[:2] if p.isdigit())
+        _iterative_scan = parts >= (0, 8)
+    return _iterative_scan
+
+
+def ensure_schema():
+    """Create the extension, the chunk table and its ANN index if missing."""
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    DocumentChunk.__table__.create(bind=engine, checkfirst=True)
+    if settings.PGVECTOR_INDEX_TYPE == "ivfflat":
+        ddl = (
+            "CREATE INDEX IF NOT EXISTS ix_document_chunks_embedding_ivfflat "
+            "ON document_chunks USING ivfflat (embedding vector_l2_ops) "
+            f"WITH (lists = {int(settings.PGVECTOR_IVF_LISTS)})"
+        )
+    else:
+        ddl = (
+            "CREATE INDEX IF NOT EXISTS ix_document_chunks_embedding_hnsw "
+            "ON document_chunks USING hnsw (embedding vector_l2_ops) "
+            f"WITH (m = {int(settings.PGVECTOR_HNSW_M)}, ef_construction = {int(settings.PGVECTOR_HNSW_EF_CONSTRUCTION)})"
+        )
+    with engine.begin() as conn:
+        conn.execute(text(ddl))
+
+
+class PgVectorStore:
+    def __init__(self, index_name: str):
+        self.index_name = index_name
+        self.fund_id = _fund_id(index_name)
+        self.dim = EMBEDDING_DIM
+
+    def _fund_filter(self) -> str:
+        return "fund_id = :fund_id" if self.fund_id is not None else "fund_id IS NULL"
+
+    def __len__(self):
+        with engine.connect() as conn:
+            return conn.execute(
+                text(f"SELECT count(*) FROM document_chunks WHERE {self._fund_filter()}"),
+                {"fund_id": self.fund_id},
+            ).scalar()
+
+    def count_document_chunks(self, document_id: int) -> int:
+        """Number of chunks indexed for document_id."""
+        with engine.connect() as conn:
+            return conn.execute(
+                text(
+                    f"SELECT count(*) FROM document_chunks WHERE {self._fund_filter()} "
+                    "AND metadata->>'document_id' = :document_id"
+                ),
+                {"fund_id": self.fund_id, "document_id": str(document_id)},
+            ).scalar()
+
+    def add_texts(self, texts: list[str], embeddings: list[list[float]], metadatas: list[dict] | None = None):
+        if len(embeddings) == 0:
+            return
+        if any(len(e) != self.dim for e in embeddings):
+            raise ValueError(f"Embeddings dimension mismatch. Expected {self.dim}")
+        metadatas = metadatas or [{} for _ in texts]
+
+        buf = io.StringIO()
+        # quote every string so empty texts stay '' and only fund_id can be NULL
+        writer = csv.writer(buf, quoting=csv.QUOTE_NONNUMERIC)
+        for t, emb, meta in zip(texts, embeddings, metadatas):
+            writer.writerow([self.index_name, self.fund_id, t, json.dumps(meta), _vector_literal(emb)])
+        buf.seek(0)
+
+        raw = engine.raw_connection()
+        try:
+            with raw.cursor() as cur:
+                cur.copy_expert(
+                    "COPY document_chunks (index_name, fund_id, content, metadata, embedding) "
+                    "FROM STDIN WITH (FORMAT csv, FORCE_NULL (fund_id))",
+                    buf,
+                )
+            raw.commit()
+        finally:
+            raw.close()
+
+    def search(self, query_emb: list[float], top_k: int = 3, nprobe: int | None = None, ef_search: int | None = None):
+        query = text(
+            "SELECT content, metadata AS meta, embedding <-> CAST(:q AS vector) AS distance "
+            f"FROM document_chunks WHERE {self._fund_filter()} "
+            "ORDER BY embedding <-> CAST(:q AS vector) LIMIT :k"
+        )
+        # ordering by the CTE's column cannot use the ANN index
+        exact_query = text(
+            "WITH fund AS MATERIALIZED ("
+            " SELECT content, metadata AS meta, embedding <-> CAST(:q AS vector) AS distance"
+            f" FROM document_chunks WHERE {self._fund_filter()}"
+            ") SELECT content, meta, distance FROM fund ORDER BY distance LIMIT :k"
+        )
+        params = {"q": _vector_literal(query_emb), "fund_id": self.fund_id, "k": top_k}
+        with engine.begin() as conn:
+            # SET LOCAL only lasts for this transaction
+            iterative = _supports_iterative_scan(conn)
+            if settings.PGVECTOR_INDEX_TYPE == "ivfflat":
+                conn.execute(text(f"SET LOCAL ivfflat.probes = {int(nprobe or settings.VECTOR_IVF_NPROBE)}"))
+                if iterative:
+                    conn.execute(text("SET LOCAL ivfflat.iterative_scan = relaxed_order"))
+            else:
+                conn.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search or settings.VECTOR_HNSW_EF_SEARCH)}"))
+                if iterative:
+                    conn.execute(text("SET LOCAL hnsw.iterative_scan = strict_order"))
+            rows = conn.execute(query, params).all()
+            if len(rows) < top_k:
+                # too few candidates survived the fund filter: exact scan of the fund's rows
+                rows = conn.execute(exact_query, params).all()
+        # ivfflat relaxed_order may return rows slightly out of order
+        rows = sorted(rows, key=lambda r: r.distance)
+        # FAISS reports squared L2 distances; keep scores comparable
+        return [
+            {"text": r.content, "metadata": r.meta or {}, "score": float(r.distance) ** 2}
+            for r in rows
+        ]
+
+    def hybrid_search(self, query: str, query_emb: list[float], top_k: int = 3):
+        """No lexical index in Postgres yet: plain vector search."""
+        return self.search(query_emb, top_k)
+
+    def delete(self):
+        with engine.begin() as conn:
+            conn.execute(text(f"DELETE FROM document_chunks WHERE {self._fund_filter()}"), {"fund_id": self.fund_id})
@@ -1,52 +1,129 @@
 # backend/app/services/query_engine.py
 
-import os
+import asyncio
 import json
-from openai import OpenAI
-from app.services.embeddings import generate_embeddings
-from app.services.vector_store import VectorStore
-from app.db.session import SessionLocal
-from app.services.metrics_calculator import get_metrics_breakdown
+from openai import AsyncOpenAI
+from app.core.config import settings
+from app.services.embeddings import agenerate_embeddings
+from app.services.vector_store import get_vector_store, search_indexes
+from app.services.metrics_calculator import list_fund_ids
+from app.services.metrics_cache import metrics_cache
+from app.services.answer_cache import answer_cache
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = AsyncOpenAI(
+    api_key=settings.OPENAI_API_KEY,
+    base_url=settings.OPENAI_BASE_URL,
+) if settings.OPENAI_API_KEY else None
+CHAT_MODEL = "gpt-4o-mini"
 
-def handle_query(query: str, fund_id: int | None = None):
+# fund_id -> metrics JSON last indexed by this process
+_last_metrics_snapshot: dict[int, str] = {}
+# keep references so pending snapshot syncs are not garbage collected
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def _search(query: str, fund_id: int | None, query_emb=None, fund_ids: list[int] | None = None):
     """
-    Retrieve relevant chunks, compute metrics, and generate contextual LLM response.
-    Also sync latest metrics into vector store.
+    Chunks of one fund's index, or, without fund_id, of every fund's index
+    plus fund_global (only of fund_ids when given), searched in parallel.
     """
-    query_emb = generate_embeddings([query])[0]
-
-    vs = VectorStore(index_name=f"fund_{fund_id or 'global'}")
-
-    if fund_id:
-        db = SessionLocal()
-        try:
-            metrics_data = get_metrics_breakdown(fund_id)
-            metrics_text = json.dumps(metrics_data["metrics"], indent=2)
-            metrics_emb = generate_embeddings([metrics_text])[0]
-            vs.add_texts(
-                [f"Updated Metrics for Fund {fund_id}:\n{metrics_text}"],
-                [metrics_emb]
-            )
-        except Exception as e:
-            print(f"[WARN] Failed to update vector store with latest metrics: {e}")
-        finally:
-            db.close()
-    
-    results = vs.search(query_emb, top_k=3) or []
-
-    db = SessionLocal()
+    if query_emb is None:
+        query_emb = (await agenerate_embeddings([query]))[0]
+    if fund_id is None:
+        if fund_ids is None:
+            names = [f"fund_{f}" for f in await asyncio.to_thread(list_fund_ids)] + ["fund_global"]
+        else:
+            names = [f"fund_{f}" for f in fund_ids]
+        return await asyncio.to_thread(search_indexes, names, query, query_emb, 3, settings.HYBRID_SEARCH)
+    # loading/searching the index is blocking work
+    vs = await asyncio.to_thread(get_vector_store, f"fund_{fund_id}")
+    if settings.HYBRID_SEARCH:
+        return await asyncio.to_thread(vs.hybrid_search, query, query_emb, 3) or []
+    return await asyncio.to_thread(vs.search, query_emb, 3) or []
+
+
+async def _get_metrics(fund_id: int | None):
+    if not fund_id:
+        return None
     try:
-        metrics = get_metrics_breakdown(fund_id) if fund_id else None
+        return await metrics_cache.aget_breakdown(fund_id)
     except Exception as e:
         print(f"[ERROR] Failed to get metrics for fund {fund_id}: {e}")
-        metrics = None
-    finally:
-        db.close()
+        return None
+
+
+async def _sync_metrics_snapshot(fund_id: int, metrics: dict):
+    """Index the metrics as a chunk, only when the numbers actually changed."""
+    try:
+        metrics_text = json.dumps(metrics["metrics"], indent=2)
+        if _last_metrics_snapshot.get(fund_id) == metrics_text:
+            return
+        _last_metrics_snapshot[fund_id] = metrics_text
+        metrics_emb = (await agenerate_embeddings([metrics_text]))[0]
+        vs = await asyncio.to_thread(get_vector_store, f"fund_{fund_id}")
+        await asyncio.to_thread(
+            vs.add_texts,
+            [f"Updated Metrics for Fund {fund_id}:\n{metrics_text}"],
+            [metrics_emb],
+        )
+    except Exception as e:
+        _last_metrics_snapshot.pop(fund_id, None)
+        print(f"[WARN] Failed to update vector store with latest metrics: {e}")
+
+
+async def _retrieve(query: str, fund_id: int | None = None, query_emb=None, fund_ids: list[int] | None = None):
+    """
+    Retrieve relevant chunks and metrics concurrently. Returns (results, metrics).
+    Syncing the metrics snapshot into the vector store runs in the background
+    and does not delay the answer (the metrics are in the prompt already).
+    """
+    results, metrics = await asyncio.gather(_search(query, fund_id, query_emb, fund_ids), _get_metrics(fund_id))
+    if metrics:
+        task = asyncio.create_task(_sync_metrics_snapshot(fund_id, metrics))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    return results, metrics
+
+
+async def _lookup_cache(query: str, fund_id: int | None, fund_ids: list[int] | None = None):
+    """
+    Returns (cached answer or None, data version, query embedding). The
+    embedding is only computed for near-duplicate matching and is reused
+    for retrieval on a miss.
+    """
+    if not settings.ANSWER_CACHE_ENABLED or (fund_id is None and fund_ids is not None):
+        # answers over an ad-hoc subset of funds are not cached
+        return None, None, None
+    version = await asyncio.to_thread(answer_cache.version, fund_id)
+    if version is None:
+        return None, None, None
+    hit = answer_cache.get(fund_id, version, query)
+    if hit is not None:
+        return hit, version, None
+    query_emb = None
+    if answer_cache.similarity is not None:
+        query_emb = (await agenerate_embeddings([query]))[0]
+        hit = answer_cache.get_similar(fund_id, version, query_emb)
+        if hit is not None:
+            return hit, version, query_emb
+    answer_cache.miss()
+    return None, version, query_emb
+
+
+def _cite(result: dict) -> str:
+    """'[p. 3-4, Capital Calls] ' from chunk metadata, '' for chunks without it."""
+    meta = result.get("metadata") or {}
+    if "page_start" not in meta:
+        return ""
+    pages = f"p. {meta['page_start']}"
+    if meta.get("page_end") != meta["page_start"]:
+        pages += f"-{meta['page_end']}"
+    return f"[{pages}, {meta['section']}] " if meta.get("section") else f"[{pages}] "
 
+
+def _build_messages(query: str, results: list[dict], metrics: dict | None) -> list[dict]:
     # Siapkan context
-    context = "\n".join([r["text"] for r in results]) or "No relevant context found."
+    context = "\n".join(_cite(r) + r["text"] for r in results) or "No relevant context found."
 
     metrics_text = ""
     if metrics:
@@ -69,19 +146,79 @@ Context from uploaded documents:
 {context}
     """
 
-    completion = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": query},
-        ],
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": query},
+    ]
+
+
+async def handle_query(query: str, fund_id: int | None = None, fund_ids: list[int] | None = None):
+    """
+    Retrieve relevant chunks, compute metrics, and generate contextual LLM response.
+    Also sync latest metrics into vector store.
+    """
+    cached, version, query_emb = await _lookup_cache(query, fund_id, fund_ids)
+    if cached is not None:
+        return {**cached, "cached": True}
+    if client is None:
+        raise RuntimeError("OPENAI_API_KEY not configured in .env")
+    results, metrics = await _retrieve(query, fund_id, query_emb, fund_ids)
+
+    completion = await client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=_build_messages(query, results, metrics),
         temperature=0.3,
     )
 
     answer = completion.choices[0].message.content.strip()
 
-    return {
+    result = {
         "answer": answer,
         "metrics": metrics,
         "sources": [r["text"] for r in results],
     }
+    if version is not None:
+        answer_cache.put(fund_id, version, query, result, query_emb)
+    return result
+
+
+async def stream_query(query: str, fund_id: int | None = None, fund_ids: list[int] | None = None):
+    """
+    Same as handle_query, but yields (event, data) pairs as they become
+    available: "sources" (sources + metrics), then one "token" per
+    completion delta, then "done" with the full answer.
+    """
+    cached, version, query_emb = await _lookup_cache(query, fund_id, fund_ids)
+    if cached is not None:
+        yield "sources", {"sources": cached["sources"], "metrics": cached["metrics"]}
+        yield "token", {"text": cached["answer"]}
+        yield "done", {"answer": cached["answer"], "cached": True}
+        return
+    if client is None:
+        raise RuntimeError("OPENAI_API_KEY not configured in .env")
+    results, metrics = await _retrieve(query, fund_id, query_emb, fund_ids)
+    yield "sources", {"sources": [r["text"] for r in results], "metrics": metrics}
+
+    stream = await client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=_build_messages(query, results, metrics),
+        temperature=0.3,
+        stream=True,
+    )
+    parts = []
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            yield "token", {"text": delta}
+
+    answer = "".join(parts).strip()
+    if version is not None:
+        answer_cache.put(fund_id, version, query, {
+            "answer": answer,
+            "metrics": metrics,
+            "sources": [r["text"] for r in results],
+        }, query_emb)
+    yield "done", {"answer": answer}
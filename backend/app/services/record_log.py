@@ -0,0 +1,126 @@
+# backend/app/services/record_log.py
+"""
+Append-only record log used by the vector store.
+
+Each record is  [seq: u64][length: u32][crc32: u32][payload: length bytes].
+`seq` is the position of the record in the store (0, 1, 2, ...), so records
+that are already part of a compacted snapshot can be skipped on replay.
+A torn or corrupted tail (crash mid-append) fails the length/CRC check and is
+cut off; everything before it stays readable.
+
+Several processes (API workers, Celery workers) append to the same logs, so
+writers hold locked() around "read the tail, then append": the next seq is
+always taken from what is on disk, never from a possibly outdated copy in
+memory.
+"""
+import fcntl
+import os
+import struct
+import zlib
+from contextlib import contextmanager
+
+_HEADER = struct.Struct("<QII")
+
+
+@contextmanager
+def locked(lock_path: str):
+    """Exclusive inter-process lock (flock on lock_path) for the logs it guards."""
+    with open(lock_path, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def append_records(path: str, start_seq: int, payloads: list[bytes], sync: bool = True) -> int:
+    """
+    Append payloads as records start_seq, start_seq + 1, ... and return the
+    new end offset of the log. A failed append is cut back off before the
+    error is re-raised, so it never leaves a partial batch behind.
+    """
+    buf = bytearray()
+    for i, payload in enumerate(payloads):
+        buf += _HEADER.pack(start_seq + i, len(payload), zlib.crc32(payload))
+        buf += payload
+    with open(path, "ab") as f:
+        start = f.seek(0, os.SEEK_END)
+        try:
+            f.write(buf)
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+        except BaseException:
+            try:
+                f.truncate(start)
+            except OSError:
+                pass  # the next replay cuts the torn tail
+            raise
+        return start + len(buf)
+
+
+def read_records(path: str, first_seq: int = 0, offset: int = 0) -> tuple[list[bytes], int]:
+    """
+    Return (payloads for seq >= first_seq, byte offset of the end of the
+    last valid record), reading from byte `offset` (the start of a record).
+    Reading stops at the first torn/corrupt record or at a gap in the
+    sequence.
+    """
+    if not os.path.exists(path):
+        return [], 0
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+
+    payloads = []
+    pos = 0
+    expected = first_seq
+    while pos + _HEADER.size <= len(data):
+        seq, length, crc = _HEADER.unpack_from(data, pos)
+        start = pos + _HEADER.size
+        end = start + length
+        if end > len(data):
+            break
+        payload = data[start:end]
+        if zlib.crc32(payload) != crc:
+            break
+        if seq >= first_seq:
+            if seq != expected:
+                break
+            payloads.append(payload)
+            expected += 1
+        pos = end
+    return payloads, offset + pos
+
+
+def truncate_records(path: str, keep: int, first_seq: int = 0, offset: int = 0) -> int:
+    """
+    Cut the log right after the first `keep` records with seq >= first_seq,
+    counting from byte `offset`. Returns the resulting end offset.
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    pos = 0
+    kept = 0
+    while pos + _HEADER.size <= len(data):
+        seq, length, _ = _HEADER.unpack_from(data, pos)
+        if seq >= first_seq:
+            if kept == keep:
+                break
+            kept += 1
+        pos += _HEADER.size + length
+    pos = min(pos, len(data))
+    if pos < len(data):
+        with open(path, "r+b") as f:
+            f.truncate(offset + pos)
+    return offset + pos
+
+
+def reset(path: str):
+    """Empty the log (after its records were folded into a snapshot)."""
+    with open(path, "wb") as f:
+        f.flush()
+        os.fsync(f.fileno())
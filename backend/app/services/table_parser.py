@@ -1,80 +1,245 @@
+"""
+Single-pass parser for capital call / distribution / adjustment tables.
+
+The text is scanned once with one compiled token pattern that finds section
+headings and ISO dates. Headings switch the parser state; every date opens
+a candidate row that runs up to the next token and is matched with the
+anchored row pattern of the current section. Row patterns therefore never
+scan past their own row, so cost is linear in the document length.
+
+When pdfplumber tables are passed in as well, their rows are parsed by
+column (header names, or the section's column order when a table has no
+header row). A section that yields rows from tables uses those rows only;
+the text scan fills in the other sections.
+"""
+import bisect
 import re
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 
-def parse_financial_tables(full_text: str) -> dict:
-    """
-    Parse extracted PDF text into structured financial data.
-    Expected to detect and split sections:
-      - Capital Calls
-      - Distributions
-      - Adjustments
-    """
-    sections = {
-        "capital_calls": [],
-        "distributions": [],
-        "adjustments": []
-    }
+CALLS = "capital_calls"
+DISTRIBUTIONS = "distributions"
+ADJUSTMENTS = "adjustments"
 
-    text = re.sub(r'\s+', ' ', full_text)
+# The leading character class lets the regex engine skip every position that
+# cannot start a token; the branch is then picked by the character consumed.
+_TOKEN = re.compile(
+    r"[0-9CcDdAaPp](?:"
+    r"(?<=\d)\d{3}-\d\d-\d\d"
+    r"|(?<=[Cc])(?i:apital\s+calls)"
+    r"|(?<=[Dd])(?i:istributions)"
+    r"|(?<=[Aa])(?i:djustments)"
+    r"|(?<=[Pp])(?i:erformance\s+metrics))"
+)
+# first character of a heading token -> section it opens (None ends all sections)
+_HEADINGS = {"c": CALLS, "d": DISTRIBUTIONS, "a": ADJUSTMENTS, "p": None}
 
-    call_pattern = r'Capital Calls(.*?)(?=Distributions|Adjustments|$)'
-    dist_pattern = r'Distributions(.*?)(?=Capital Calls|Adjustments|$)'
-    adj_pattern = r'Adjustments(.*?)(?=Capital Calls|Distributions|$)'
+_AMOUNT = r"\$?(\d[\d,]*(?:\.\d*)?)"
+_ROW = {
+    CALLS: re.compile(r"(\d{4}-\d{2}-\d{2})\s+(Call\s*\d+)\s+" + _AMOUNT + r"(?:\s+(.*))?", re.DOTALL),
+    DISTRIBUTIONS: re.compile(
+        r"(\d{4}-\d{2}-\d{2})\s+([A-Za-z]+)\s+" + _AMOUNT + r"\s+(Yes|No)(?:\s+(.*))?", re.DOTALL
+    ),
+    ADJUSTMENTS: re.compile(
+        r"(\d{4}-\d{2}-\d{2})\s+([A-Za-z ]+?)\s+(-?\$?\d[\d,]*(?:\.\d*)?)(?:\s+(.*))?", re.DOTALL
+    ),
+}
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
 
-    calls_text = re.search(call_pattern, text, re.IGNORECASE)
-    dists_text = re.search(dist_pattern, text, re.IGNORECASE)
-    adjs_text = re.search(adj_pattern, text, re.IGNORECASE)
 
-    if calls_text:
-        sections["capital_calls"] = parse_capital_calls(calls_text.group(1))
-    if dists_text:
-        sections["distributions"] = parse_distributions(dists_text.group(1))
-    if adjs_text:
-        sections["adjustments"] = parse_adjustments(adjs_text.group(1))
+def _clean(text: str | None) -> str:
+    return " ".join(text.split()) if text else ""
 
-    return sections
+
+def section_heading(line: str) -> str | None:
+    """The section a heading line opens ("Capital Calls (continued)" -> "Capital Calls"), else None."""
+    line = line.strip()
+    if not line or line[0].isdigit() or len(line.split()) > 6:
+        return None
+    m = _TOKEN.match(line)
+    if not m or line[m.end():m.end() + 1].isalnum():
+        return None
+    return " ".join(m.group(0).split()).title()
 
 
-def parse_capital_calls(text):
-    rows = []
-    pattern = r'(\d{4}-\d{2}-\d{2})\s+(Call\s*\d+)\s+\$?([\d,\,\.]+)\s+(.+?)(?=\d{4}-\d{2}-\d{2}|$)'
-    for m in re.finditer(pattern, text):
-        rows.append({
+def _decimal(text: str) -> Decimal | None:
+    """'$1,000.50' / '-$1,000' / '(1,000)' -> Decimal, None if not an amount."""
+    s = text.replace("$", "").replace(",", "").replace(" ", "")
+    negative = s.startswith("(") and s.endswith(")")
+    if negative:
+        s = s[1:-1]
+    try:
+        value = Decimal(s)
+    except InvalidOperation:
+        return None
+    return -value if negative else value
+
+
+def _text_row(section: str, m: re.Match) -> dict:
+    if section == CALLS:
+        return {
             "call_date": m.group(1),
             "call_type": m.group(2).strip(),
-            "amount": Decimal(m.group(3).replace(',', '')),
-            "description": m.group(4).strip()
-        })
-    return rows
-
-def parse_distributions(text):
-    rows = []
-    pattern = r'(\d{4}-\d{2}-\d{2})\s+([A-Za-z]+)\s+\$?([\d,\.]+)\s+(Yes|No)\s+(.+?)(?=\d{4}-\d{2}-\d{2}|$)'
-    for m in re.finditer(pattern, text):
-        rows.append({
+            "amount": Decimal(m.group(3).replace(",", "")),
+            "description": _clean(m.group(4)),
+        }
+    if section == DISTRIBUTIONS:
+        return {
             "distribution_date": m.group(1),
             "distribution_type": m.group(2).strip(),
-            "amount": Decimal(m.group(3).replace(',', '')),
-            "is_recallable": m.group(4).strip().lower() == "yes",
-            "description": m.group(5).strip()
-        })
-    return rows
-
-def parse_adjustments(text):
-    rows = []
-
-    text = re.split(r'Performance\s+Metrics', text, flags=re.IGNORECASE)[0]
-
-    pattern = r'(\d{4}-\d{2}-\d{2})\s+([A-Za-z ]+?)\s+(-?\$?[\d,\.]+)\s+(.+?)(?=\d{4}-\d{2}-\d{2}|$)'
-    
-    for m in re.finditer(pattern, text):
-        rows.append({
-            "adjustment_date": m.group(1),
-            "adjustment_type": m.group(2).strip(),
-            "amount": Decimal(m.group(3).replace('$', '').replace(',', '')),
-            "description": m.group(4).strip()
-        })
-    
-    return rows
+            "amount": Decimal(m.group(3).replace(",", "")),
+            "is_recallable": m.group(4).lower() == "yes",
+            "description": _clean(m.group(5)),
+        }
+    return {
+        "adjustment_date": m.group(1),
+        "adjustment_type": m.group(2).strip(),
+        "amount": Decimal(m.group(3).replace("$", "").replace(",", "")),
+        "description": _clean(m.group(4)),
+    }
+
+
+def _scan(text: str) -> tuple[dict, list[int], list[str | None]]:
+    """
+    Walk the tokens once. Returns (rows per section, heading offsets,
+    section entered at each heading) - the latter two let tables be placed
+    in the section they appear in.
+    """
+    sections = {CALLS: [], DISTRIBUTIONS: [], ADJUSTMENTS: []}
+    heading_pos, heading_section = [], []
+    section = None
+    row_start = None  # offset of the date opening the current candidate row
+
+    def close_row(end: int):
+        if section is not None and row_start is not None:
+            m = _ROW[section].fullmatch(text, row_start, end)
+            if m:
+                sections[section].append(_text_row(section, m))
+
+    for tok in _TOKEN.finditer(text):
+        start = tok.start()
+        # a date row's text ends where the next token starts
+        close_row(start)
+        row_start = None
+        first = text[start]
+        if first.isdigit():
+            row_start = start
+        else:
+            section = _HEADINGS[first.lower()]
+            heading_pos.append(start)
+            heading_section.append(section)
+    close_row(len(text))
+    return sections, heading_pos, heading_section
+
 
+# header keyword -> field, checked in order
+_COLUMN_KEYWORDS = (
+    ("recallable", "is_recallable"),
+    ("date", "date"),
+    ("amount", "amount"),
+    ("category", "category"),
+    ("description", "description"),
+    ("note", "description"),
+    ("call", "type"),
+    ("type", "type"),
+)
+_DEFAULT_COLUMNS = {
+    CALLS: ["date", "type", "amount", "description"],
+    DISTRIBUTIONS: ["date", "type", "amount", "is_recallable", "description"],
+    ADJUSTMENTS: ["date", "type", "amount", "description"],
+}
+_FIELDS = {
+    CALLS: ("call_date", "call_type"),
+    DISTRIBUTIONS: ("distribution_date", "distribution_type"),
+    ADJUSTMENTS: ("adjustment_date", "adjustment_type"),
+}
 
+
+def _header_columns(row: list) -> list[str | None] | None:
+    columns = []
+    for cell in row:
+        name = _clean(cell).lower()
+        columns.append(next((field for key, field in _COLUMN_KEYWORDS if key in name), None))
+    return columns if "date" in columns and "amount" in columns else None
+
+
+def _table_section(header: list) -> str | None:
+    """Section implied by a header row alone."""
+    names = " ".join(_clean(c).lower() for c in header)
+    if "recallable" in names:
+        return DISTRIBUTIONS
+    if "call" in names.replace("recallable", ""):
+        return CALLS
+    if "category" in names or "adjust" in names:
+        return ADJUSTMENTS
+    return None
+
+
+def _table_row(section: str, columns: list, row: list) -> dict | None:
+    cells = {}
+    for field, cell in zip(columns, row):
+        if field and field not in cells:
+            cells[field] = _clean(cell)
+    date = cells.get("date", "")
+    amount = _decimal(cells.get("amount", ""))
+    if not _DATE.fullmatch(date) or amount is None:
+        return None  # totals, blank or wrapped rows
+    date_field, type_field = _FIELDS[section]
+    out = {date_field: date, type_field: cells.get("type") or None, "amount": amount,
+           "description": cells.get("description", "")}
+    if section == DISTRIBUTIONS:
+        out["is_recallable"] = cells.get("is_recallable", "").lower() in ("yes", "y", "true")
+    if section == ADJUSTMENTS and cells.get("category"):
+        out["category"] = cells["category"]
+    return out
+
+
+def parse_table_rows(tables: list, full_text: str, heading_pos: list[int], heading_section: list) -> dict:
+    """
+    Parse pdfplumber tables (lists of rows of cells, in document order).
+    A table belongs to the section whose heading precedes its first date in
+    the text, or to the section implied by its header columns.
+    """
+    sections = {CALLS: [], DISTRIBUTIONS: [], ADJUSTMENTS: []}
+    cursor = 0
+    for table in tables:
+        if not table:
+            continue
+        columns = _header_columns(table[0])
+        body = table[1:] if columns else table
+
+        section = None
+        first_date = next((_clean(c) for r in body for c in r if c and _DATE.fullmatch(_clean(c))), None)
+        if first_date:
+            pos = full_text.find(first_date, cursor)
+            if pos != -1:
+                cursor = pos
+                i = bisect.bisect_right(heading_pos, pos) - 1
+                section = heading_section[i] if i >= 0 else None
+        if section is None and columns:
+            section = _table_section(table[0])
+        if section is None:
+            continue
+
+        columns = columns or _DEFAULT_COLUMNS[section]
+        for row in body:
+            parsed = _table_row(section, columns, row)
+            if parsed:
+                sections[section].append(parsed)
+    return sections
+
+
+def parse_financial_tables(full_text: str, tables: list | None = None) -> dict:
+    """
+    Parse extracted PDF text (and optionally pdfplumber tables) into
+    structured financial data:
+      - Capital Calls
+      - Distributions
+      - Adjustments
+    """
+    sections, heading_pos, heading_section = _scan(full_text)
+    if tables:
+        from_tables = parse_table_rows(tables, full_text, heading_pos, heading_section)
+        for name, rows in from_tables.items():
+            if rows:
+                sections[name] = rows
+    return sections
@@ -0,0 +1,86 @@
+# backend/app/services/transaction_loader.py
+"""
+Bulk, idempotent loading of parsed transactions.
+
+Rows are built in one pass over parse_financial_tables output and inserted
+with multi-row INSERT ... VALUES statements of BATCH_ROWS rows each. Every
+row carries the SHA-256 of its source PDF, and ON CONFLICT DO NOTHING
+against the (fund, date, type, amount, source document) unique index skips
+rows that are already stored, so re-uploading or replaying a statement
+inserts nothing.
+"""
+from datetime import date
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.transaction import CapitalCall, Distribution, Adjustment
+
+# rows per INSERT statement (9 bind params each, Postgres allows 65535)
+BATCH_ROWS = 1000
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def build_rows(fund_id: int, parsed_data: dict, source_document: str | None = None) -> dict:
+    """{model: [row dict, ...]} for every parsed transaction."""
+    calls = [
+        {
+            "fund_id": fund_id,
+            "call_date": date.fromisoformat(item["call_date"]),
+            "call_type": item.get("call_type"),
+            "amount": item["amount"],
+            "description": item.get("description"),
+            "source_document": source_document,
+        }
+        for item in parsed_data.get("capital_calls") or []
+    ]
+    distributions = [
+        {
+            "fund_id": fund_id,
+            "distribution_date": date.fromisoformat(item["distribution_date"]),
+            "distribution_type": item.get("distribution_type"),
+            "is_recallable": item.get("is_recallable", False),
+            "amount": item["amount"],
+            "description": item.get("description"),
+            "source_document": source_document,
+        }
+        for item in parsed_data.get("distributions") or []
+    ]
+    adjustments = [
+        {
+            "fund_id": fund_id,
+            "adjustment_date": date.fromisoformat(item["adjustment_date"]),
+            "adjustment_type": item.get("adjustment_type"),
+            "category": item.get("category"),
+            "amount": item["amount"],
+            "is_contribution_adjustment": item.get("is_contribution_adjustment", False),
+            "description": item.get("description"),
+            "source_document": source_document,
+        }
+        for item in parsed_data.get("adjustments") or []
+    ]
+    return {CapitalCall: calls, Distribution: distributions, Adjustment: adjustments}
+
+
+def bulk_insert_transactions(db, fund_id: int, parsed_data: dict, source_document: str | None = None) -> tuple[int, int]:
+    """
+    Insert parsed transactions, skipping rows already stored for the same
+    source document. Returns (inserted, total). The caller commits.
+    """
+    dialect = db.get_bind().dialect.name
+    dialect_insert = _INSERTS.get(dialect)
+    if dialect_insert is None:
+        print(f"[WARN] No ON CONFLICT support for {dialect}; duplicates are not skipped")
+
+    inserted = total = 0
+    for model, rows in build_rows(fund_id, parsed_data, source_document).items():
+        total += len(rows)
+        for start in range(0, len(rows), BATCH_ROWS):
+            batch = rows[start:start + BATCH_ROWS]
+            if dialect_insert is not None:
+                stmt = dialect_insert(model).values(batch).on_conflict_do_nothing()
+            else:
+                stmt = insert(model).values(batch)
+            inserted += db.execute(stmt).rowcount
+    return inserted, total
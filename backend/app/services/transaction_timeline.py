@@ -0,0 +1,128 @@
+# backend/app/services/transaction_timeline.py
+"""
+Keyset-paginated transaction timeline.
+
+A fund's capital calls, distributions and adjustments are merged in SQL with
+one UNION ALL ordered by (date DESC, source, id DESC). Each branch is
+filtered by the cursor and limited on its own, so every branch is a short
+range scan of its (fund_id, date, id) index and the database merges at
+most 3 * (limit + 1) rows, however deep the page.
+
+The cursor is the (date, source, id) of the last row returned, encoded as an
+opaque url-safe string.
+"""
+import base64
+import json
+from datetime import date
+
+from sqlalchemy import select, literal, union_all, tuple_, and_
+
+from app.models.transaction import CapitalCall, Distribution, Adjustment
+
+# source -> (model, date column, type column, label prefix); order is the tie-break rank
+SOURCES = {
+    "capital_call": (CapitalCall, CapitalCall.call_date, CapitalCall.call_type, "Capital Call"),
+    "distribution": (Distribution, Distribution.distribution_date, Distribution.distribution_type, "Distribution"),
+    "adjustment": (Adjustment, Adjustment.adjustment_date, Adjustment.adjustment_type, "Adjustment"),
+}
+_RANK = {source: i for i, source in enumerate(SOURCES)}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(row_date: date, source: str, row_id: int) -> str:
+    raw = json.dumps([row_date.isoformat(), source, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        d, source, row_id = json.loads(raw)
+        if source not in SOURCES:
+            raise ValueError(source)
+        return date.fromisoformat(d), source, int(row_id)
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def _after(source: str, date_col, id_col, cursor: tuple[date, str, int] | None):
+    """Rows of `source` that sort after the cursor in (date DESC, rank, id DESC)."""
+    if cursor is None:
+        return None
+    c_date, c_source, c_id = cursor
+    if _RANK[source] > _RANK[c_source]:
+        return date_col <= c_date
+    if _RANK[source] < _RANK[c_source]:
+        return date_col < c_date
+    return tuple_(date_col, id_col) < tuple_(c_date, c_id)
+
+
+def _branch(source: str, fund_id: int, cursor, limit: int):
+    model, date_col, type_col, _ = SOURCES[source]
+    stmt = select(
+        literal(source).label("source"),
+        literal(_RANK[source]).label("rank"),
+        model.id.label("id"),
+        date_col.label("date"),
+        type_col.label("type"),
+        model.amount.label("amount"),
+        model.description.label("description"),
+    )
+    after = _after(source, date_col, model.id, cursor)
+    stmt = stmt.where(and_(model.fund_id == fund_id, *([after] if after is not None else [])))
+    return stmt.order_by(date_col.desc(), model.id.desc()).limit(limit)
+
+
+def timeline_page(db, fund_id: int, limit: int = 100, cursor: str | None = None,
+                  sources: list[str] | None = None) -> tuple[list[dict], str | None]:
+    """
+    One page of the fund's transactions, newest first. Returns (rows,
+    next_cursor); next_cursor is None on the last page.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    branches = [_branch(s, fund_id, position, limit + 1) for s in (sources or SOURCES)]
+    # each branch keeps its own ORDER BY / LIMIT inside a subquery
+    parts = [select(b.subquery()) for b in branches]
+    u = union_all(*parts).subquery() if len(parts) > 1 else parts[0].subquery()
+    stmt = select(u).order_by(u.c.date.desc(), u.c.rank, u.c.id.desc()).limit(limit + 1)
+    rows = db.execute(stmt).all()
+
+    items = [
+        {
+            "id": r.id,
+            "date": r.date,
+            "type": f"{SOURCES[r.source][3]}: {r.type}",
+            "amount": float(r.amount),
+            "description": r.description,
+            "source": r.source,
+        }
+        for r in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last.date, last.source, last.id)
+    return items, next_cursor
+
+
+def keyset_page(db, source: str, fund_id: int, limit: int, cursor: str | None = None):
+    """
+    One page of a single transaction table, newest first, as full ORM rows.
+    Returns (rows, next_cursor).
+    """
+    model, date_col, _, _ = SOURCES[source]
+    q = db.query(model).filter(model.fund_id == fund_id)
+    if cursor:
+        position = decode_cursor(cursor)
+        if position[1] != source:
+            raise InvalidCursor(f"Cursor belongs to {position[1]}, not {source}")
+        q = q.filter(_after(source, date_col, model.id, position))
+    rows = q.order_by(date_col.desc(), model.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(getattr(last, date_col.key), source, last.id)
+    return rows[:limit], next_cursor
@@ -0,0 +1,102 @@
+# backend/app/services/upload_store.py
+"""
+Content-addressed storage for uploaded PDFs.
+
+An upload is streamed to a temporary file in 1 MiB blocks while its SHA-256
+is computed, then moved to {UPLOAD_DIR}/{hash[:2]}/{hash}.pdf. The same
+bytes are therefore stored once, whatever their file name, and concurrent
+uploads never write to the same path.
+
+Documents share a file, so "keep the file + commit the row that points at
+it" (upload) and "commit the row's deletion + remove the file if no row is
+left" (delete) run under file_lock(path), an flock that serializes them
+across API processes: an upload either sees the file removed and puts its
+copy in place, or a delete sees the new row and keeps the file.
+"""
+import hashlib
+import os
+import tempfile
+
+from app.models.document import Document
+from app.services.record_log import locked
+
+UPLOAD_DIR = "/app/uploads"
+_BLOCK = 1 << 20
+
+
+def content_path(content_hash: str, upload_dir: str = UPLOAD_DIR) -> str:
+    return os.path.join(upload_dir, content_hash[:2], f"{content_hash}.pdf")
+
+
+def file_lock(path: str):
+    """Inter-process lock for the stored file at path (see module docstring)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return locked(path + ".lock")
+
+
+def spool_upload(fileobj, upload_dir: str = UPLOAD_DIR) -> tuple[str, str]:
+    """Stream `fileobj` to a temporary file. Returns (sha256 hex, temporary path)."""
+    os.makedirs(upload_dir, exist_ok=True)
+    h = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=upload_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for block in iter(lambda: fileobj.read(_BLOCK), b""):
+                h.update(block)
+                out.write(block)
+        return h.hexdigest(), tmp_path
+    except BaseException:
+        discard(tmp_path)
+        raise
+
+
+def place_upload(tmp_path: str, content_hash: str, upload_dir: str = UPLOAD_DIR) -> str:
+    """
+    Move a spooled upload to its content-addressed path, or drop it if the
+    file is already there. Call with file_lock(path) held. Returns the path.
+    """
+    path = content_path(content_hash, upload_dir)
+    if os.path.exists(path):
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, path)  # atomic: readers never see a partial file
+    return path
+
+
+def discard(tmp_path: str):
+    try:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    except OSError:
+        pass
+
+
+def find_duplicate(db, content_hash: str, fund_id: int | None) -> Document | None:
+    """A document of the same fund with the same bytes that is parsed or being parsed."""
+    return (
+        db.query(Document)
+        .filter(
+            Document.content_hash == content_hash,
+            Document.fund_id.is_(None) if fund_id is None else Document.fund_id == fund_id,
+            Document.parsing_status != "error",
+        )
+        .order_by(Document.id)
+        .first()
+    )
+
+
+def release_file(db, file_path: str | None):
+    """
+    Delete the file unless a document still uses it (best-effort). Call with
+    file_lock(file_path) held, after the deleting transaction committed.
+    """
+    if not file_path:
+        return
+    shared = db.query(Document.id).filter(Document.file_path == file_path).first()
+    if shared:
+        return
+    try:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+    except Exception:
+        pass
@@ -1,78 +1,580 @@
 # backend/app/services/vector_store.py
 import faiss
+import heapq
+import itertools
+import json
 import numpy as np
 import os
 import pickle
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app.core.config import settings
+from app.services import ann_index, record_log
+from app.services.chunk_store import ChunkStore
+from app.services.lexical_index import BM25Index, reciprocal_rank_fusion
 
 VECTOR_DIR = "/app/vector_store"
 
 class VectorStore:
     """
     Simple FAISS-based vector store for each fund.
-    Persists index and metadata to disk.
+
+    The FAISS index starts flat and is promoted to VECTOR_INDEX_TYPE once it
+    is large enough (see ann_index).
+
+    On disk an index is a snapshot ({name}.faiss + {name}.chunks) plus two
+    append-only logs written by add_texts: {name}.vlog (float32 vectors) and
+    {name}.tlog (text + metadata as JSON). Snapshot texts stay in the
+    memory-mapped chunk file and are decoded only for search hits; only the
+    texts from the logs are held as Python strings. Once the logs grow past
+    VECTOR_LOG_COMPACT_RECORDS a background thread folds them into a fresh
+    snapshot.
+
+    Every process serving the index appends to the same logs, so appends and
+    compactions hold an flock on {name}.lock and first apply whatever other
+    processes wrote since (new log records, or a whole new snapshot).
+
+    A BM25 index over the same chunks ({name}.bm25, written at compaction
+    and extended by add_texts) backs hybrid_search.
     """
 
     def __init__(self, index_name: str):
         os.makedirs(VECTOR_DIR, exist_ok=True)
         self.index_path = os.path.join(VECTOR_DIR, f"{index_name}.faiss")
-        self.meta_path = os.path.join(VECTOR_DIR, f"{index_name}_meta.pkl")
+        self.chunks_path = os.path.join(VECTOR_DIR, f"{index_name}.chunks")
+        self.meta_path = os.path.join(VECTOR_DIR, f"{index_name}_meta.pkl")  # legacy
+        self.vlog_path = os.path.join(VECTOR_DIR, f"{index_name}.vlog")
+        self.tlog_path = os.path.join(VECTOR_DIR, f"{index_name}.tlog")
+        self.bm25_path = os.path.join(VECTOR_DIR, f"{index_name}.bm25")
+        self.lock_path = os.path.join(VECTOR_DIR, f"{index_name}.lock")
 
         self.dim = 1536  # text-embedding-3-small
-        self.texts = []
+        self._lock = threading.RLock()
+        self._compacting = False
 
-        if os.path.exists(self.index_path):
-            try:
-                self.index = faiss.read_index(self.index_path)
-                try:
-                    idx_d = self.index.d
-                except AttributeError:
-                    idx_d = None
-                if idx_d and idx_d != self.dim:
-                    # recreate index to avoid mismatched dims
-                    self.index = faiss.IndexFlatL2(self.dim)
-                    self.texts = []
-                else:
-                    # load texts if meta exists
-                    if os.path.exists(self.meta_path):
-                        with open(self.meta_path, "rb") as f:
-                            self.texts = pickle.load(f)
-                    else:
-                        self.texts = []
-            except Exception:
-                self.index = faiss.IndexFlatL2(self.dim)
-                self.texts = []
-        else:
+        with record_log.locked(self.lock_path):
+            self._load()
+
+    def _load(self):
+        """(Re)load snapshot and logs from disk; the file lock must be held."""
+        self._chunks = None       # ChunkStore of the snapshot
+        self._tail_texts = []     # texts added after the snapshot
+        self._tail_metadatas = []
+        self._log_records = 0
+        self._vlog_end = 0        # log bytes already applied
+        self._tlog_end = 0
+        self._load_snapshot()
+        self._load_lexical()
+        self._replay_logs()
+        self._text_bytes = sum(len(t) for t in self._tail_texts)
+        self.mtime = self._disk_mtime()
+
+    def _snapshot_stat(self):
+        try:
+            st = os.stat(self.index_path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _load_snapshot(self):
+        self.index = faiss.IndexFlatL2(self.dim)
+        self._snapshot_id = self._snapshot_stat()
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            index = faiss.read_index(self.index_path)
+            if getattr(index, "d", self.dim) != self.dim:
+                # recreate index to avoid mismatched dims
+                return
+            if not os.path.exists(self.chunks_path) and os.path.exists(self.meta_path):
+                self._migrate_pickled_texts(index.ntotal)
+            # the chunk file is written before the index during compaction,
+            # so it may briefly hold more entries than the index
+            chunks = ChunkStore(self.chunks_path, limit=index.ntotal)
+            if len(chunks) < index.ntotal:
+                raise ValueError(f"{self.chunks_path} has {len(chunks)} chunks, index has {index.ntotal}")
+            self.index = index
+            self._chunks = chunks
+        except Exception as e:
+            print(f"[WARN] Failed to load vector store snapshot {self.index_path}: {e}")
             self.index = faiss.IndexFlatL2(self.dim)
-            self.texts = []
+            self._chunks = None
+
+    def _load_lexical(self):
+        """BM25 postings of the snapshot chunks; rebuilt from the texts if missing or out of date."""
+        base = len(self._chunks) if self._chunks else 0
+        if os.path.exists(self.bm25_path):
+            try:
+                lexical = BM25Index.load(self.bm25_path)
+                if len(lexical) == base:
+                    self.lexical = lexical
+                    return
+            except Exception as e:
+                print(f"[WARN] Failed to load lexical index {self.bm25_path}: {e}")
+        self.lexical = BM25Index()
+        if base:
+            print(f"[DEBUG] Building lexical index for {self.index_path} ({base} chunks)")
+            self.lexical.add(self._chunks.text(i) for i in range(base))
+
+    def _migrate_pickled_texts(self, count: int):
+        """Convert a pre-chunk-store {name}_meta.pkl into {name}.chunks."""
+        with open(self.meta_path, "rb") as f:
+            meta = pickle.load(f)
+        if isinstance(meta, dict):
+            texts, metadatas = meta["texts"], meta["metadatas"]
+        else:  # plain list of texts
+            texts, metadatas = meta, [{} for _ in meta]
+        ChunkStore.write(self.chunks_path, texts[:count], metadatas[:count])
+        os.remove(self.meta_path)
+
+    def _replay_logs(self):
+        """Apply log records past what is in memory; the file lock must be held."""
+        base = self.index.ntotal
+        vectors, _ = record_log.read_records(self.vlog_path, base, self._vlog_end)
+        entries, _ = record_log.read_records(self.tlog_path, base, self._tlog_end)
+        n = min(len(vectors), len(entries))
+        # drop whatever a crash left behind past the last complete add
+        self._vlog_end = record_log.truncate_records(self.vlog_path, n, base, self._vlog_end)
+        self._tlog_end = record_log.truncate_records(self.tlog_path, n, base, self._tlog_end)
+        if n == 0:
+            return
+        self.index.add(np.frombuffer(b"".join(vectors[:n]), dtype="float32").reshape(n, self.dim))
+        texts = []
+        for raw in entries[:n]:
+            entry = json.loads(raw)
+            texts.append(entry["text"])
+            self._tail_metadatas.append(entry.get("metadata") or {})
+        self._tail_texts.extend(texts)
+        self.lexical.add(texts)
+        self._log_records += n
+
+    def _catch_up(self):
+        """
+        Apply what other processes wrote since we last looked; the file lock
+        must be held. A new snapshot (another process compacted) means a
+        full reload.
+        """
+        def size(path):
+            return os.path.getsize(path) if os.path.exists(path) else 0
+
+        if (self._snapshot_stat() != self._snapshot_id
+                or size(self.vlog_path) < self._vlog_end or size(self.tlog_path) < self._tlog_end):
+            print(f"[DEBUG] Reloading vector store {self.index_path} changed by another process")
+            self._load()
+            return
+        self._replay_logs()
+        self._text_bytes = sum(len(t) for t in self._tail_texts)
+
+    def _disk_mtime(self):
+        mtimes = []
+        for path in (self.index_path, self.chunks_path, self.vlog_path, self.tlog_path):
+            try:
+                mtimes.append(os.path.getmtime(path))
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def is_stale(self) -> bool:
+        """True if another process wrote the index files since we loaded them."""
+        return self._disk_mtime() != self.mtime
+
+    def nbytes(self) -> int:
+        """
+        Approximate resident size: float32 vectors plus unsnapshotted texts
+        (snapshot texts live in shared, evictable file pages).
+        """
+        return ann_index.approx_nbytes(self.index, self.dim) + self._text_bytes
+
+    def __len__(self):
+        return (len(self._chunks) if self._chunks else 0) + len(self._tail_texts)
 
-    def add_texts(self, texts: list[str], embeddings: list[list[float]]):
+    def get_text(self, i: int) -> str:
+        base = len(self._chunks) if self._chunks else 0
+        return self._chunks.text(i) if i < base else self._tail_texts[i - base]
+
+    def get_metadata(self, i: int) -> dict:
+        base = len(self._chunks) if self._chunks else 0
+        return self._chunks.metadata(i) if i < base else self._tail_metadatas[i - base]
+
+    def count_document_chunks(self, document_id: int) -> int:
+        """Number of chunks indexed for document_id."""
+        with self._lock:
+            n = self._chunks.count_metadata("document_id", document_id) if self._chunks else 0
+            return n + sum(1 for m in self._tail_metadatas if m.get("document_id") == document_id)
+
+    def add_texts(self, texts: list[str], embeddings: list[list[float]], metadatas: list[dict] | None = None):
         if len(embeddings) == 0:
             return
         vectors = np.array(embeddings).astype("float32")
         if vectors.ndim != 2 or vectors.shape[1] != self.dim:
             raise ValueError(f"Embeddings dimension mismatch. Expected {self.dim}, got {vectors.shape}")
-        self.index.add(vectors)
-        self.texts.extend(texts)
-        self._save()
+        metadatas = metadatas or [{} for _ in texts]
+        with self._lock, record_log.locked(self.lock_path):
+            # the next seq is whatever follows the records on disk
+            self._catch_up()
+            seq = self.index.ntotal
+            try:
+                # vectors first: a text record without its vector is never replayed
+                vlog_end = record_log.append_records(self.vlog_path, seq, [v.tobytes() for v in vectors])
+                tlog_end = record_log.append_records(self.tlog_path, seq, [
+                    json.dumps({"text": t, "metadata": m}).encode("utf-8")
+                    for t, m in zip(texts, metadatas)
+                ])
+            except Exception as e:
+                print(f"[ERROR] Failed to persist vector store {self.index_path}: {e}")
+                # a vector batch without its texts would be dropped on replay anyway
+                record_log.truncate_records(self.vlog_path, 0, seq, self._vlog_end)
+                raise
+            self._vlog_end, self._tlog_end = vlog_end, tlog_end
+            self.index.add(vectors)
+            self.lexical.add(texts)
+            self._tail_texts.extend(texts)
+            self._tail_metadatas.extend(metadatas)
+            self._text_bytes += sum(len(t) for t in texts)
+            self._log_records += len(texts)
+            self.mtime = self._disk_mtime()
+            needs_compaction = (
+                self._log_records >= settings.VECTOR_LOG_COMPACT_RECORDS
+                or ann_index.should_promote(self.index)
+            )
+            if needs_compaction and not self._compacting:
+                self._compacting = True
+                threading.Thread(target=self.compact, daemon=True).start()
 
-    def search(self, query_emb: list[float], top_k: int = 3):
+    def search(self, query_emb: list[float], top_k: int = 3, nprobe: int | None = None, ef_search: int | None = None):
+        """
+        Nearest chunks to query_emb. nprobe (IVF) and ef_search (HNSW) trade
+        latency for recall; they default to the configured values.
+        """
         if getattr(self.index, "ntotal", 0) == 0:
             return []
         query_vec = np.array([query_emb]).astype("float32")
-        distances, indices = self.index.search(query_vec, top_k)
-        results = []
-        for i, idx in enumerate(indices[0]):
-            if idx < len(self.texts) and idx != -1:
-                results.append({
-                    "text": self.texts[idx],
-                    "score": float(distances[0][i])
-                })
+        with self._lock:
+            params = ann_index.search_params(self.index, nprobe=nprobe, ef_search=ef_search)
+            if params is None:
+                distances, indices = self.index.search(query_vec, top_k)
+            else:
+                distances, indices = self.index.search(query_vec, top_k, params=params)
+            n = len(self)
+            results = []
+            for i, idx in enumerate(indices[0]):
+                if idx < n and idx != -1:
+                    results.append({
+                        "text": self.get_text(idx),
+                        "metadata": self.get_metadata(idx),
+                        "score": float(distances[0][i])
+                    })
         return results
 
-    def _save(self):
+    def lexical_stats(self, query: str) -> tuple[int, int, dict[str, int]]:
+        """BM25 statistics of the query terms in this index (see BM25Index.term_stats)."""
+        with self._lock:
+            return self.lexical.term_stats(query)
+
+    def hybrid_candidates(self, query: str, query_emb: list[float], n: int,
+                          lexical_stats: tuple | None = None) -> tuple[list, list]:
+        """
+        (dense, lexical) candidate lists of (key, position, result), best
+        first: up to n nearest vectors keyed by L2 distance and n best BM25
+        matches keyed by BM25 score (under lexical_stats when given).
+        """
+        if getattr(self.index, "ntotal", 0) == 0:
+            return [], []
+        query_vec = np.array([query_emb]).astype("float32")
+        with self._lock:
+            params = ann_index.search_params(self.index)
+            if params is None:
+                distances, indices = self.index.search(query_vec, n)
+            else:
+                distances, indices = self.index.search(query_vec, n, params=params)
+            total = len(self)
+
+            def result(idx: int) -> dict:
+                return {"text": self.get_text(idx), "metadata": self.get_metadata(idx)}
+
+            dense = [
+                (float(d), int(i), result(int(i)))
+                for d, i in zip(distances[0], indices[0]) if 0 <= i < total
+            ]
+            lexical = [
+                (score, i, result(i))
+                for i, score in self.lexical.search(query, n, stats=lexical_stats) if i < total
+            ]
+        return dense, lexical
+
+    def hybrid_search(self, query: str, query_emb: list[float], top_k: int = 3):
+        """
+        Vector and BM25 candidates (HYBRID_CANDIDATES each) fused by
+        reciprocal rank; "score" is the fused score, higher is better.
+        """
+        dense, lexical = self.hybrid_candidates(query, query_emb, max(top_k, settings.HYBRID_CANDIDATES))
+        results = {i: r for _, i, r in dense + lexical}
+        fused = reciprocal_rank_fusion(
+            [[i for _, i, _ in dense], [i for _, i, _ in lexical]], k=settings.HYBRID_RRF_K
+        )[:top_k]
+        return [{**results[i], "score": score} for i, score in fused]
+
+    def _promote(self):
+        """
+        Rebuild a large flat index as the configured ANN type. Training runs
+        outside the lock on a copy of the vectors; whatever was added
+        meanwhile is copied over before the swap.
+        """
+        with self._lock:
+            n = self.index.ntotal
+            vectors = self.index.reconstruct_n(0, n)
+        kind = settings.VECTOR_INDEX_TYPE
+        print(f"[DEBUG] Promoting {self.index_path} ({n} vectors) to {kind}")
+        promoted = ann_index.build_index(kind, self.dim, vectors)
+        with self._lock:
+            if self.index.ntotal > n:
+                promoted.add(self.index.reconstruct_n(n, self.index.ntotal - n))
+            self.index = promoted
+
+    def compact(self):
+        """Fold the logs into a new snapshot, then empty the logs."""
+        try:
+            if ann_index.should_promote(self.index):
+                self._promote()
+            with self._lock, record_log.locked(self.lock_path):
+                # records other processes appended must be in the snapshot
+                # before the logs are emptied
+                self._catch_up()
+                index_tmp = self.index_path + ".tmp"
+                ChunkStore.write(self.chunks_path, self._tail_texts, self._tail_metadatas, base=self._chunks)
+                faiss.write_index(self.index, index_tmp)
+                os.replace(index_tmp, self.index_path)
+                # a .bm25 that does not match the snapshot size is rebuilt on load
+                self.lexical.save(self.bm25_path)
+                # records still in the logs now have seq < snapshot size and
+                # are skipped on replay, so a crash here is harmless
+                record_log.reset(self.vlog_path)
+                record_log.reset(self.tlog_path)
+                self._chunks = ChunkStore(self.chunks_path)
+                self._tail_texts, self._tail_metadatas = [], []
+                self._text_bytes = 0
+                self._log_records = 0
+                self._vlog_end = self._tlog_end = 0
+                self._snapshot_id = self._snapshot_stat()
+                self.mtime = self._disk_mtime()
+        except Exception as e:
+            print(f"[WARN] Failed to compact vector store {self.index_path}: {e}")
+        finally:
+            self._compacting = False
+
+
+# Process-wide registry of loaded indexes, most recently used last.
+_stores: "OrderedDict[str, VectorStore]" = OrderedDict()
+_stores_lock = threading.Lock()
+
+
+def _evict_over_budget(keep: str):
+    budget = settings.VECTOR_STORE_CACHE_MB * 1024 * 1024
+    total = sum(s.nbytes() for s in _stores.values())
+    for name in list(_stores):
+        if total <= budget:
+            break
+        if name == keep:
+            continue
+        total -= _stores.pop(name).nbytes()
+        print(f"[DEBUG] Evicted vector store '{name}' from memory")
+
+
+def get_vector_store(index_name: str):
+    """
+    Return the shared, already-loaded VectorStore for index_name.
+    Indexes are loaded once per process and reloaded only if the file on
+    disk changed; least recently used ones are dropped past
+    VECTOR_STORE_CACHE_MB. With VECTOR_BACKEND=pgvector a PgVectorStore
+    is returned instead.
+    """
+    if settings.VECTOR_BACKEND == "pgvector":
+        from app.services.pgvector_store import PgVectorStore
+        return PgVectorStore(index_name)
+
+    with _stores_lock:
+        store = _stores.get(index_name)
+        if store is not None and not store.is_stale():
+            _stores.move_to_end(index_name)
+            return store
+
+    # load outside the registry lock so one cold index doesn't block the others
+    store = VectorStore(index_name=index_name)
+
+    with _stores_lock:
+        current = _stores.get(index_name)
+        if current is not None and not current.is_stale():
+            store = current  # another thread loaded it meanwhile
+        else:
+            _stores[index_name] = store
+        _stores.move_to_end(index_name)
+        _evict_over_budget(keep=index_name)
+        return store
+
+
+_search_pool = None
+_search_pool_lock = threading.Lock()
+
+
+def _get_search_pool() -> ThreadPoolExecutor:
+    global _search_pool
+    with _search_pool_lock:
+        if _search_pool is None:
+            _search_pool = ThreadPoolExecutor(
+                max_workers=settings.CROSS_FUND_SEARCH_WORKERS, thread_name_prefix="vector-search"
+            )
+        return _search_pool
+
+
+def _peek_vector_store(index_name: str):
+    """
+    The loaded VectorStore for index_name without marking it recently used.
+    An index that is not loaded (or stale) is read from disk and registered
+    as least recently used only if it fits in VECTOR_STORE_CACHE_MB without
+    evicting anything; otherwise it is used for this call only. Portfolio-
+    wide searches touch every index and must not cycle them all through the
+    registry.
+    """
+    if settings.VECTOR_BACKEND == "pgvector":
+        from app.services.pgvector_store import PgVectorStore
+        return PgVectorStore(index_name)
+    with _stores_lock:
+        store = _stores.get(index_name)
+    if store is not None and not store.is_stale():
+        return store
+
+    store = VectorStore(index_name=index_name)
+    with _stores_lock:
+        current = _stores.get(index_name)
+        if current is not None and not current.is_stale():
+            return current
+        budget = settings.VECTOR_STORE_CACHE_MB * 1024 * 1024
+        used = sum(s.nbytes() for name, s in _stores.items() if name != index_name)
+        if used + store.nbytes() <= budget:
+            _stores[index_name] = store
+            _stores.move_to_end(index_name, last=False)
+    return store
+
+
+def index_exists(index_name: str) -> bool:
+    """True if the FAISS index has anything on disk (always True for pgvector)."""
+    if settings.VECTOR_BACKEND == "pgvector":
+        return True
+    return any(
+        os.path.exists(os.path.join(VECTOR_DIR, f"{index_name}{suffix}"))
+        for suffix in (".faiss", ".vlog", "_meta.pkl")
+    )
+
+
+def _push_bounded(heap: list, size: int, item: tuple):
+    """Keep the `size` largest items (by item[0]) in a min-heap."""
+    if len(heap) < size:
+        heapq.heappush(heap, item)
+    elif item[0] > heap[0][0]:
+        heapq.heapreplace(heap, item)
+
+
+def _sum_stats(stats: list[tuple[int, int, dict[str, int]]]) -> tuple[int, int, dict[str, int]]:
+    n, total_len, df = 0, 0, {}
+    for index_n, index_len, index_df in stats:
+        n += index_n
+        total_len += index_len
+        for term, count in index_df.items():
+            df[term] = df.get(term, 0) + count
+    return n, total_len, df
+
+
+def search_indexes(index_names: list[str], query: str, query_emb: list[float], top_k: int = 3,
+                   hybrid: bool = True) -> list[dict]:
+    """
+    Search several indexes in parallel on a shared thread pool (FAISS
+    releases the GIL while searching) and merge the results with bounded
+    heaps as they arrive. Vector distances are comparable across indexes
+    (same embedding model), so the global nearest neighbours are exact.
+    BM25 scores are made comparable by scoring every index with the summed
+    statistics of all of them (a first, cheap pass), so the merged lexical
+    ranking is the one of a single portfolio-wide index. With hybrid, the
+    two merged rankings are fused by reciprocal rank once. Each result gets
+    its "index". Indexes that are not loaded are read for this call only.
+    """
+    n = max(top_k, settings.HYBRID_CANDIDATES) if hybrid else top_k
+    names = [name for name in dict.fromkeys(index_names) if index_exists(name)]
+    if not names:
+        return []
+    pool = _get_search_pool()
+
+    def open_one(name: str):
+        vs = _peek_vector_store(name)
+        stats = vs.lexical_stats(query) if hybrid and hasattr(vs, "lexical_stats") else None
+        return vs, stats
+
+    stores, stats = {}, []
+    futures = {pool.submit(open_one, name): name for name in names}
+    for future in as_completed(futures):
+        name = futures[future]
+        try:
+            stores[name], index_stats = future.result()
+        except Exception as e:
+            print(f"[WARN] Loading vector store '{name}' failed: {e}")
+            continue
+        if index_stats is not None:
+            stats.append(index_stats)
+    corpus_stats = _sum_stats(stats) if stats else None
+
+    def search_one(vs):
+        if corpus_stats is not None and hasattr(vs, "hybrid_candidates"):
+            return vs.hybrid_candidates(query, query_emb, n, lexical_stats=corpus_stats)
+        return [(r["score"], i, r) for i, r in enumerate(vs.search(query_emb, n))], []
+
+    futures = {pool.submit(search_one, vs): name for name, vs in stores.items()}
+    seq = itertools.count()
+    dense_heap: list = []    # (-distance, tie-break, key, result)
+    lexical_heap: list = []  # (bm25 score, tie-break, key, result)
+    for future in as_completed(futures):
+        name = futures[future]
+        try:
+            dense, lexical = future.result()
+        except Exception as e:
+            print(f"[WARN] Search of vector store '{name}' failed: {e}")
+            continue
+        for distance, i, r in dense:
+            _push_bounded(dense_heap, n, (-distance, next(seq), (name, i), {**r, "index": name, "distance": distance}))
+        for score, i, r in lexical:
+            _push_bounded(lexical_heap, n, (score, next(seq), (name, i), {**r, "index": name}))
+
+    dense_ranked = sorted(dense_heap, key=lambda item: (-item[0], item[1]))
+    if not hybrid:
+        return [{k: v for k, v in r.items() if k != "distance"} | {"score": r["distance"]}
+                for _, _, _, r in dense_ranked]
+    lexical_ranked = sorted(lexical_heap, key=lambda item: (-item[0], item[1]))
+    results = {key: r for _, _, key, r in dense_ranked + lexical_ranked}
+    fused = reciprocal_rank_fusion(
+        [[key for _, _, key, _ in dense_ranked], [key for _, _, key, _ in lexical_ranked]],
+        k=settings.HYBRID_RRF_K,
+    )[:top_k]
+    out = []
+    for key, score in fused:
+        r = dict(results[key])
+        r.pop("distance", None)
+        out.append({**r, "score": score})
+    return out
+
+
+def delete_vector_store(index_name: str):
+    """Remove an index from memory and from its backend (e.g. after its fund was deleted)."""
+    if settings.VECTOR_BACKEND == "pgvector":
+        from app.services.pgvector_store import PgVectorStore
+        PgVectorStore(index_name).delete()
+        return
+
+    with _stores_lock:
+        _stores.pop(index_name, None)
+    for suffix in (".faiss", ".chunks", ".vlog", ".tlog", ".bm25", ".lock", "_meta.pkl"):
+        path = os.path.join(VECTOR_DIR, f"{index_name}{suffix}")
         try:
-            faiss.write_index(self.index, self.index_path)
-            with open(self.meta_path, "wb") as f:
-                pickle.dump(self.texts, f)
+            if os.path.exists(path):
+                os.remove(path)
         except Exception as e:
-            print(f"[WARN] Failed to save vector store: {e}")
+            print(f"[WARN] Failed to remove {path}: {e}")
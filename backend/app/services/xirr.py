@@ -0,0 +1,139 @@
+# backend/app/services/xirr.py
+"""
+Date-aware IRR (XIRR) solver.
+
+Cashflows are discounted by actual day counts (ACT/365), so irregular call and
+distribution dates are handled correctly. The solver works on a batch of funds
+at once: cashflows are packed into zero-padded (funds x flows) matrices, a root
+is bracketed on a coarse rate grid, and then refined with Newton steps using
+the analytic derivative, falling back to bisection whenever a Newton step
+leaves the bracket.
+"""
+import numpy as np
+
+DAYS_PER_YEAR = 365.0
+
+# Rate grid used to bracket roots: dense around 0, up to +10000% per year
+_MIN_RATE = -0.9999
+_MAX_RATE = 100.0
+_GRID = np.expm1(np.linspace(np.log1p(_MIN_RATE), np.log1p(_MAX_RATE), 96))
+_GRID_CHUNK_ELEMENTS = 1 << 22
+
+
+def year_fractions(dates) -> np.ndarray:
+    """Years elapsed since the first date, using actual day counts."""
+    days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+    if days.size == 0:
+        return days.astype(np.float64)
+    return (days - days.min()) / DAYS_PER_YEAR
+
+
+def pack_cashflows(groups) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pack an iterable of (dates, amounts) pairs into padded matrices.
+    Padding uses amount 0, which contributes nothing to the NPV.
+    """
+    groups = list(groups)
+    width = max((len(a) for _, a in groups), default=0)
+    times = np.zeros((len(groups), width), dtype=np.float64)
+    amounts = np.zeros((len(groups), width), dtype=np.float64)
+    for row, (dates, values) in enumerate(groups):
+        n = len(values)
+        if n:
+            times[row, :n] = year_fractions(dates)
+            amounts[row, :n] = values
+    return times, amounts
+
+
+def _npv_and_derivative(rates, times, amounts):
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        disc = np.exp(-times * np.log1p(rates)[:, None])
+        flows = amounts * disc
+        npv = flows.sum(axis=1)
+        dnpv = -(times * flows).sum(axis=1) / (1.0 + rates)
+    return npv, dnpv
+
+
+def _bracket(times, amounts):
+    """
+    Evaluate the NPV on the rate grid and pick, per fund, the sign-change
+    interval closest to 0%. Funds without a sign change get NaN bounds.
+    """
+    n, m = times.shape
+    log_grid = np.log1p(_GRID)
+    values = np.empty((n, _GRID.size))
+    # evaluate the whole grid at once, in fund chunks of bounded size
+    step = max(1, _GRID_CHUNK_ELEMENTS // max(1, _GRID.size * m))
+    with np.errstate(over="ignore", invalid="ignore"):
+        for start in range(0, n, step):
+            t = times[start:start + step, None, :]
+            a = amounts[start:start + step, None, :]
+            disc = np.exp(-t * log_grid[None, :, None])
+            values[start:start + step] = (a * disc).sum(axis=2)
+
+    signs = np.sign(values)
+    change = (signs[:, :-1] * signs[:, 1:] <= 0) & np.isfinite(values[:, :-1]) & np.isfinite(values[:, 1:])
+    distance = np.abs(np.log1p(0.5 * (_GRID[:-1] + _GRID[1:])))
+    cost = np.where(change, distance[None, :], np.inf)
+    best = np.argmin(cost, axis=1)
+    # a root needs at least one inflow and one outflow
+    mixed = (amounts > 0).any(axis=1) & (amounts < 0).any(axis=1)
+    found = np.isfinite(cost[np.arange(n), best]) & mixed
+
+    lo = np.where(found, _GRID[best], np.nan)
+    hi = np.where(found, _GRID[np.minimum(best + 1, _GRID.size - 1)], np.nan)
+    flo = np.where(found, values[np.arange(n), best], np.nan)
+    return lo, hi, flo, found
+
+
+def xirr_batch(times, amounts, tol: float = 1e-10, max_iter: int = 100) -> np.ndarray:
+    """
+    Solve XIRR for every row of the (funds x flows) matrices in one pass.
+    Returns an array of annual rates, NaN where no root exists (e.g. all
+    cashflows share one sign).
+    """
+    times = np.atleast_2d(np.asarray(times, dtype=np.float64))
+    amounts = np.atleast_2d(np.asarray(amounts, dtype=np.float64))
+    n = times.shape[0]
+    if n == 0:
+        return np.empty(0)
+
+    lo, hi, flo, active = _bracket(times, amounts)
+    x = np.where(active, 0.5 * (lo + hi), np.nan)
+    scale = np.maximum(np.abs(amounts).sum(axis=1), 1.0)
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        f, df = _npv_and_derivative(x[idx], times[idx], amounts[idx])
+
+        # shrink the bracket around the root
+        same_side = np.sign(f) == np.sign(flo[idx])
+        lo[idx] = np.where(same_side, x[idx], lo[idx])
+        flo[idx] = np.where(same_side, f, flo[idx])
+        hi[idx] = np.where(same_side, hi[idx], x[idx])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = x[idx] - f / df
+        low = np.minimum(lo[idx], hi[idx])
+        high = np.maximum(lo[idx], hi[idx])
+        in_bracket = np.isfinite(newton) & (newton >= low) & (newton <= high)
+        x_new = np.where(in_bracket, newton, 0.5 * (low + high))
+
+        at_root = np.abs(f) <= tol * scale[idx]
+        x_new = np.where(at_root, x[idx], x_new)
+        done = at_root | (np.abs(x_new - x[idx]) <= tol * (1.0 + np.abs(x[idx])))
+        x[idx] = x_new
+        active[idx[done]] = False
+
+    return x
+
+
+def xirr(dates, amounts) -> float:
+    """XIRR of a single series of dated cashflows (NaN if there is no root)."""
+    amounts = np.asarray(amounts, dtype=np.float64)
+    if amounts.size == 0:
+        return float("nan")
+    times = year_fractions(dates)
+    return float(xirr_batch(times[None, :], amounts[None, :])[0])
@@ -0,0 +1,68 @@
+# backend/benchmarks/bench_ann.py
+"""
+Recall/latency trade-off of the VectorStore index types.
+
+Builds every index type over the same synthetic clustered vectors and
+reports recall@k against the exact flat index, plus mean query latency,
+for a range of nprobe / ef_search values.
+
+Run from backend/:  python -m benchmarks.bench_ann [n_vectors] [dim]
+"""
+import sys
+import time
+import numpy as np
+
+from app.services import ann_index
+
+
+def clustered_vectors(n: int, dim: int, n_queries: int, seed: int = 3):
+    """Gaussian blobs, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(8, n // 500), dim)).astype("float32")
+    labels = rng.integers(0, len(centers), n + n_queries)
+    points = centers[labels] + 0.35 * rng.normal(size=(n + n_queries, dim)).astype("float32")
+    return points[:n], points[n:]
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def timed_search(index, queries, k, params):
+    t0 = time.perf_counter()
+    if params is None:
+        _, ids = index.search(queries, k)
+    else:
+        _, ids = index.search(queries, k, params=params)
+    return ids, (time.perf_counter() - t0) / len(queries) * 1000
+
+
+def main(n: int = 20000, dim: int = 1536, n_queries: int = 200, k: int = 10):
+    data, queries = clustered_vectors(n, dim, n_queries)
+    print(f"{n} vectors, dim={dim}, {n_queries} queries, recall@{k}\n")
+
+    flat = ann_index.build_index("flat", dim, data)
+    truth, flat_ms = timed_search(flat, queries, k, None)
+    print(f"{'flat':<10} {'-':>12} {'recall 1.000':>14} {flat_ms:8.3f} ms/query")
+
+    sweeps = {
+        "ivf_flat": ("nprobe", [1, 4, 16, 64]),
+        "ivf_pq": ("nprobe", [1, 4, 16, 64]),
+        "hnsw": ("ef_search", [16, 32, 64, 128]),
+    }
+    for kind, (param, values) in sweeps.items():
+        t0 = time.perf_counter()
+        index = ann_index.build_index(kind, dim, data)
+        build_s = time.perf_counter() - t0
+        for v in values:
+            params = ann_index.search_params(index, **{param: v})
+            ids, ms = timed_search(index, queries, k, params)
+            label = f"{param}={v}"
+            print(f"{kind:<10} {label:>12} {'recall ' + format(recall_at_k(ids, truth), '.3f'):>14} {ms:8.3f} ms/query")
+        print(f"{kind:<10} build {build_s:.1f} s, ~{ann_index.approx_nbytes(index, dim) / 2**20:.0f} MiB\n")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
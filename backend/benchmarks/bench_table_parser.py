@@ -0,0 +1,87 @@
+# backend/benchmarks/bench_table_parser.py
+"""
+Table parser scaling on synthetic statements: the previous whole-text regex
+parser vs the single-pass token scanner, at growing page counts.
+
+Run from backend/:  python -m benchmarks.bench_table_parser [max_pages]
+"""
+import random
+import re
+import sys
+import time
+from decimal import Decimal
+
+from app.services.table_parser import parse_financial_tables
+
+ROWS_PER_PAGE = 40
+
+
+def synthetic_statement(pages: int, seed: int = 3) -> str:
+    """Capital calls, distributions and adjustments spread over `pages` pages."""
+    rng = random.Random(seed)
+    per_section = pages * ROWS_PER_PAGE // 3
+    lines = ["Quarterly Capital Account Statement", "Capital Calls", "Date Call Number Amount Description"]
+    for i in range(per_section):
+        lines.append(f"20{10 + i % 15}-{1 + i % 12:02d}-{1 + i % 28:02d} Call {i + 1} "
+                     f"${rng.randint(1, 9_999_999):,}.00 Capital call for investment {i}")
+        if i % ROWS_PER_PAGE == ROWS_PER_PAGE - 1:
+            lines.append(f"Page {i // ROWS_PER_PAGE + 1}")
+    lines += ["Distributions", "Date Type Amount Recallable Description"]
+    for i in range(per_section):
+        lines.append(f"20{10 + i % 15}-{1 + i % 12:02d}-{1 + i % 28:02d} {rng.choice(['Return', 'Income', 'Gain'])} "
+                     f"${rng.randint(1, 9_999_999):,}.00 {rng.choice(['Yes', 'No'])} Distribution {i}")
+    lines += ["Adjustments", "Date Type Amount Description"]
+    for i in range(per_section):
+        lines.append(f"20{10 + i % 15}-{1 + i % 12:02d}-{1 + i % 28:02d} Fee Offset "
+                     f"-${rng.randint(1, 99_999):,}.00 Management fee offset {i}")
+    lines += ["Performance Metrics", "DPI 1.2 IRR 12%"]
+    return "\n".join(lines)
+
+
+# --- previous implementation, kept for comparison -------------------------
+
+def legacy_parse(full_text: str) -> dict:
+    sections = {"capital_calls": [], "distributions": [], "adjustments": []}
+    text = re.sub(r'\s+', ' ', full_text)
+    calls = re.search(r'Capital Calls(.*?)(?=Distributions|Adjustments|$)', text, re.IGNORECASE)
+    dists = re.search(r'Distributions(.*?)(?=Capital Calls|Adjustments|$)', text, re.IGNORECASE)
+    adjs = re.search(r'Adjustments(.*?)(?=Capital Calls|Distributions|$)', text, re.IGNORECASE)
+    if calls:
+        for m in re.finditer(r'(\d{4}-\d{2}-\d{2})\s+(Call\s*\d+)\s+\$?([\d,\,\.]+)\s+(.+?)(?=\d{4}-\d{2}-\d{2}|$)', calls.group(1)):
+            sections["capital_calls"].append({"call_date": m.group(1), "call_type": m.group(2).strip(),
+                                              "amount": Decimal(m.group(3).replace(',', '')), "description": m.group(4).strip()})
+    if dists:
+        for m in re.finditer(r'(\d{4}-\d{2}-\d{2})\s+([A-Za-z]+)\s+\$?([\d,\.]+)\s+(Yes|No)\s+(.+?)(?=\d{4}-\d{2}-\d{2}|$)', dists.group(1)):
+            sections["distributions"].append({"distribution_date": m.group(1), "distribution_type": m.group(2).strip(),
+                                              "amount": Decimal(m.group(3).replace(',', '')),
+                                              "is_recallable": m.group(4).strip().lower() == "yes", "description": m.group(5).strip()})
+    if adjs:
+        body = re.split(r'Performance\s+Metrics', adjs.group(1), flags=re.IGNORECASE)[0]
+        for m in re.finditer(r'(\d{4}-\d{2}-\d{2})\s+([A-Za-z ]+?)\s+(-?\$?[\d,\.]+)\s+(.+?)(?=\d{4}-\d{2}-\d{2}|$)', body):
+            sections["adjustments"].append({"adjustment_date": m.group(1), "adjustment_type": m.group(2).strip(),
+                                            "amount": Decimal(m.group(3).replace('$', '').replace(',', '')),
+                                            "description": m.group(4).strip()})
+    return sections
+
+
+def bench(fn, text, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main(max_pages: int = 1000):
+    print(f"{'pages':>6} {'chars':>10} {'rows':>7} {'legacy ms':>10} {'scanner ms':>11} {'us/row':>7}  same")
+    for pages in sorted({10, 100, max_pages // 4, max_pages // 2, max_pages}):
+        text = synthetic_statement(pages)
+        legacy_s, legacy = bench(legacy_parse, text)
+        new_s, new = bench(parse_financial_tables, text)
+        rows = sum(len(v) for v in new.values())
+        print(f"{pages:>6} {len(text):>10} {rows:>7} {legacy_s * 1000:>10.1f} {new_s * 1000:>11.1f} "
+              f"{new_s / rows * 1e6:>7.2f}  {legacy == new}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,62 @@
+# backend/benchmarks/bench_xirr.py
+"""
+Microbenchmark: per-fund npf.irr (previous calculate_irr path) vs the
+date-aware XIRR solver, one fund at a time and batched.
+
+Run from backend/:  python -m benchmarks.bench_xirr [n_funds]
+"""
+import sys
+import time
+import numpy as np
+import numpy_financial as npf
+
+from app.services.xirr import xirr, xirr_batch, pack_cashflows
+
+
+def synthetic_funds(n_funds: int, seed: int = 7):
+    """Irregularly dated calls in the first years, distributions later."""
+    rng = np.random.default_rng(seed)
+    funds = []
+    for _ in range(n_funds):
+        n_calls = rng.integers(4, 16)
+        n_dists = rng.integers(4, 24)
+        start = np.datetime64("2010-01-01") + rng.integers(0, 3650)
+        call_days = np.sort(rng.integers(0, 4 * 365, n_calls))
+        dist_days = np.sort(rng.integers(3 * 365, 12 * 365, n_dists))
+        dates = np.concatenate([start + call_days, start + dist_days])
+        amounts = np.concatenate([
+            -rng.uniform(1e5, 1e6, n_calls),
+            rng.uniform(5e4, 1.5e6, n_dists),
+        ])
+        order = np.argsort(dates, kind="stable")
+        funds.append((dates[order], amounts[order]))
+    return funds
+
+
+def bench(label, fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    print(f"{label:<28} {best * 1000:10.2f} ms")
+    return out
+
+
+def main(n_funds: int = 2000):
+    funds = synthetic_funds(n_funds)
+    print(f"{n_funds} funds, {sum(len(a) for _, a in funds)} cashflows")
+
+    periodic = bench("npf.irr (per fund)", lambda: [npf.irr(a) for _, a in funds])
+    single = bench("xirr (per fund)", lambda: [xirr(d, a) for d, a in funds])
+    times, amounts = pack_cashflows(funds)
+    batched = bench("xirr_batch (all funds)", lambda: xirr_batch(times, amounts))
+
+    single = np.array(single)
+    print(f"max |xirr - xirr_batch|     {np.nanmax(np.abs(single - batched)):.2e}")
+    print(f"npf.irr failures (nan)      {int(np.isnan(np.array(periodic, dtype=float)).sum())}")
+    print(f"xirr failures (nan)         {int(np.isnan(batched).sum())}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
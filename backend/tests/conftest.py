@@ -0,0 +1,7 @@
+# backend/tests/conftest.py
+import os
+import sys
+
+# settings need a DATABASE_URL; nothing in these tests connects to it
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,99 @@
+# backend/tests/stub_openai.py
+"""
+Local stub of the OpenAI embeddings endpoint (POST /v1/embeddings).
+
+Every request is recorded; `behaviour(inputs, attempt)` decides the answer
+and returns None for success or (status, headers) for an error. Vectors are
+derived from the text (vector_for), so callers can check order.
+
+    python -m tests.stub_openai 8001   # then OPENAI_BASE_URL=http://127.0.0.1:8001/v1
+"""
+import base64
+import json
+import sys
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+DIM = 8
+
+
+def vector_for(text: str) -> list[float]:
+    rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+    return rng.standard_normal(DIM).astype(np.float32).tolist()
+
+
+class StubServer:
+    def __init__(self, behaviour=None, port: int = 0):
+        self.behaviour = behaviour or (lambda inputs, attempt: None)
+        self.requests: list[list[str]] = []
+        self._lock = threading.Lock()
+        self._attempts: dict[tuple, int] = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: dict, headers: dict | None = None):
+                raw = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_POST(self):
+                if not self.path.endswith("/embeddings"):
+                    return self._send(404, {"error": {"message": "not found"}})
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+                with stub._lock:
+                    stub.requests.append(inputs)
+                    key = tuple(inputs)
+                    attempt = stub._attempts.get(key, 0)
+                    stub._attempts[key] = attempt + 1
+                error = stub.behaviour(inputs, attempt)
+                if error is not None:
+                    status, headers = error
+                    return self._send(status, {"error": {"message": f"stub error {status}", "type": "stub"}}, headers)
+                data = []
+                for i, text in enumerate(inputs):
+                    vector = vector_for(text)
+                    if body.get("encoding_format") == "base64":
+                        vector = base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode()
+                    data.append({"object": "embedding", "index": i, "embedding": vector})
+                self._send(200, {
+                    "object": "list",
+                    "data": data,
+                    "model": body.get("model"),
+                    "usage": {"prompt_tokens": 0, "total_tokens": 0},
+                })
+
+        return Handler
+
+
+if __name__ == "__main__":
+    with StubServer(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8001) as stub:
+        print(f"Stub embeddings endpoint at {stub.base_url}")
+        threading.Event().wait()
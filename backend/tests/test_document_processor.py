@@ -0,0 +1,30 @@
+# backend/tests/test_document_processor.py
+import threading
+import time
+
+from app.core.config import settings
+from app.services import document_processor
+from app.services.chunker import Chunk
+
+
+def test_embed_stage_keeps_several_requests_in_flight_in_order(monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_EMBED_BATCH_CHUNKS", 4)
+    monkeypatch.setattr(settings, "EMBEDDING_MAX_WORKERS", 3)
+    lock, active, peak = threading.Lock(), [0], [0]
+
+    def generate(texts):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return [[float(t.split()[1])] for t in texts]
+
+    monkeypatch.setattr(document_processor, "generate_embeddings", generate)
+    chunks = [Chunk(f"chunk {i}", {}) for i in range(30)]
+    out = list(document_processor._embed_batches(iter(chunks)))
+
+    assert [c for batch, _ in out for c in batch] == chunks
+    assert [e for _, embeddings in out for e in embeddings] == [[float(i)] for i in range(30)]
+    assert peak[0] == 3
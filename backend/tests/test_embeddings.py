@@ -0,0 +1,155 @@
+# backend/tests/test_embeddings.py
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import openai
+import pytest
+
+from app.core.config import settings
+from app.services import embeddings
+from tests.stub_openai import StubServer, vector_for
+
+
+@pytest.fixture
+def embedding_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PATH", str(tmp_path / "embeddings.sqlite3"))
+    monkeypatch.setattr(embeddings, "_cache", None)
+    monkeypatch.setattr(embeddings, "_cache_disabled", False)
+    return embeddings.get_embedding_cache()
+
+
+def test_fake_vectors_are_not_served_to_the_real_provider(embedding_cache, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", "fake")
+    fake = embeddings.generate_embeddings(["hello"])
+
+    requested = []
+
+    def request(texts):
+        requested.extend(texts)
+        return [[0.5] * embeddings.EMBEDDING_DIM for _ in texts]
+
+    monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", "openai")
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test")
+    monkeypatch.setattr(embeddings, "_request_embeddings", request)
+    real = embeddings.generate_embeddings(["hello"])
+    assert requested == ["hello"]
+    assert real != fake
+    # the real vector is cached under its own provider
+    assert embeddings.generate_embeddings(["hello"]) == real
+    assert requested == ["hello"]
+
+
+@pytest.fixture
+def stub_client(monkeypatch, tmp_path):
+    """Point the embeddings client at a local StubServer (returned by the fixture's factory)."""
+    from openai import AsyncOpenAI, OpenAI
+
+    monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", "openai")
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test")
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PATH", None)
+    monkeypatch.setattr(embeddings, "_cache", None)
+    monkeypatch.setattr(embeddings, "_cache_disabled", True)
+    delays = []
+    monkeypatch.setattr(embeddings, "time", SimpleNamespace(sleep=delays.append))
+    servers = []
+
+    def start(behaviour=None) -> StubServer:
+        stub = StubServer(behaviour).__enter__()
+        servers.append(stub)
+        monkeypatch.setattr(embeddings, "client", OpenAI(api_key="test", base_url=stub.base_url, max_retries=0))
+        monkeypatch.setattr(embeddings, "aclient", AsyncOpenAI(api_key="test", base_url=stub.base_url, max_retries=0))
+        stub.delays = delays
+        return stub
+
+    yield start
+    for stub in servers:
+        stub.__exit__(None, None, None)
+
+
+def _texts(n: int) -> list[str]:
+    return [f"chunk {i}" for i in range(n)]
+
+
+def test_batches_run_concurrently_and_keep_order(stub_client, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_SIZE", 4)
+    monkeypatch.setattr(settings, "EMBEDDING_MAX_WORKERS", 3)
+    stub = stub_client()
+    texts = _texts(30)
+    assert embeddings.generate_embeddings(texts) == [vector_for(t) for t in texts]
+    assert sorted(len(r) for r in stub.requests) == [2] + [4] * 7
+
+
+def test_rate_limited_batch_alone_is_retried_after_capped_retry_after(stub_client, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_SIZE", 4)
+    stub = stub_client(
+        lambda inputs, attempt: (429, {"Retry-After": "3600"}) if "chunk 5" in inputs and attempt == 0 else None
+    )
+    texts = _texts(12)
+    assert embeddings.generate_embeddings(texts) == [vector_for(t) for t in texts]
+    assert len(stub.requests) == 4  # 3 batches + 1 retry of the limited one
+    assert stub.delays == [settings.EMBEDDING_RETRY_AFTER_MAX]
+
+
+def test_oversized_batch_is_halved_until_accepted(stub_client, monkeypatch):
+    stub = stub_client(lambda inputs, attempt: (400, {}) if len(inputs) > 8 else None)
+    texts = _texts(64)
+    assert embeddings.generate_embeddings(texts) == [vector_for(t) for t in texts]
+    assert len(stub.requests) == 1 + 2 + 4 + 8
+    assert stub.delays == []
+
+
+def test_persistent_400_stops_at_the_split_budget(stub_client, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_MAX_SPLITS", 5)
+    stub = stub_client(lambda inputs, attempt: (400, {}) if len(inputs) > 1 else None)
+    with pytest.raises(openai.BadRequestError):
+        embeddings.generate_embeddings(_texts(512))
+    assert len(stub.requests) <= 2 * 5 + 1 + 1
+
+
+def test_single_input_rejected_with_400_is_not_split_or_retried(stub_client):
+    stub = stub_client(lambda inputs, attempt: (400, {}) if "chunk 3" in inputs else None)
+    with pytest.raises(openai.BadRequestError):
+        embeddings.generate_embeddings(_texts(8))
+    # 8 -> 4 + (4 -> 2 + (2 -> 1 ok, 1 rejected))
+    assert len(stub.requests) == 6
+
+
+def test_async_path_splits_and_rejects_like_the_sync_one(stub_client):
+    stub = stub_client(lambda inputs, attempt: (400, {}) if "chunk 3" in inputs else None)
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(embeddings.agenerate_embeddings(_texts(8)))
+    assert len(stub.requests) == 6
+
+    stub = stub_client(lambda inputs, attempt: (400, {}) if len(inputs) > 2 else None)
+    texts = _texts(8)
+    assert asyncio.run(embeddings.agenerate_embeddings(texts)) == [vector_for(t) for t in texts]
+
+
+def test_async_path_checks_the_response_length(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", "fake")
+    monkeypatch.setattr(embeddings, "_cache_disabled", True)
+
+    async def short(texts):
+        return [[0.0]] * (len(texts) - 1)
+
+    monkeypatch.setattr(embeddings, "_arequest_embeddings", short)
+    with pytest.raises(RuntimeError, match="Expected 3 embeddings, got 2"):
+        asyncio.run(embeddings.agenerate_embeddings(_texts(3)))
+
+
+def test_async_path_reads_and_writes_the_cache_off_the_event_loop(embedding_cache, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", "fake")
+    threads = []
+    for name in ("get_many", "put_many"):
+        method = getattr(embedding_cache, name)
+
+        def record(*args, method=method):
+            threads.append(threading.current_thread())
+            return method(*args)
+
+        monkeypatch.setattr(embedding_cache, name, record)
+
+    first = asyncio.run(embeddings.agenerate_embeddings(["hello"]))
+    assert asyncio.run(embeddings.agenerate_embeddings(["hello"])) == first
+    assert len(threads) == 3 and threading.main_thread() not in threads
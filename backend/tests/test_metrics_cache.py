@@ -0,0 +1,61 @@
+# backend/tests/test_metrics_cache.py
+import asyncio
+
+from app.services import metrics_cache as mc
+from app.services.metrics_cache import MetricsCache
+
+PARSED = {"capital_calls": [{"call_date": "2024-03-01", "call_type": "Call", "amount": 100.0}]}
+
+
+def _breakdown(fund_id: int, calls: int) -> dict:
+    return {"fund_id": fund_id, "calls": calls, "capital_calls": []}
+
+
+def test_read_miss_racing_an_ingest_is_not_cached(monkeypatch):
+    cache = MetricsCache()
+    db_calls = [0]
+
+    def load(fund_id, db=None):
+        # the ingest commits (and updates the cache) while the old rows are being read
+        stale = _breakdown(fund_id, db_calls[0])
+        db_calls[0] += 1
+        cache.apply_transactions(fund_id, PARSED)
+        return stale
+
+    monkeypatch.setattr(mc, "get_metrics_breakdown", load)
+    assert cache.get_breakdown(1)["calls"] == 0
+
+    monkeypatch.setattr(mc, "get_metrics_breakdown", lambda fund_id, db=None: _breakdown(fund_id, db_calls[0]))
+    assert cache.get_breakdown(1)["calls"] == 1
+    # now cached
+    monkeypatch.setattr(mc, "get_metrics_breakdown", None)
+    assert cache.get_breakdown(1)["calls"] == 1
+
+
+def test_async_and_portfolio_reads_racing_an_invalidation_are_not_cached(monkeypatch):
+    cache = MetricsCache()
+    monkeypatch.setattr(mc, "AsyncSessionLocal", None)
+
+    def load(fund_id, db=None):
+        cache.invalidate(fund_id)
+        return _breakdown(fund_id, 0)
+
+    monkeypatch.setattr(mc, "get_metrics_breakdown", load)
+    asyncio.run(cache.aget_breakdown(1))
+
+    def portfolio(fund_ids, db=None):
+        for f in fund_ids:
+            cache.invalidate(f)
+        return [{"fund_id": f} for f in fund_ids]
+
+    monkeypatch.setattr(mc, "get_portfolio_metrics", portfolio)
+    cache.get_portfolio([1, 2])
+    assert cache.backend.get_many([mc.BREAKDOWN_KEY.format(1), mc.SUMMARY_KEY.format(1),
+                                   mc.SUMMARY_KEY.format(2)]) == [None, None, None]
+
+    # without a concurrent change the loaded values are cached
+    monkeypatch.setattr(mc, "get_portfolio_metrics", lambda fund_ids, db=None: [{"fund_id": f} for f in fund_ids])
+    cache.get_portfolio([1, 2])
+    assert cache.stats()["misses"] == 5
+    cache.get_portfolio([1, 2])
+    assert cache.stats()["hits"] == 2
@@ -0,0 +1,69 @@
+# backend/tests/test_pgvector_store.py
+"""
+Integration checks against a live Postgres with the vector extension.
+Set PGVECTOR_TEST_DATABASE_URL (a scratch database: document_chunks is
+dropped and recreated) to run them.
+"""
+import os
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+URL = os.environ.get("PGVECTOR_TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(not URL, reason="PGVECTOR_TEST_DATABASE_URL not set")
+
+DIM = 1536
+
+
+@pytest.fixture(params=["hnsw", "ivfflat"])
+def pg(request, monkeypatch):
+    from app.services import pgvector_store
+
+    # no seq scans: like on a large table, the planner walks the ANN index
+    # and applies the fund filter to its candidates
+    engine = create_engine(URL, connect_args={"options": "-c enable_seqscan=off"})
+    monkeypatch.setattr(pgvector_store, "engine", engine)
+    monkeypatch.setattr(settings, "PGVECTOR_INDEX_TYPE", request.param)
+    monkeypatch.setattr(settings, "PGVECTOR_IVF_LISTS", 20)
+    monkeypatch.setattr(settings, "VECTOR_IVF_NPROBE", 1)
+    monkeypatch.setattr(settings, "VECTOR_HNSW_EF_SEARCH", 16)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        conn.execute(text("DROP TABLE IF EXISTS document_chunks"))
+    pgvector_store.ensure_schema()
+    yield pgvector_store
+    engine.dispose()
+
+
+def _unit(rows: np.ndarray) -> list:
+    return (rows / np.linalg.norm(rows, axis=1, keepdims=True)).tolist()
+
+
+def test_small_fund_among_large_one_gets_its_nearest_chunks(pg):
+    rng = np.random.default_rng(0)
+    center = rng.normal(size=DIM)
+    # a large fund clustered around the query, a small fund far away from it
+    big = pg.PgVectorStore("fund_1")
+    big_vectors = center + 0.1 * rng.normal(size=(1000, DIM))
+    big.add_texts([f"big {i}" for i in range(1000)], _unit(big_vectors), [{"document_id": 1}] * 1000)
+    small = pg.PgVectorStore("fund_2")
+    small_vectors = -center + rng.normal(size=(5, DIM))
+    small.add_texts([f"small {i}" for i in range(5)], _unit(small_vectors), [{"document_id": 2}] * 5)
+    with pg.engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_document_chunks_fund_id"))
+        conn.execute(text("ANALYZE document_chunks"))
+
+    query = _unit(center[None, :])[0]
+    results = small.search(query, top_k=3)
+    expected = np.argsort(np.linalg.norm(np.array(_unit(small_vectors)) - query, axis=1))[:3]
+    assert [r["text"] for r in results] == [f"small {i}" for i in expected]
+    assert [r["score"] for r in results] == sorted(r["score"] for r in results)
+
+    # fewer chunks than top_k: all of them, nearest first
+    assert len(small.search(query, top_k=10)) == 5
+    assert len(big.search(query, top_k=10)) == 10
+    assert small.count_document_chunks(2) == 5
+    assert big.count_document_chunks(2) == 0
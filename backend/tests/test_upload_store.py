@@ -0,0 +1,109 @@
+# backend/tests/test_upload_store.py
+import asyncio
+import io
+import os
+import threading
+import time
+
+import pytest
+from fastapi import BackgroundTasks, UploadFile
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.endpoints import documents
+from app.models.document import Document
+from app.models.fund import Fund
+
+PDF = b"%PDF-1.4 statement\n" * 100
+
+
+@pytest.fixture
+def db_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    Fund.__table__.create(engine)
+    Document.__table__.create(engine)
+    monkeypatch.setattr(documents, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(documents, "enqueue_document", lambda *args, **kwargs: None)
+    monkeypatch.setattr(documents.answer_cache, "bump", lambda fund_id: None)
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+def _upload(db, name: str, fund_id=None) -> dict:
+    file = UploadFile(io.BytesIO(PDF), filename=name)
+    return asyncio.run(documents.upload_document(BackgroundTasks(), file, fund_id, "normal", db))
+
+
+def test_delete_racing_an_upload_of_the_same_file_keeps_it(db_factory, monkeypatch):
+    with db_factory() as db:
+        first = _upload(db, "a.pdf")
+        path = db.get(Document, first["document_id"]).file_path
+    assert os.path.exists(path)
+
+    # the upload of the same bytes for another fund stalls after finding the file in place
+    placed, find_duplicate = threading.Event(), documents.find_duplicate
+
+    def slow_find_duplicate(*args):
+        placed.set()
+        time.sleep(0.3)
+        return find_duplicate(*args)
+
+    monkeypatch.setattr(documents, "find_duplicate", slow_find_duplicate)
+    with db_factory() as db:
+        db.add(Fund(id=2, name="Fund 2"))
+        db.commit()
+    result = {}
+    uploader = threading.Thread(target=lambda: result.update(_upload(db_factory(), "b.pdf", 2)))
+    uploader.start()
+    placed.wait(5)
+    with db_factory() as db:
+        documents.delete_document(first["document_id"], db)
+    uploader.join(5)
+
+    with db_factory() as db:
+        second = db.get(Document, result["document_id"])
+        assert second.file_path == path
+    assert os.path.exists(path)
+
+    # deleting the last document that uses the file removes it
+    with db_factory() as db:
+        documents.delete_document(result["document_id"], db)
+    assert not os.path.exists(path)
+
+
+def test_identical_upload_for_the_same_fund_is_not_stored_twice(db_factory):
+    with db_factory() as db:
+        first = _upload(db, "a.pdf")
+        again = _upload(db, "copy of a.pdf")
+    assert again["duplicate"] and again["document_id"] == first["document_id"]
+    shard = os.path.dirname(db_factory().get(Document, first["document_id"]).file_path)
+    assert not [f for f in os.listdir(os.path.dirname(shard)) if f.endswith(".part")]
+
+
+def test_upload_does_not_block_the_event_loop(db_factory, monkeypatch):
+    find_duplicate = documents.find_duplicate
+
+    def slow_find_duplicate(*args):
+        time.sleep(0.3)
+        return find_duplicate(*args)
+
+    monkeypatch.setattr(documents, "find_duplicate", slow_find_duplicate)
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        with db_factory() as db:
+            file = UploadFile(io.BytesIO(PDF), filename="a.pdf")
+            result = await documents.upload_document(BackgroundTasks(), file, None, "normal", db)
+        ticker.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(main())
+    assert result["document_id"]
+    assert ticks >= 10
@@ -0,0 +1,104 @@
+# backend/tests/test_vector_store.py
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services import vector_store
+from app.services.vector_store import VectorStore
+
+DIM = 1536
+
+
+@pytest.fixture
+def vector_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, "VECTOR_DIR", str(tmp_path))
+    monkeypatch.setattr(vector_store, "_stores", type(vector_store._stores)())
+    monkeypatch.setattr(settings, "VECTOR_LOG_COMPACT_RECORDS", 1_000_000)
+    return tmp_path
+
+
+def _vectors(n: int, seed: int = 0) -> list:
+    return np.random.default_rng(seed).normal(size=(n, DIM)).astype("float32").tolist()
+
+
+def test_count_document_chunks_over_snapshot_and_logs(vector_dir):
+    vs = VectorStore("fund_1")
+    metas = [{"document_id": 1, "page_start": 1}, {"document_id": 12}, {"document_id": 1},
+             {"section": "document_id 1"}, {}]
+    vs.add_texts([f"t{i}" for i in range(5)], _vectors(5), metas)
+    vs.compact()
+    vs.add_texts(["t5", "t6"], _vectors(2, 1), [{"document_id": 1}, {"document_id": 2}])
+
+    for store in (vs, VectorStore("fund_1")):
+        assert store.count_document_chunks(1) == 3
+        assert store.count_document_chunks(12) == 1
+        assert store.count_document_chunks(2) == 1
+        assert store.count_document_chunks(7) == 0
+
+
+def _store(name: str, texts: list[str], seed: int) -> VectorStore:
+    vs = VectorStore(name)
+    vs.add_texts(texts, _vectors(len(texts), seed))
+    return vs
+
+
+def test_portfolio_search_matches_one_merged_index(vector_dir):
+    rng = np.random.default_rng(5)
+    words = ["capital", "call", "distribution", "fee", "nav", "q1", "q2", "fund", "return", "carry"]
+    corpora = {
+        # a small fund where the query's rarest term looks very rare locally
+        "fund_1": ["carry waterfall", "management fee", "nav statement"],
+        "fund_2": [" ".join(rng.choice(words, 6)) for _ in range(60)],
+        "fund_3": [" ".join(rng.choice(words, 8)) + " carry" for _ in range(30)],
+    }
+    for seed, (name, texts) in enumerate(corpora.items()):
+        _store(name, texts, seed)
+    merged = VectorStore("merged")
+    for seed, texts in enumerate(corpora.values()):
+        merged.add_texts(texts, _vectors(len(texts), seed))
+
+    query, query_emb = "carry distribution fee", _vectors(1, 99)[0]
+    got = vector_store.search_indexes(list(corpora), query, query_emb, top_k=8)
+    want = merged.hybrid_search(query, query_emb, top_k=8)
+    assert [round(r["score"], 9) for r in got] == [round(r["score"], 9) for r in want]
+    assert {r["text"] for r in got} == {r["text"] for r in want}
+
+    # the lexical rankings alone agree too
+    stats = vector_store._sum_stats([VectorStore(name).lexical_stats(query) for name in corpora])
+    scores = sorted(
+        (round(score, 4), vs.get_text(i))
+        for vs in (VectorStore(name) for name in corpora)
+        for i, score in vs.lexical.search(query, 100, stats=stats)
+    )
+    merged_scores = sorted((round(score, 4), merged.get_text(i)) for i, score in merged.lexical.search(query, 100))
+    assert scores == merged_scores
+
+
+def test_portfolio_search_does_not_evict_loaded_indexes(vector_dir, monkeypatch):
+    for k in range(1, 4):
+        _store(f"fund_{k}", [f"chunk {k}"], k)
+    monkeypatch.setattr(settings, "VECTOR_STORE_CACHE_MB", 0)
+    hot = vector_store.get_vector_store("fund_1")
+
+    results = vector_store.search_indexes(["fund_1", "fund_2", "fund_3"], "chunk", _vectors(1)[0], top_k=3)
+    assert {r["index"] for r in results} == {"fund_1", "fund_2", "fund_3"}
+    assert list(vector_store._stores) == ["fund_1"]
+    assert vector_store._stores["fund_1"] is hot
+
+    # with room to spare, indexes read for a search are kept (least recently used first)
+    monkeypatch.setattr(settings, "VECTOR_STORE_CACHE_MB", 64)
+    vector_store.search_indexes(["fund_1", "fund_2"], "chunk", _vectors(1)[0], top_k=3)
+    assert list(vector_store._stores) == ["fund_2", "fund_1"]
+
+
+def test_dense_only_portfolio_search_returns_distances_as_scores(vector_dir):
+    for k in range(1, 3):
+        _store(f"fund_{k}", [f"chunk {k}.{i}" for i in range(4)], k)
+    query_emb = _vectors(1, 7)[0]
+    got = vector_store.search_indexes(["fund_1", "fund_2"], "chunk", query_emb, top_k=3, hybrid=False)
+    want = sorted(
+        ({**r, "index": name} for name in ("fund_1", "fund_2") for r in VectorStore(name).search(query_emb, 3)),
+        key=lambda r: r["score"],
+    )[:3]
+    assert got == want
+    assert all("distance" not in r for r in got)
@@ -0,0 +1,130 @@
+# backend/tests/test_vector_store_log.py
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services import record_log, vector_store
+from app.services.vector_store import VectorStore
+
+DIM = 1536
+
+
+@pytest.fixture
+def vector_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, "VECTOR_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "VECTOR_LOG_COMPACT_RECORDS", 1_000_000)
+    return tmp_path
+
+
+def _vectors(n: int, seed: int) -> list:
+    return np.random.default_rng(seed).normal(size=(n, DIM)).astype("float32").tolist()
+
+
+def _texts(vs: VectorStore) -> list[str]:
+    return [vs.get_text(i) for i in range(len(vs))]
+
+
+def test_torn_tail_is_cut_off(tmp_path):
+    path = str(tmp_path / "x.log")
+    end = record_log.append_records(path, 0, [b"a", b"bb", b"ccc"])
+    with open(path, "ab") as f:
+        f.write(record_log._HEADER.pack(3, 100, 0) + b"torn")  # crash mid-append
+
+    payloads, valid_end = record_log.read_records(path)
+    assert payloads == [b"a", b"bb", b"ccc"]
+    assert valid_end == end
+    assert record_log.truncate_records(path, 3) == end
+
+    record_log.append_records(path, 3, [b"dddd"])
+    assert record_log.read_records(path)[0] == [b"a", b"bb", b"ccc", b"dddd"]
+    # reading on from a known offset sees only the new record
+    assert record_log.read_records(path, 3, end)[0] == [b"dddd"]
+
+
+def test_corrupt_record_stops_replay(tmp_path):
+    path = str(tmp_path / "x.log")
+    first = record_log.append_records(path, 0, [b"good"])
+    record_log.append_records(path, 1, [b"flipped"])
+    with open(path, "r+b") as f:
+        f.seek(first + record_log._HEADER.size)
+        f.write(b"F")
+    assert record_log.read_records(path) == ([b"good"], first)
+
+
+def test_store_drops_torn_tail_on_load(vector_dir):
+    vs = VectorStore("fund_1")
+    vs.add_texts(["one", "two"], _vectors(2, 0))
+    with open(vs.tlog_path, "ab") as f:
+        f.write(record_log._HEADER.pack(2, 50, 0) + b"{\"text\"")
+    with open(vs.vlog_path, "ab") as f:
+        f.write(record_log._HEADER.pack(2, DIM * 4, 0) + b"\0" * 16)
+
+    reloaded = VectorStore("fund_1")
+    assert _texts(reloaded) == ["one", "two"]
+    reloaded.add_texts(["three"], _vectors(1, 1))
+    assert _texts(VectorStore("fund_1")) == ["one", "two", "three"]
+
+
+def test_failed_append_raises_and_leaves_store_unchanged(vector_dir, monkeypatch):
+    vs = VectorStore("fund_1")
+    vs.add_texts(["one"], _vectors(1, 0))
+    append = record_log.append_records
+
+    def failing(path, *args, **kwargs):
+        if path.endswith(".tlog"):
+            raise OSError("disk full")
+        return append(path, *args, **kwargs)
+
+    monkeypatch.setattr(record_log, "append_records", failing)
+    with pytest.raises(OSError):
+        vs.add_texts(["lost"], _vectors(1, 1))
+    assert len(vs) == 1 and vs.index.ntotal == 1
+
+    monkeypatch.setattr(record_log, "append_records", append)
+    vs.add_texts(["two"], _vectors(1, 2))
+    assert _texts(VectorStore("fund_1")) == ["one", "two"]
+
+
+def test_stale_writer_catches_up(vector_dir):
+    a = VectorStore("fund_1")
+    b = VectorStore("fund_1")
+    a.add_texts(["a0"], _vectors(1, 0))
+    b.add_texts(["b0"], _vectors(1, 1))   # b has not seen a0 yet
+    a.compact()
+    b.add_texts(["b1"], _vectors(1, 2))   # a compacted meanwhile
+    assert _texts(b) == ["a0", "b0", "b1"]
+    assert _texts(VectorStore("fund_1")) == ["a0", "b0", "b1"]
+
+
+def _writer(tag: str, batches: int, compact_every: int, start):
+    start.wait()
+    vs = VectorStore("fund_1")
+    for i in range(batches):
+        vs.add_texts([f"{tag}{i}a", f"{tag}{i}b"], _vectors(2, hash((tag, i)) % 2**32))
+        if compact_every and i % compact_every == compact_every - 1:
+            vs.compact()
+
+
+@pytest.mark.parametrize("compact_every", [0, 7])
+def test_two_writer_processes(vector_dir, compact_every):
+    ctx = multiprocessing.get_context("fork")
+    start = ctx.Event()
+    procs = [ctx.Process(target=_writer, args=(tag, 40, compact_every, start)) for tag in "xy"]
+    for p in procs:
+        p.start()
+    start.set()
+    for p in procs:
+        p.join(60)
+        assert p.exitcode == 0
+
+    vs = VectorStore("fund_1")
+    texts = _texts(vs)
+    expected = {f"{tag}{i}{part}" for tag in "xy" for i in range(40) for part in "ab"}
+    assert len(texts) == len(expected) == vs.index.ntotal
+    assert set(texts) == expected
+    # each writer's batches stay in order
+    for tag in "xy":
+        mine = [t for t in texts if t.startswith(tag)]
+        assert mine == sorted(mine, key=lambda t: (int(t[1:-1]), t[-1]))
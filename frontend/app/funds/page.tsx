@@ -14,10 +14,11 @@ import {
   DialogTrigger,
 } from "@/components/ui/dialog";
 import { BarChart2, Plus, AlertCircle } from "lucide-react";
-import { getFunds, createFund, deleteFund } from "@/lib/api";
+import { getFunds, createFund, deleteFund, getPortfolioMetrics } from "@/lib/api";
 
 export default function FundsPage() {
   const [funds, setFunds] = useState<any[]>([]);
+  const [metrics, setMetrics] = useState<Record<number, any>>({});
   const [loading, setLoading] = useState(true);
   const [openAdd, setOpenAdd] = useState(false);
   const [popupMessage, setPopupMessage] = useState<string | null>(null);
@@ -30,12 +31,21 @@ export default function FundsPage() {
     vintage_year: "",
   });
 
-  // Fetch initial fund data
+  // Fetch initial fund data; metrics of every fund come from one batch request
   useEffect(() => {
     const fetchFunds = async () => {
       try {
-        const data = await getFunds();
+        const [data, portfolio] = await Promise.all([
+          getFunds(),
+          getPortfolioMetrics().catch((err) => {
+            console.error("Failed to fetch fund metrics:", err);
+            return { funds: [] };
+          }),
+        ]);
         setFunds(data);
+        setMetrics(
+          Object.fromEntries((portfolio.funds || []).map((m: any) => [m.fund_id, m]))
+        );
       } catch (err) {
         console.error("Failed to fetch funds:", err);
         setPopupMessage("Failed to fetch fund data.");
@@ -211,6 +221,26 @@ export default function FundsPage() {
                 <span className="px-3 py-1 text-sm rounded-full font-medium bg-blue-100 text-blue-700">
                   Vintage: {fund.vintage_year || "-"}
                 </span>
+                <div className="grid grid-cols-3 gap-2 mt-4 text-center">
+                  <div>
+                    <p className="text-xs text-gray-500">IRR</p>
+                    <p className="font-semibold text-green-600">
+                      {metrics[fund.id] ? `${(metrics[fund.id].IRR * 100).toFixed(2)}%` : "-"}
+                    </p>
+                  </div>
+                  <div>
+                    <p className="text-xs text-gray-500">PIC</p>
+                    <p className="font-semibold text-yellow-600">
+                      {metrics[fund.id] ? `$${metrics[fund.id].PIC.toLocaleString()}` : "-"}
+                    </p>
+                  </div>
+                  <div>
+                    <p className="text-xs text-gray-500">DPI</p>
+                    <p className="font-semibold text-blue-600">
+                      {metrics[fund.id] ? metrics[fund.id].DPI.toFixed(3) : "-"}
+                    </p>
+                  </div>
+                </div>
               </div>
 
               <div className="flex justify-between items-center mt-4">
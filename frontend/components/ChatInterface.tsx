@@ -4,7 +4,7 @@ import { Card } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Send, AlertCircle } from "lucide-react";
-import { getFunds, sendChatMessage } from "@/lib/api";
+import { getFunds, streamChatMessage } from "@/lib/api";
 
 interface Message {
   sender: "user" | "bot";
@@ -46,13 +46,30 @@ export default function ChatInterface() {
     setInput("");
     setIsLoading(true);
 
+    // append the bot message once and grow it as tokens arrive
+    let started = false;
+    let answer = "";
+    const showAnswer = (text: string) => {
+      const first = !started;
+      started = true;
+      setMessages((prev) =>
+        first
+          ? [...prev, { sender: "bot", text }]
+          : [...prev.slice(0, -1), { sender: "bot", text }]
+      );
+    };
+
     try {
-      const res = await sendChatMessage(input, selectedFund);
-      const botMsg = {
-        sender: "bot",
-        text: res.answer || res.message || "No response from the server.",
-      };
-      setMessages((prev) => [...prev, botMsg] as Message[]);
+      await streamChatMessage(input, selectedFund, (e) => {
+        if (e.event === "token") {
+          answer += e.data.text;
+          showAnswer(answer);
+        } else if (e.event === "done") {
+          showAnswer(e.data.answer || answer || "No response from the server.");
+        } else if (e.event === "error") {
+          throw new Error(e.data.detail);
+        }
+      });
     } catch (err) {
       setMessages((prev) => [
         ...prev,
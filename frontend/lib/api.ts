@@ -66,20 +66,94 @@ export async function sendChatMessage(message: string, fund_id?: number | null)
   return handleResponse(res);
 }
 
+export type ChatStreamEvent =
+  | { event: "sources"; data: { sources: string[]; metrics: any } }
+  | { event: "token"; data: { text: string } }
+  | { event: "done"; data: { answer: string } }
+  | { event: "error"; data: { detail: string } };
+
+export async function streamChatMessage(
+  message: string,
+  fund_id: number | null | undefined,
+  onEvent: (e: ChatStreamEvent) => void
+) {
+  const payload: Record<string, any> = { query: message, stream: true };
+  if (fund_id) payload.fund_id = fund_id;
+
+  const res = await fetch(`${BASE_URL}/chat/query`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+    body: JSON.stringify(payload),
+  });
+  if (!res.ok || !res.body) {
+    const text = await res.text();
+    throw new Error(text || "Terjadi kesalahan pada server");
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let sep;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const raw = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      let event = "message";
+      let data = "";
+      for (const line of raw.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      onEvent({ event, data: data ? JSON.parse(data) : {} } as ChatStreamEvent);
+    }
+  }
+}
+
 export async function getTransactions(fundId: number) {
-  const res = await fetch(`${BASE_URL}/funds/${fundId}/transactions/all`, {
+  // the endpoint is keyset-paginated: follow next_cursor until the last page
+  const transactions: any[] = [];
+  let cursor: string | null = null;
+  do {
+    const query: string = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+    const res = await fetch(`${BASE_URL}/funds/${fundId}/transactions/all${query}`, {
+      method: "GET",
+      headers: { "Content-Type": "application/json" },
+    });
+    if (!res.ok) {
+      const text = await res.text();
+      throw new Error(text || "Gagal mengambil data transaksi");
+    }
+    const page = await res.json();
+    transactions.push(...(page.transactions || []));
+    cursor = page.next_cursor;
+  } while (cursor);
+  return { transactions };
+}
+
+export async function getFundMetrics(fundId: number) {
+  const res = await fetch(`${BASE_URL}/funds/${fundId}/metrics`, {
     method: "GET",
     headers: { "Content-Type": "application/json" },
+    cache: "no-store",
   });
+
   if (!res.ok) {
     const text = await res.text();
-    throw new Error(text || "Gagal mengambil data transaksi");
+    throw new Error(text || "Gagal mengambil data metrics");
   }
+
   return res.json();
 }
 
-export async function getFundMetrics(fundId: number) {
-  const res = await fetch(`${BASE_URL}/funds/${fundId}/metrics`, {
+export async function getPortfolioMetrics(fundIds?: number[]) {
+  const params = new URLSearchParams();
+  fundIds?.forEach((id) => params.append("fund_ids", String(id)));
+  const query = params.toString() ? `?${params.toString()}` : "";
+
+  const res = await fetch(`${BASE_URL}/funds/metrics${query}`, {
     method: "GET",
     headers: { "Content-Type": "application/json" },
     cache: "no-store",
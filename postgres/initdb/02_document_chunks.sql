@@ -0,0 +1,17 @@
+-- Chunk storage for VECTOR_BACKEND=pgvector (needs the pgvector extension >= 0.5)
+CREATE EXTENSION IF NOT EXISTS vector;
+
+CREATE TABLE IF NOT EXISTS document_chunks (
+    id BIGSERIAL PRIMARY KEY,
+    index_name VARCHAR(100) NOT NULL,
+    fund_id INTEGER,
+    content TEXT NOT NULL,
+    metadata JSONB,
+    embedding vector(1536) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_document_chunks_index_name ON document_chunks (index_name);
+CREATE INDEX IF NOT EXISTS ix_document_chunks_fund_id ON document_chunks (fund_id);
+CREATE INDEX IF NOT EXISTS ix_document_chunks_embedding_hnsw
+    ON document_chunks USING hnsw (embedding vector_l2_ops) WITH (m = 16, ef_construction = 64);
@@ -0,0 +1,21 @@
+-- Natural keys for idempotent transaction ingestion.
+-- source_document is the SHA-256 of the PDF a row was parsed from; re-ingesting
+-- the same statement hits these indexes and inserts nothing (ON CONFLICT DO NOTHING).
+-- Rows without a source document (manual entries, rows loaded before this
+-- migration) are left unconstrained.
+
+ALTER TABLE capital_calls ADD COLUMN IF NOT EXISTS source_document VARCHAR(64);
+ALTER TABLE distributions ADD COLUMN IF NOT EXISTS source_document VARCHAR(64);
+ALTER TABLE adjustments ADD COLUMN IF NOT EXISTS source_document VARCHAR(64);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_capital_calls_natural_key
+    ON capital_calls (fund_id, call_date, call_type, amount, source_document)
+    NULLS NOT DISTINCT WHERE source_document IS NOT NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_distributions_natural_key
+    ON distributions (fund_id, distribution_date, distribution_type, amount, source_document)
+    NULLS NOT DISTINCT WHERE source_document IS NOT NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_adjustments_natural_key
+    ON adjustments (fund_id, adjustment_date, adjustment_type, amount, source_document)
+    NULLS NOT DISTINCT WHERE source_document IS NOT NULL;
@@ -0,0 +1,13 @@
+-- (fund_id, date, id) indexes for the keyset-paginated transaction timeline.
+-- Every page (first or ten-thousandth) is a short range scan from the cursor
+-- instead of a COUNT(*) plus OFFSET over all of the fund's rows.
+-- On a live database run these with CREATE INDEX CONCURRENTLY.
+
+CREATE INDEX IF NOT EXISTS ix_capital_calls_fund_date
+    ON capital_calls (fund_id, call_date, id);
+
+CREATE INDEX IF NOT EXISTS ix_distributions_fund_date
+    ON distributions (fund_id, distribution_date, id);
+
+CREATE INDEX IF NOT EXISTS ix_adjustments_fund_date
+    ON adjustments (fund_id, adjustment_date, id);
@@ -0,0 +1,8 @@
+-- Content-addressed uploads: documents.content_hash is the SHA-256 of the
+-- uploaded PDF (stored at uploads/<hash[:2]>/<hash>.pdf). An identical
+-- re-upload for the same fund is matched through this index and reuses the
+-- already parsed transactions and vectors.
+
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
+CREATE INDEX IF NOT EXISTS ix_documents_content_hash ON documents (content_hash);